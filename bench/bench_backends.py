@@ -0,0 +1,62 @@
+"""
+Compares the JSON, SQLite and binary storage backends.
+
+Usage: python3 -m bench.bench_backends [--sizes 10000 100000 1000000]
+"""
+import argparse
+import os
+import tempfile
+from src.binary_storage import BinaryStorage
+from src.manager import TaskManager
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+from .common import make_tasks, timed
+
+
+def run(size: int, directory: str) -> dict:
+    """
+    Times the common manager operations against each backend, each with a
+    fresh manager as a CLI command would use.
+
+    Args:
+        size (int): Number of tasks in the dataset.
+        directory (str): Scratch directory for the data files.
+
+    Returns:
+        dict: Seconds per operation, keyed by backend name.
+    """
+    tasks = make_tasks(size)
+    backends = {
+        "json": lambda: Storage(os.path.join(directory, f"tasks-{size}.json")),
+        "sqlite": lambda: SQLiteStorage(os.path.join(directory, f"tasks-{size}.db")),
+        "binary": lambda: BinaryStorage(os.path.join(directory, f"tasks-{size}.records")),
+    }
+    results = {}
+    for name, make_storage in backends.items():
+        make_storage().save_tasks(tasks)
+        row = {}
+        _, row["load_tasks"] = timed(make_storage().load_tasks)
+        _, row["list --project"] = timed(TaskManager(make_storage()).list_tasks, "Work", "High")
+        _, row["get_task_by_id"] = timed(TaskManager(make_storage()).get_task_by_id, size // 2)
+        _, row["add_task"] = timed(TaskManager(make_storage()).add_task, "Benchmark task")
+        _, row["complete_task"] = timed(TaskManager(make_storage()).complete_task, size // 2)
+        results[name] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare storage backends")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            results = run(size, directory)
+            print(f"\n{size} tasks")
+            print(f"{'operation':<18}" + "".join(f"{name + ' (s)':>12}" for name in results))
+            for operation in results["json"]:
+                print(f"{operation:<18}" + "".join(f"{row[operation]:>12.4f}" for row in results.values()))
+
+
+if __name__ == "__main__":
+    main()
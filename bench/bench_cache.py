@@ -0,0 +1,43 @@
+"""
+Compares cold (JSON parse) and warm (snapshot cache) load times.
+
+Usage: python3 -m bench.bench_cache [--tasks 100000] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+from src.storage import Storage
+from .common import make_tasks, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot cache benchmark")
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.json")
+        Storage(path).save_tasks(make_tasks(args.tasks))
+
+        cold = []
+        for _ in range(args.runs):
+            _, elapsed = timed(Storage(path).load_tasks)
+            cold.append(elapsed)
+
+        # The first cached load parses the JSON and builds the cache
+        _, rebuild = timed(Storage(path, use_cache=True).load_tasks)
+        warm = []
+        for _ in range(args.runs):
+            _, elapsed = timed(Storage(path, use_cache=True).load_tasks)
+            warm.append(elapsed)
+
+    print(f"{args.tasks} tasks, median of {args.runs} runs")
+    print(f"cold (json)        {statistics.median(cold) * 1000:8.1f} ms")
+    print(f"cache rebuild      {rebuild * 1000:8.1f} ms")
+    print(f"warm (cache)       {statistics.median(warm) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Measures task encoding and decoding throughput: the generated codec against
+``dataclasses.asdict``/``Task(**data)``, and the streamed compact save against
+the previous pretty-printed ``json.dump``, with orjson when it is installed.
+
+Usage: python3 -m bench.bench_codec [--count 100000]
+"""
+import argparse
+import dataclasses
+import json
+import os
+import tempfile
+from unittest import mock
+from src.models import Task
+from src.storage import Storage
+from .common import make_tasks, timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def legacy_save(path, tasks):
+    """
+    Writes a task file the way saves did before the codec: a full list of
+    dicts from ``asdict``, pretty-printed by ``json.dump``.
+    """
+    data = [dataclasses.asdict(task) for task in tasks]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"header": {"version": 1, "stats": null},\n"tasks": ')
+        json.dump(data, f, indent=4)
+        f.write("}\n")
+
+
+def best(func, repeat=3):
+    """
+    Returns the fastest of ``repeat`` timed calls, in seconds.
+    """
+    return min(timed(func)[1] for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task codec throughput")
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.count)
+    records = [task.to_dict() for task in tasks]
+    rows = {}
+    rows["asdict"] = best(lambda: [dataclasses.asdict(task) for task in tasks])
+    rows["Task.to_dict"] = best(lambda: [task.to_dict() for task in tasks])
+    rows["Task(**data)"] = best(lambda: [Task(**record) for record in records])
+    rows["Task.from_dict"] = best(lambda: [Task.from_dict(record) for record in records])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.json")
+        _, rows["save (json.dump indent=4)"] = timed(legacy_save, path, tasks)
+        modes = [False] + ([True] if orjson is not None else [])
+        for fast in modes:
+            label = "orjson" if fast else "stdlib"
+            with mock.patch("src.codec.orjson", orjson), mock.patch("src.codec.FAST_JSON", fast):
+                for fmt in ("json", "jsonl"):
+                    storage = Storage(path, fmt=fmt)
+                    _, rows[f"save {fmt} ({label})"] = timed(storage.save_tasks, tasks)
+                    _, rows[f"load {fmt} ({label})"] = timed(Storage(path).load_tasks)
+
+    print(f"{args.count} tasks")
+    print(f"{'operation':<28} {'seconds':>9} {'tasks/s':>12}")
+    for name, seconds in rows.items():
+        print(f"{name:<28} {seconds:>9.3f} {args.count / seconds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
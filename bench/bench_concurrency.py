@@ -0,0 +1,79 @@
+"""
+Runs several CLI-like writer processes against one task store and checks
+that no update is lost, for every storage backend.
+
+Each worker repeatedly opens a fresh TaskManager, adds a uniquely titled
+task, then opens another one and completes it, like two separate
+`task.py` invocations. Afterwards the stored tasks and aggregates must both
+count every task, done.
+
+Usage: python3 -m bench.bench_concurrency [--workers 8] [--ops 50] [--backends json sqlite]
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from src.constants import BACKENDS
+from src.manager import TaskManager
+from src.storage import open_storage
+
+
+def worker(path, backend, worker_id, ops):
+    for n in range(ops):
+        task = TaskManager(open_storage(path, backend=backend)).add_task(f"worker {worker_id} task {n}")
+        TaskManager(open_storage(path, backend=backend)).complete_task(task.id)
+
+
+def run(backend, workers, ops):
+    """
+    Runs the workers against a new store of one backend.
+
+    Returns:
+        bool: True if no update was lost.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.json")
+        open_storage(path, backend=backend).save_tasks([])
+
+        processes = [
+            multiprocessing.Process(target=worker, args=(path, backend, i, ops))
+            for i in range(workers)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        manager = TaskManager(open_storage(path, backend=backend))
+        tasks = manager.tasks
+        stats = manager.stats()
+
+    expected = workers * ops
+    ids = {t.id for t in tasks}
+    done = sum(1 for t in tasks if t.status == "done")
+    stats_done = stats.counts["status"].get("done", 0)
+    print(f"{backend:<8} {expected * 2 / elapsed:>8.0f} writes/s  tasks {len(tasks)}/{expected}, "
+          f"unique ids {len(ids)}, done {done}, stats total {stats.total} done {stats_done}")
+    return len(tasks) == len(ids) == done == stats.total == stats_done == expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent writer benchmark")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=50, help="add+done pairs per worker")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers x {args.ops} add+done pairs")
+    failed = [backend for backend in args.backends if not run(backend, args.workers, args.ops)]
+    if failed:
+        print(f"FAIL: lost or duplicated updates ({', '.join(failed)})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares `task.py` commands run directly against the same commands served
+by a resident daemon, on a pre-populated task file.
+
+Usage: python3 -m bench.bench_daemon [--tasks 100000] [--commands 20]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from src.daemon import is_running
+from src.storage import Storage
+from .common import make_tasks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TASK_PY = os.path.join(ROOT, "task.py")
+
+
+def run_commands(count, env, label):
+    """
+    Runs ``count`` add and done commands one after another. Titles include
+    ``label`` so that no add stops at the duplicate prompt.
+
+    Returns:
+        float: Wall seconds per command.
+    """
+    start = time.perf_counter()
+    for n in range(count):
+        argv = ["add", f"bench {label} {n}"] if n % 2 == 0 else ["done", "1"]
+        subprocess.run([sys.executable, TASK_PY] + argv, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daemon mode benchmark")
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--commands", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.json")
+        Storage(path).save_tasks(make_tasks(args.tasks))
+        env = dict(os.environ, TASK_CLI_FILE=path)
+
+        direct = run_commands(args.commands, env, "direct")
+
+        daemon = subprocess.Popen([sys.executable, TASK_PY, "daemon"], env=env, stdout=subprocess.DEVNULL)
+        try:
+            while not is_running(path + ".sock"):
+                if daemon.poll() is not None:
+                    sys.exit("daemon failed to start")
+                time.sleep(0.05)
+            served = run_commands(args.commands, env, "daemon")
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    print(f"{args.tasks} tasks, {args.commands} add/done commands each")
+    print(f"direct     {direct * 1000:8.1f} ms/command")
+    print(f"daemon     {served * 1000:8.1f} ms/command")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compares threads sharing one TaskManager behind a lock, one save per call,
+with the same threads going through a GroupCommitManager.
+
+Usage: python3 -m bench.bench_group_commit [--tasks 10000] [--threads 1 4 16] [--ops 10]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from src.group_commit import GroupCommitManager
+from src.manager import TaskManager
+from src.storage import Storage
+from .common import make_tasks
+
+
+def run_threads(count, ops, call):
+    """
+    Runs ``count`` threads that each call ``call(thread, n)`` ``ops`` times.
+
+    Returns:
+        float: Mutations per second across all threads.
+    """
+    threads = [threading.Thread(target=lambda t=t: [call(t, n) for n in range(ops)]) for t in range(count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return count * ops / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Group commit benchmark")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--ops", type=int, default=10)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    print(f"{args.tasks} tasks, {args.ops} adds per thread")
+    print(f"{'threads':>8} {'locked (ops/s)':>16} {'grouped (ops/s)':>16}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.json")
+        for count in args.threads:
+            Storage(path).save_tasks(tasks)
+            manager = TaskManager(Storage(path))
+            lock = threading.Lock()
+
+            def locked_add(t, n):
+                with lock:
+                    manager.add_task(f"locked {t} {n}")
+
+            locked = run_threads(count, args.ops, locked_add)
+
+            Storage(path).save_tasks(tasks)
+            with GroupCommitManager(TaskManager(Storage(path))) as group:
+                grouped = run_threads(count, args.ops, lambda t, n: group.add_task(f"grouped {t} {n}").result())
+            print(f"{count:>8} {locked:>16.1f} {grouped:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
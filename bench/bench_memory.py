@@ -0,0 +1,63 @@
+"""
+Measures resident bytes per task for each in-memory representation.
+
+Records are round-tripped through JSON first so that, as when loading the task
+file, every string is a separate object unless the representation interns it.
+
+Usage: python3 -m bench.bench_memory [--count 1000000]
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from dataclasses import field, fields, make_dataclass
+from src.models import Task
+from src.table import TaskTable
+from .common import iter_records
+
+# The Task model before it was slotted and interned, for comparison.
+LegacyTask = make_dataclass(
+    "LegacyTask", [(f.name, f.type, field(default=f.default)) for f in fields(Task)]
+)
+
+
+def measure(build, count: int) -> float:
+    """
+    Builds ``count`` tasks with ``build`` and returns the traced bytes per task.
+
+    Args:
+        build (callable): Takes an iterable of records and returns the container.
+        count (int): Number of tasks.
+
+    Returns:
+        float: Bytes allocated per task and still alive after building.
+    """
+    records = (json.loads(json.dumps(record)) for record in iter_records(count))
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    container = build(records)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del container
+    return (after - before) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bytes per task")
+    parser.add_argument("--count", type=int, default=1000000)
+    args = parser.parse_args()
+
+    representations = {
+        "dataclass (before)": lambda records: [LegacyTask(**r) for r in records],
+        "slotted Task": lambda records: [Task.from_dict(r) for r in records],
+        "TaskTable": TaskTable.from_dicts,
+    }
+    print(f"{args.count} tasks")
+    for name, build in representations.items():
+        print(f"{name:<20} {measure(build, args.count):>8.1f} bytes/task")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Times building, loading and querying the title search index.
+
+Usage: python3 -m bench.bench_search [--tasks 1000000] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+from src.manager import TaskManager
+from src.search import SearchIndex
+from src.storage import Storage
+from .common import make_tasks, timed
+
+QUERIES = ["task 12345", "work OR home", "task 9999*", "errand* 42"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search index benchmark")
+    parser.add_argument("--tasks", type=int, default=1000000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.json")
+        storage = Storage(path)
+        storage.save_tasks(make_tasks(args.tasks))
+
+        _, build = timed(SearchIndex(storage).rebuild)
+        index = SearchIndex(storage)
+        _, load = timed(index.search, "task 1")
+        print(f"{args.tasks} tasks")
+        print(f"build              {build * 1000:8.1f} ms")
+        print(f"load               {load * 1000:8.1f} ms")
+
+        for query in QUERIES:
+            times = []
+            for _ in range(args.runs):
+                hits, elapsed = timed(index.search, query, 20)
+                times.append(elapsed)
+            print(f"{query!r:18} {statistics.median(times) * 1000:8.2f} ms  ({len(hits)} shown)")
+
+        manager = TaskManager(Storage(path))
+        manager.search_index = index
+        manager.add_task("brand new searchable task")
+        _, incremental = timed(index.search, "searchable")
+        print(f"after add          {incremental * 1000:8.2f} ms  (incremental, no rebuild)")
+
+
+if __name__ == "__main__":
+    main()
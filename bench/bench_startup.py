@@ -0,0 +1,111 @@
+"""
+Measures CLI startup cost and checks it against time budgets.
+
+Each scenario runs ``task.py`` in a fresh interpreter. Wall time is the median
+of several runs; import time comes from ``python -X importtime`` and only
+counts modules imported by the CLI, not the interpreter's own startup.
+
+Usage: python3 -m bench.bench_startup [--runs 5] [--help-budget-ms 150] [--add-budget-ms 8000]
+Exits with status 1 if a scenario goes over its budget.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from src.storage import Storage
+from .common import make_tasks
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TASK_PY = os.path.join(ROOT, "task.py")
+
+
+def run_cli(argv, env, importtime=False):
+    """
+    Runs task.py once.
+
+    Returns:
+        tuple: (wall seconds, stderr text)
+    """
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += [TASK_PY] + argv
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    return time.perf_counter() - start, proc.stderr
+
+
+def import_breakdown(stderr: str, top: int = 5):
+    """
+    Parses ``-X importtime`` output.
+
+    Returns:
+        tuple: (total microseconds spent importing src.* packages, the slowest
+                top-level imports as (name, cumulative microseconds))
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((name.rstrip(), int(cumulative)))
+    # Top-level imports are the ones with no indentation after the separator
+    top_level = [(name.strip(), us) for name, us in entries if not name.startswith("  ")]
+    ours = sum(us for name, us in top_level if name.startswith("src"))
+    return ours, sorted(top_level, key=lambda item: -item[1])[:top]
+
+
+def scenario(name, argv, env, runs, budget_ms, setup=None):
+    """
+    Times one CLI invocation and prints the result.
+
+    Returns:
+        bool: True if the median is within the budget.
+    """
+    times = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        elapsed, _ = run_cli(argv, env)
+        times.append(elapsed)
+    if setup:
+        setup()
+    _, stderr = run_cli(argv, env, importtime=True)
+    ours, slowest = import_breakdown(stderr)
+    median_ms = statistics.median(times) * 1000
+    ok = median_ms <= budget_ms
+    print(f"{name:<22} median {median_ms:8.1f} ms  budget {budget_ms:7.0f} ms  {'OK' if ok else 'OVER BUDGET'}")
+    print(f"{'':<22} src imports {ours / 1000:.1f} ms; slowest: "
+          + ", ".join(f"{n} {us / 1000:.1f} ms" for n, us in slowest))
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLI startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=100000, help="Size of the task file for `add`")
+    parser.add_argument("--help-budget-ms", type=float, default=150)
+    parser.add_argument("--add-budget-ms", type=float, default=8000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_file = os.path.join(directory, "tasks.json")
+        seed_file = os.path.join(directory, "seed.json")
+        Storage(seed_file).save_tasks(make_tasks(args.tasks))
+        env = dict(os.environ, TASK_CLI_FILE=data_file)
+
+        def reset():
+            shutil.copyfile(seed_file, data_file)
+
+        ok = scenario("--help", ["--help"], env, args.runs, args.help_budget_ms)
+        ok &= scenario(f"add ({args.tasks} tasks)", ["add", "Startup benchmark"], env, args.runs,
+                       args.add_budget_ms, setup=reset)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run benchmarks from the repository root, e.g. ``python3 -m bench.bench_backends``.
+"""
+import random
+import time
+from typing import Iterator, List
+from src.models import Task
+
+PROJECTS = ["Work", "Home", "Errands", "Study", "Health", "Finance", "Garden", "Travel"]
+PRIORITIES = ["Low", "Medium", "High"]
+RECURRENCES = [None, None, None, None, "daily", "weekly", "monthly"]
+
+
+def iter_records(count: int, seed: int = 0) -> Iterator[dict]:
+    """
+    Yields deterministic synthetic tasks in the ``Task.to_dict`` format.
+
+    Args:
+        count (int): Number of records to yield.
+        seed (int): Random seed, so every run sees the same data.
+
+    Yields:
+        dict: Records with IDs 1..count.
+    """
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        done = rng.random() < 0.3
+        yield {
+            "id": i,
+            "title": f"Task {i} {rng.choice(PROJECTS).lower()}",
+            "status": "done" if done else "pending",
+            "priority": rng.choice(PRIORITIES),
+            "project": rng.choice(PROJECTS),
+            "recurrence": rng.choice(RECURRENCES),
+            "created_at": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T09:00:00",
+            "completed_at": "2024-12-31T18:00:00" if done else None,
+            "due_date": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if rng.random() < 0.6 else None,
+        }
+
+
+def make_tasks(count: int, seed: int = 0) -> List[Task]:
+    """
+    Builds a deterministic list of synthetic tasks.
+
+    Args:
+        count (int): Number of tasks to build.
+        seed (int): Random seed, so every run sees the same data.
+
+    Returns:
+        List[Task]: Tasks with IDs 1..count.
+    """
+    return [Task.from_dict(record) for record in iter_records(count, seed)]
+
+
+def timed(func, *args, **kwargs):
+    """
+    Calls ``func`` once and returns its result with the elapsed wall time.
+
+    Returns:
+        tuple: (result, seconds)
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
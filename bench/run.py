@@ -0,0 +1,167 @@
+"""
+Benchmark suite for Storage, TaskManager and the CLI.
+
+Runs every metric against synthetic datasets of each requested size and
+writes the results as JSON. With --compare, the results are checked against a
+stored baseline and the run fails if any metric got slower by more than the
+allowed percentage.
+
+Usage:
+    python3 -m bench.run [--sizes 1000 100000 1000000] [--output bench/results.json]
+    python3 -m bench.run --compare bench/baseline.json [--threshold 20] [--min-delta-ms 1]
+    python3 -m bench.run --input bench/results.json --compare bench/baseline.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+from src.manager import TaskManager
+from src.storage import Storage
+from .common import make_tasks, timed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TASK_PY = os.path.join(ROOT, "task.py")
+
+
+def median_time(func, repeat: int) -> float:
+    """
+    Calls ``func`` ``repeat`` times and returns the median wall time in seconds.
+    """
+    return statistics.median(timed(func)[1] for _ in range(repeat))
+
+
+def run_cli(path: str, *argv):
+    """
+    Runs task.py against the given task file with its output discarded.
+    """
+    env = dict(os.environ, TASK_CLI_FILE=path)
+    subprocess.run([sys.executable, TASK_PY] + list(argv), env=env, check=True,
+                   stdout=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+
+
+def bench_size(size: int, directory: str, repeat: int) -> dict:
+    """
+    Runs every metric against one dataset size.
+
+    Args:
+        size (int): Number of tasks in the dataset.
+        directory (str): Scratch directory for data files.
+        repeat (int): Repetitions per metric; the median is reported.
+
+    Returns:
+        dict: Seconds per metric name.
+    """
+    tasks = make_tasks(size)
+    path = os.path.join(directory, f"tasks-{size}.json")
+    storage = Storage(path)
+    storage.save_tasks(tasks)
+    # Whole-file operations get fewer repetitions on big datasets
+    heavy = max(1, repeat if size < 100000 else repeat // 3)
+    metrics = {}
+
+    metrics["load_tasks"] = median_time(storage.load_tasks, heavy)
+    metrics["save_tasks"] = median_time(lambda: storage.save_tasks(tasks), heavy)
+
+    jsonl = Storage(os.path.join(directory, f"tasks-{size}.jsonl"), fmt="jsonl")
+    jsonl.save_tasks(tasks)
+    metrics["load_tasks(jsonl)"] = median_time(jsonl.load_tasks, heavy)
+    metrics["save_tasks(jsonl)"] = median_time(lambda: jsonl.save_tasks(tasks), heavy)
+
+    manager = TaskManager(Storage(path))
+    manager.tasks
+    counter = iter(range(10 ** 9))
+    metrics["add_task"] = median_time(lambda: manager.add_task(f"Bench add {next(counter)}"), heavy)
+    metrics["list_tasks(project)"] = median_time(lambda: manager.list_tasks(project="Work"), repeat)
+    metrics["list_tasks(project,priority)"] = median_time(lambda: manager.list_tasks(project="Work", priority="High"), repeat)
+    metrics["list_tasks(due range)"] = median_time(lambda: manager.list_tasks(due_after="2025-03-01", due_before="2025-03-08"), repeat)
+    metrics["list_tasks(sort due, limit 20)"] = median_time(lambda: manager.list_tasks(sort="due", limit=20), repeat)
+
+    recurring = iter([t.id for t in manager.tasks if t.recurrence and t.status == "pending"])
+    metrics["complete_task(recurring)"] = median_time(lambda: manager.complete_task(next(recurring)), heavy)
+
+    csv_path = os.path.join(directory, "export.csv")
+    metrics["export_tasks_to_csv"] = median_time(lambda: manager.export_tasks_to_csv(csv_path), heavy)
+
+    metrics["cli list --project"] = median_time(lambda: run_cli(path, "list", "--project", "Work"), heavy)
+    metrics["cli add"] = median_time(lambda: run_cli(path, "add", f"CLI add {next(counter)}"), heavy)
+    metrics["cli --help"] = median_time(lambda: run_cli(path, "--help"), repeat)
+    return metrics
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float = 0.001) -> bool:
+    """
+    Prints a comparison table and checks for regressions.
+
+    Args:
+        results (dict): The current results document.
+        baseline (dict): The baseline results document.
+        threshold (float): Allowed slowdown in percent.
+        min_delta (float): Slowdowns smaller than this many seconds are treated
+                           as noise, whatever their percentage.
+
+    Returns:
+        bool: True if no metric regressed past the threshold.
+    """
+    ok = True
+    print(f"{'metric':<44} {'baseline':>10} {'current':>10} {'change':>9}")
+    for name, current in results["metrics"].items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            print(f"{name:<44} {'-':>10} {current:>10.4f} {'new':>9}")
+            continue
+        change = (current - base) / base * 100 if base else 0.0
+        regressed = change > threshold and current - base > min_delta
+        ok &= not regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<44} {base:>10.4f} {current:>10.4f} {change:>+8.1f}%{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task CLI benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per metric (default: 5)")
+    parser.add_argument("--output", default=os.path.join("bench", "results.json"), help="Where to write results")
+    parser.add_argument("--input", help="Compare an existing results file instead of running")
+    parser.add_argument("--compare", metavar="BASELINE", help="Baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0, help="Allowed slowdown in percent (default: 20)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns below this many ms (default: 1)")
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input) as f:
+            results = json.load(f)
+    else:
+        results = {
+            "meta": {
+                "date": datetime.datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "sizes": args.sizes,
+            },
+            "metrics": {},
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            for size in args.sizes:
+                for name, seconds in bench_size(size, directory, args.repeat).items():
+                    results["metrics"][f"{size}/{name}"] = seconds
+                    print(f"{size:>8} {name:<34} {seconds * 1000:>10.2f} ms", flush=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.threshold, args.min_delta_ms / 1000):
+            print(f"Benchmark regressed by more than {args.threshold}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
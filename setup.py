@@ -11,6 +11,9 @@ setup(
         ],
     },
     install_requires=[],
+    extras_require={
+        "fast": ["orjson"],
+    },
     author="Manthan Nimodiya",
     description="A command-line interface for managing tasks with projects and priorities.",
     long_description=open("README.md").read(),
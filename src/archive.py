@@ -0,0 +1,211 @@
+import gzip
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from . import profiling
+from .models import Task
+from .stats import Stats
+from .storage import FileLockMixin
+
+INDEX_NAME = "index.json"
+# Lines handed to the gzip stream per write call
+CHUNK_ROWS = 1000
+
+
+class Archive(FileLockMixin):
+    """
+    Append-only cold storage for completed tasks.
+
+    Archived tasks are moved out of the storage backend into gzip-compressed
+    segments, ``segment-NNNNNN.jsonl.gz``, holding one JSON task per line.
+    Every archive run writes one new segment; segments are never modified.
+    ``index.json`` lists the segments with their task count, ID range and
+    projects, and records the highest archived ID so that new tasks never
+    reuse an archived ID, the date of the last automatic run, and the
+    completion history (see ``Stats.add_history``) of the archived tasks.
+
+    Writers serialize through an exclusive ``fcntl`` lock on ``lock`` in the
+    directory. Reads take no lock; a segment appears in the index only once it
+    is completely written.
+
+    Attributes:
+        directory (str): The directory holding the segments and the index.
+    """
+    def __init__(self, directory: str):
+        """
+        Initializes the Archive. Nothing is read or created until needed.
+
+        Args:
+            directory (str): The directory holding the segments and the index.
+        """
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self.lock_path = os.path.join(directory, "lock")
+        self._index = None
+        self._index_stat = None
+
+    def _read_index(self) -> dict:
+        """
+        Returns the index, re-reading the file only if it changed.
+        """
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return {"max_id": 0, "last_auto": None, "segments": []}
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key != self._index_stat:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+            self._index_stat = key
+        return self._index
+
+    def _write_index(self, index: dict):
+        """
+        Replaces the index atomically.
+        """
+        with tempfile.NamedTemporaryFile('w', dir=self.directory, delete=False, encoding='utf-8') as tf:
+            json.dump(index, tf, indent=4)
+            temp_name = tf.name
+        os.replace(temp_name, self.index_path)
+
+    def max_id(self) -> int:
+        """
+        Returns the highest ID of any archived task.
+
+        Returns:
+            int: The highest ID, or 0 if nothing was archived.
+        """
+        return self._read_index()["max_id"]
+
+    def count(self) -> int:
+        """
+        Returns the number of archived tasks.
+
+        Returns:
+            int: The number of tasks in all segments.
+        """
+        return sum(segment["count"] for segment in self._read_index()["segments"])
+
+    def history(self) -> dict:
+        """
+        Returns the completion days and lead times of the archived tasks.
+
+        Returns:
+            dict: Aggregates in the form of ``Stats.to_dict`` with only the
+                  history filled in.
+        """
+        return self._read_index().get("history") or Stats().to_dict()
+
+    def last_auto(self) -> Optional[str]:
+        """
+        Returns the date (YYYY-MM-DD) of the last automatic archive run.
+
+        Returns:
+            Optional[str]: The date, or None if it never ran.
+        """
+        return self._read_index().get("last_auto")
+
+    def append(self, tasks: List[Task], auto_date: Optional[str] = None) -> int:
+        """
+        Writes tasks to a new segment.
+
+        Args:
+            tasks (List[Task]): The tasks to archive.
+            auto_date (Optional[str]): Records this date as the last
+                                       automatic run, even if ``tasks`` is empty.
+
+        Returns:
+            int: The number of tasks written.
+        """
+        if not tasks and auto_date is None:
+            return 0
+        with self.locked():
+            index = dict(self._read_index())
+            if auto_date is not None:
+                index["last_auto"] = auto_date
+            if tasks:
+                segments = list(index["segments"])
+                name = f"segment-{len(segments) + 1:06d}.jsonl.gz"
+                with profiling.span("archive.write"):
+                    temp_name = os.path.join(self.directory, f".{name}.{os.getpid()}.tmp")
+                    try:
+                        with gzip.open(temp_name, 'wt', encoding='utf-8') as f:
+                            for start in range(0, len(tasks), CHUNK_ROWS):
+                                f.write("".join(json.dumps(task.to_dict()) + "\n" for task in tasks[start:start + CHUNK_ROWS]))
+                        os.replace(temp_name, os.path.join(self.directory, name))
+                    except BaseException:
+                        if os.path.exists(temp_name):
+                            os.remove(temp_name)
+                        raise
+                ids = [task.id for task in tasks]
+                segments.append({
+                    "name": name,
+                    "count": len(tasks),
+                    "min_id": min(ids),
+                    "max_id": max(ids),
+                    "projects": sorted({task.project or "" for task in tasks}),
+                })
+                index["segments"] = segments
+                index["max_id"] = max(index["max_id"], max(ids))
+                history = Stats(index.get("history"))
+                for task in tasks:
+                    history.add_history(task)
+                index["history"] = history.to_dict()
+            self._write_index(index)
+        return len(tasks)
+
+    @contextmanager
+    def appending(self, tasks: List[Task], auto_date: Optional[str] = None):
+        """
+        Writes tasks to a new segment like ``append``, and discards it again
+        if the block raises. The archive stays locked until the block ends.
+
+        Args:
+            tasks (List[Task]): The tasks to archive.
+            auto_date (Optional[str]): Records this date as the last
+                                       automatic run, even if ``tasks`` is empty.
+        """
+        with self.locked():
+            previous = self._read_index()
+            self.append(tasks, auto_date=auto_date)
+            try:
+                yield
+            except BaseException:
+                known = {segment["name"] for segment in previous["segments"]}
+                for segment in self._read_index()["segments"]:
+                    if segment["name"] not in known:
+                        os.remove(os.path.join(self.directory, segment["name"]))
+                self._write_index(previous)
+                raise
+
+    def iter_tasks(self, project: Optional[str] = None, priority: Optional[str] = None, status: Optional[str] = None, due_after: Optional[str] = None, due_before: Optional[str] = None) -> Iterator[Task]:
+        """
+        Streams archived tasks matching the given filters, oldest segment
+        first. Segments are decompressed one line at a time, and segments
+        without the requested project are skipped unread.
+
+        Args:
+            project (Optional[str]): Filter by project name.
+            priority (Optional[str]): Filter by priority level.
+            status (Optional[str]): Filter by status.
+            due_after (Optional[str]): Only tasks due strictly after this date.
+            due_before (Optional[str]): Only tasks due strictly before this date.
+
+        Yields:
+            Task: The matching tasks.
+        """
+        for segment in self._read_index()["segments"]:
+            if project and project not in segment["projects"]:
+                continue
+            with gzip.open(os.path.join(self.directory, segment["name"]), 'rt', encoding='utf-8') as f:
+                for line in f:
+                    item = json.loads(line)
+                    due = item["due_date"]
+                    if ((not project or item["project"] == project)
+                            and (not priority or item["priority"] == priority)
+                            and (not status or item["status"] == status)
+                            and (not due_after or (due is not None and due > due_after))
+                            and (not due_before or (due is not None and due < due_before))):
+                        yield Task.from_dict(item)
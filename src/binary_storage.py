@@ -0,0 +1,592 @@
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, List, Optional
+from . import profiling
+from .constants import STATUS_DONE
+from .models import Task
+from .storage import BaseStorage, FileLockMixin
+
+RECORDS_NAME = "records.bin"
+REDO_NAME = "redo.log"
+MAGIC = b"TASKREC2"
+# Records file header: magic, record size, version stamp, highest ID handed
+# out, committed size of the string heap and generation of the heap file
+HEADER = struct.Struct("<8sIQQQQ")
+HEADER_SIZE = 64
+# One record per task ID: flags, status, priority, recurrence, title and
+# project as (offset, length) in the string heap, created_at, completed_at,
+# due_date and relist count. Text fields are UTF-8, NUL-padded.
+RECORD = struct.Struct("<B8s8s16sQIQI32s32s10sxI")
+EMPTY_RECORD = bytes(RECORD.size)
+# Redo record: payload length and CRC-32, then the new header followed by
+# (ID, record) entries
+REDO_HEADER = struct.Struct("<II")
+REDO_ENTRY = struct.Struct("<Q")
+# Records are preallocated in steps of at least this many
+MIN_GROWTH = 1024
+
+LIVE = 1
+HAS_PROJECT = 2
+HAS_RECURRENCE = 4
+HAS_COMPLETED = 8
+HAS_DUE = 16
+
+_STATUS_DONE = STATUS_DONE.encode('utf-8').ljust(8, b"\0")
+
+
+def _fixed(value: str, size: int, name: str) -> bytes:
+    """
+    Encodes a value for a fixed-width text field.
+
+    Raises:
+        ValueError: If the encoded value does not fit.
+    """
+    data = value.encode('utf-8')
+    if len(data) > size:
+        raise ValueError(f"The binary backend stores at most {size} bytes of {name}: {value!r}")
+    return data
+
+
+def _text(data: bytes) -> str:
+    """
+    Decodes a fixed-width text field.
+    """
+    return data.rstrip(b"\0").decode('utf-8')
+
+
+class _HeapAppender:
+    """
+    Collects strings to append to the string heap and hands out their
+    (offset, length) references. Projects are stored once per write.
+    """
+    def __init__(self, base: int):
+        self.base = base
+        self.data = bytearray()
+        self._projects: Dict[str, tuple] = {}
+
+    def add(self, value: str) -> tuple:
+        encoded = value.encode('utf-8')
+        ref = (self.base + len(self.data), len(encoded))
+        self.data += encoded
+        return ref
+
+    def add_project(self, project: str) -> tuple:
+        ref = self._projects.get(project)
+        if ref is None:
+            ref = self._projects[project] = self.add(project)
+        return ref
+
+
+class BinaryStorage(FileLockMixin, BaseStorage):
+    """
+    Stores tasks as fixed-width records in a memory-mapped file.
+
+    The directory holds:
+
+    - ``records.bin``: a header (version stamp, highest ID handed out,
+      committed heap size and heap generation) followed by one RECORD per
+      task ID, so the record of task N is at ``HEADER_SIZE + (N - 1) *
+      RECORD.size``. Deleted IDs leave an empty record.
+    - ``strings-N.bin``: an append-only heap holding titles and project names,
+      which records point into by offset and length.
+    - ``redo.log``: present only while a write is being applied.
+
+    A mutation patches the records of the tasks it touched in place: ``done``
+    and status, priority or due-date updates write one record and the header.
+    New titles and projects are appended to the heap first. The new header and
+    records then go to the redo record, which is synced before the mapped
+    file is patched and msync'ed, and removed afterwards. If a crash
+    interrupts the patch, the next access replays the redo record; a torn redo
+    record is discarded along with any heap bytes past the committed size,
+    leaving the previous state. ``save_tasks`` writes a new heap generation
+    and replaces the records file, which also drops unused heap strings.
+
+    Reads take the writer lock too, because records change in place. The
+    aggregates (see ``Stats``) are not persisted, so ``stats`` scans the
+    records. The files stay mapped until ``close`` is called or the storage
+    is used as a context manager and its block ends.
+
+    Attributes:
+        directory (str): The directory holding the files.
+        file_path (str): The path of the records file.
+    """
+    supports_queries = True
+
+    def __init__(self, directory: str):
+        """
+        Initializes the BinaryStorage instance. Nothing is read until needed.
+
+        Args:
+            directory (str): The directory holding the files. Created on the
+                             first write.
+        """
+        self.directory = directory
+        self.file_path = os.path.join(directory, RECORDS_NAME)
+        self.lock_path = os.path.join(directory, "lock")
+        self.redo_path = os.path.join(directory, REDO_NAME)
+        self._file = None
+        self._map = None
+        self._heap_file = None
+        self._heap_map = b""
+        self._heap_generation = None
+        # (version, inode) when this instance last read or wrote the tasks
+        self._seen_state = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _heap_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"strings-{generation}.bin")
+
+    def _header(self) -> tuple:
+        """
+        Returns the mapped header as (version, max_id, heap_size, generation).
+
+        Raises:
+            ValueError: If the file is not a records file of this layout.
+        """
+        magic, record_size, version, max_id, heap_size, generation = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError(f"Not a task records file: {self.file_path}")
+        return version, max_id, heap_size, generation
+
+    def close(self):
+        """
+        Unmaps and closes the records and heap files if they are open. The
+        next access maps them again.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        if isinstance(self._heap_map, mmap.mmap):
+            self._heap_map.close()
+        if self._heap_file is not None:
+            self._heap_file.close()
+        self._file = self._map = self._heap_file = self._heap_generation = None
+        self._heap_map = b""
+
+    def _open(self) -> bool:
+        """
+        Maps the current records file and heap, remapping them if another
+        process replaced or grew them, and replays a leftover redo record.
+        Called with the lock held.
+
+        Returns:
+            bool: False if nothing has been stored yet.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            self.close()
+            return False
+        if (self._map is None or os.fstat(self._file.fileno()).st_ino != stat.st_ino
+                or len(self._map) != stat.st_size):
+            self.close()
+            self._file = open(self.file_path, 'r+b')
+            self._map = mmap.mmap(self._file.fileno(), 0)
+        if os.path.exists(self.redo_path):
+            self._replay_redo()
+        _, _, heap_size, generation = self._header()
+        if generation != self._heap_generation or len(self._heap_map) < heap_size:
+            if isinstance(self._heap_map, mmap.mmap):
+                self._heap_map.close()
+            if self._heap_file is None or generation != self._heap_generation:
+                if self._heap_file is not None:
+                    self._heap_file.close()
+                self._heap_file = open(self._heap_path(generation), 'a+b')
+                self._heap_generation = generation
+            self._heap_map = mmap.mmap(self._heap_file.fileno(), 0, access=mmap.ACCESS_READ) if heap_size else b""
+        return True
+
+    def _state(self) -> tuple:
+        return (self._header()[0], os.fstat(self._file.fileno()).st_ino)
+
+    def state_token(self):
+        """
+        Returns the version stamp and inode of the records file, or None if
+        there is none. Reads the header without the lock.
+        """
+        try:
+            with open(self.file_path, 'rb') as f:
+                header = f.read(HEADER.size)
+                return (HEADER.unpack(header)[2], os.fstat(f.fileno()).st_ino)
+        except (FileNotFoundError, struct.error):
+            return None
+
+    def has_changed(self) -> bool:
+        """
+        Checks the records file against the state last loaded or written.
+
+        Returns:
+            bool: True if another process wrote since this instance loaded.
+        """
+        return self.state_token() != self._seen_state
+
+    def _decode(self, task_id: int, fields: tuple) -> Task:
+        """
+        Builds the Task stored in an unpacked record.
+        """
+        flags, status, priority, recurrence, title_offset, title_length, project_offset, project_length, created_at, completed_at, due_date, relist_count = fields
+        heap = self._heap_map
+        return Task(
+            id=task_id,
+            title=heap[title_offset:title_offset + title_length].decode('utf-8'),
+            status=_text(status),
+            priority=_text(priority),
+            project=heap[project_offset:project_offset + project_length].decode('utf-8') if flags & HAS_PROJECT else None,
+            recurrence=_text(recurrence) if flags & HAS_RECURRENCE else None,
+            created_at=_text(created_at),
+            completed_at=_text(completed_at) if flags & HAS_COMPLETED else None,
+            due_date=_text(due_date) if flags & HAS_DUE else None,
+            relist_count=relist_count,
+        )
+
+    def _encode(self, task: Task, heap: _HeapAppender, old: Optional[tuple] = None) -> bytes:
+        """
+        Packs a task into a record. Its title and project keep their heap
+        strings from the task's old record if unchanged, and are appended to
+        the heap otherwise.
+
+        Raises:
+            ValueError: If a fixed-width field is too long.
+        """
+        flags = LIVE
+        title = self._reuse(old, 4, task.title) or heap.add(task.title)
+        project = (0, 0)
+        if task.project is not None:
+            flags |= HAS_PROJECT
+            project = self._reuse(old, 6, task.project) or heap.add_project(task.project)
+        if task.recurrence is not None:
+            flags |= HAS_RECURRENCE
+        if task.completed_at is not None:
+            flags |= HAS_COMPLETED
+        if task.due_date is not None:
+            flags |= HAS_DUE
+        return RECORD.pack(
+            flags,
+            _fixed(task.status, 8, "status"),
+            _fixed(task.priority, 8, "priority"),
+            _fixed(task.recurrence or "", 16, "recurrence"),
+            *title,
+            *project,
+            _fixed(task.created_at, 32, "created_at"),
+            _fixed(task.completed_at or "", 32, "completed_at"),
+            _fixed(task.due_date or "", 10, "due_date"),
+            task.relist_count,
+        )
+
+    def _reuse(self, old: Optional[tuple], index: int, value: str) -> Optional[tuple]:
+        """
+        Returns the (offset, length) reference at ``old[index]`` if it points
+        to ``value``, else None.
+        """
+        if old is None:
+            return None
+        offset, length = old[index], old[index + 1]
+        encoded = value.encode('utf-8')
+        if length == len(encoded) and self._heap_map[offset:offset + length] == encoded:
+            return (offset, length)
+        return None
+
+    def _records(self, max_id: int):
+        """
+        Iterates over (task ID, unpacked record) for every stored ID.
+        """
+        end = HEADER_SIZE + max_id * RECORD.size
+        return enumerate(RECORD.iter_unpack(self._map[HEADER_SIZE:end]), 1)
+
+    def load_tasks(self) -> List[Task]:
+        """
+        Loads every task from the mapped records.
+
+        Returns:
+            List[Task]: All stored tasks, in ID order.
+        """
+        with self.locked():
+            if not self._open():
+                self._seen_state = None
+                return []
+            _, max_id, _, _ = self._header()
+            with profiling.span("storage.decode"):
+                tasks = [self._decode(task_id, fields) for task_id, fields in self._records(max_id) if fields[0] & LIVE]
+            self._seen_state = self._state()
+        profiling.count("tasks_loaded", len(tasks))
+        return tasks
+
+    def save_tasks(self, tasks: List[Task]):
+        """
+        Replaces the stored tasks, writing a new heap generation and records
+        file. The records file is replaced atomically last, and the previous
+        heap is removed after it.
+
+        Args:
+            tasks (List[Task]): The list of Task objects to save.
+
+        Raises:
+            ValueError: If a fixed-width field of a task is too long.
+        """
+        with self.locked():
+            profiling.count("saves")
+            if self._open():
+                version, _, _, generation = self._header()
+                old_heap = self._heap_path(generation)
+                generation += 1
+            else:
+                version, generation, old_heap = 0, 0, None
+            max_id = max((task.id for task in tasks), default=0)
+            heap = _HeapAppender(0)
+            records = bytearray(HEADER_SIZE + max_id * RECORD.size)
+            with profiling.span("storage.encode"):
+                for task in tasks:
+                    start = HEADER_SIZE + (task.id - 1) * RECORD.size
+                    records[start:start + RECORD.size] = self._encode(task, heap)
+            HEADER.pack_into(records, 0, MAGIC, RECORD.size, version + 1, max_id, len(heap.data), generation)
+            with profiling.span("storage.write"):
+                self._write_synced(self._heap_path(generation), heap.data)
+                temp_path = self.file_path + ".tmp"
+                self._write_synced(temp_path, records)
+                self.close()
+                os.replace(temp_path, self.file_path)
+            if old_heap is not None and os.path.exists(old_heap):
+                os.remove(old_heap)
+            profiling.count("bytes_written", len(records) + len(heap.data))
+            self._open()
+            self._seen_state = self._state()
+
+    @staticmethod
+    def _write_synced(path: str, data: bytes):
+        """
+        Writes a file and flushes it to disk.
+        """
+        with open(path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def persist(self, tasks: Optional[List[Task]], changed: Iterable[Task] = (), deleted: Iterable[int] = (), added: Iterable[int] = (), stats_delta: Optional[dict] = None) -> Optional[List[Task]]:
+        """
+        Patches the records of the changed and deleted tasks in place, under
+        the writer lock.
+
+        Only the records of the given tasks are written, so the caller does not
+        need every task loaded, and changes made concurrently by other
+        processes to other tasks are kept. New tasks whose ID another process
+        took meanwhile are renumbered after the highest ID handed out; their
+        Task objects are updated in place.
+
+        Args:
+            tasks (Optional[List[Task]]): The caller's full task list, or None
+                                          if it has not loaded one.
+            changed (Iterable[Task]): Tasks that were added or modified.
+            deleted (Iterable[int]): IDs of tasks that were removed.
+            added (Iterable[int]): IDs of the changed tasks that are new.
+            stats_delta (Optional[dict]): Ignored; aggregates are not stored.
+
+        Returns:
+            Optional[List[Task]]: Every stored task if the caller has a task
+                                  list and another process wrote since it was
+                                  loaded, which the caller should adopt; else None.
+
+        Raises:
+            ValueError: If a fixed-width field of a task is too long.
+        """
+        changed = list(changed)
+        deleted = list(deleted)
+        added = set(added)
+        with self.locked():
+            profiling.count("saves")
+            if not self._open():
+                self.save_tasks([])
+            before = self._state()
+            concurrent = before != self._seen_state
+            version, max_id, heap_size, generation = self._header()
+            new_tasks = [task for task in changed if task.id in added]
+            archived = self._archived_max_id()
+            if any(self._live(task.id, max_id) or task.id <= archived for task in new_tasks):
+                profiling.count("merges")
+                next_id = max(max_id, archived) + 1
+                for task in new_tasks:
+                    task.id = next_id
+                    next_id += 1
+            heap = _HeapAppender(heap_size)
+            records = {task.id: self._encode(task, heap, self._record(task.id, max_id)) for task in changed}
+            for task_id in deleted:
+                if 0 < task_id <= max_id:
+                    records[task_id] = EMPTY_RECORD
+            max_id = max([max_id] + list(records))
+            header = HEADER.pack(MAGIC, RECORD.size, version + 1, max_id, heap_size + len(heap.data), generation)
+            self._apply(header, records, heap.data, heap_size)
+            self._seen_state = self._state()
+            self.last_transition = (before, self._seen_state)
+        if concurrent and tasks is not None:
+            return self.load_tasks()
+        return None
+
+    def _record(self, task_id: int, max_id: int) -> Optional[tuple]:
+        """
+        Returns the unpacked record of a stored task, or None.
+        """
+        if not self._live(task_id, max_id):
+            return None
+        return RECORD.unpack_from(self._map, HEADER_SIZE + (task_id - 1) * RECORD.size)
+
+    def _live(self, task_id: int, max_id: int) -> bool:
+        """
+        Whether a task with this ID is stored.
+        """
+        return 0 < task_id <= max_id and self._map[HEADER_SIZE + (task_id - 1) * RECORD.size] & LIVE
+
+    def _apply(self, header: bytes, records: Dict[int, bytes], heap_data: bytes, heap_size: int):
+        """
+        Durably applies a write: appends to the heap, syncs the redo record,
+        then patches the mapped records and removes the redo record.
+        """
+        if heap_data:
+            with profiling.span("storage.heap_append"):
+                self._heap_file.seek(heap_size)
+                self._heap_file.truncate()
+                self._heap_file.write(heap_data)
+                self._heap_file.flush()
+                os.fsync(self._heap_file.fileno())
+        with profiling.span("storage.redo"):
+            payload = header.ljust(HEADER_SIZE, b"\0") + b"".join(
+                REDO_ENTRY.pack(task_id) + record for task_id, record in sorted(records.items()))
+            self._write_synced(self.redo_path, REDO_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._patch(payload)
+        os.remove(self.redo_path)
+        profiling.count("bytes_written", len(heap_data) + len(payload) * 2)
+
+    def _patch(self, payload: bytes):
+        """
+        Writes the header and records of a redo payload into the mapped file,
+        growing it first if needed, and msyncs it.
+        """
+        entry_size = REDO_ENTRY.size + RECORD.size
+        entries = [(REDO_ENTRY.unpack_from(payload, offset)[0], offset + REDO_ENTRY.size)
+                   for offset in range(HEADER_SIZE, len(payload), entry_size)]
+        needed = HEADER_SIZE + max([0] + [task_id for task_id, _ in entries]) * RECORD.size
+        if needed > len(self._map):
+            with profiling.span("storage.grow"):
+                capacity = (len(self._map) - HEADER_SIZE) // RECORD.size
+                capacity = max(capacity * 2, capacity + MIN_GROWTH, (needed - HEADER_SIZE) // RECORD.size)
+                self._map.close()
+                self._file.truncate(HEADER_SIZE + capacity * RECORD.size)
+                self._map = mmap.mmap(self._file.fileno(), 0)
+        with profiling.span("storage.patch"):
+            for task_id, offset in entries:
+                start = HEADER_SIZE + (task_id - 1) * RECORD.size
+                self._map[start:start + RECORD.size] = payload[offset:offset + RECORD.size]
+            self._map[:HEADER_SIZE] = payload[:HEADER_SIZE]
+        with profiling.span("storage.msync"):
+            self._map.flush()
+
+    def _replay_redo(self):
+        """
+        Finishes a write interrupted after its redo record was synced, or
+        discards a redo record torn by a crash.
+        """
+        with open(self.redo_path, 'rb') as f:
+            data = f.read()
+        if len(data) >= REDO_HEADER.size:
+            length, checksum = REDO_HEADER.unpack_from(data)
+            payload = data[REDO_HEADER.size:REDO_HEADER.size + length]
+            if len(payload) == length and zlib.crc32(payload) == checksum:
+                profiling.count("redo_replays")
+                self._patch(payload)
+        os.remove(self.redo_path)
+
+    def query_tasks(self, project: Optional[str] = None, priority: Optional[str] = None, status: Optional[str] = None, due_after: Optional[str] = None, due_before: Optional[str] = None) -> List[Task]:
+        """
+        Returns the tasks matching the given filters. Records are matched on
+        their raw fields and only the matches are decoded.
+
+        Args:
+            project (Optional[str]): Filter by project name.
+            priority (Optional[str]): Filter by priority level.
+            status (Optional[str]): Filter by status.
+            due_after (Optional[str]): Only tasks due strictly after this date.
+            due_before (Optional[str]): Only tasks due strictly before this date.
+
+        Returns:
+            List[Task]: The matching tasks, in ID order.
+        """
+        project_key = project.encode('utf-8') if project else None
+        priority_key = priority.encode('utf-8').ljust(8, b"\0") if priority else None
+        status_key = status.encode('utf-8').ljust(8, b"\0") if status else None
+        after_key = due_after.encode('utf-8') if due_after else None
+        before_key = due_before.encode('utf-8') if due_before else None
+        with self.locked():
+            if not self._open():
+                return []
+            heap = self._heap_map
+            tasks = []
+            for task_id, fields in self._records(self._header()[1]):
+                flags = fields[0]
+                if not flags & LIVE:
+                    continue
+                if priority_key is not None and fields[2] != priority_key:
+                    continue
+                if status_key is not None and fields[1] != status_key:
+                    continue
+                if project_key is not None and not (flags & HAS_PROJECT and fields[7] == len(project_key)
+                                                    and heap[fields[6]:fields[6] + fields[7]] == project_key):
+                    continue
+                if (after_key or before_key) and not (flags & HAS_DUE and (not after_key or fields[10] > after_key)
+                                                      and (not before_key or fields[10] < before_key)):
+                    continue
+                tasks.append(self._decode(task_id, fields))
+        return tasks
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """
+        Returns the task with the given ID by reading its record directly.
+
+        Args:
+            task_id (int): The ID of the task.
+
+        Returns:
+            Optional[Task]: The task if found, else None.
+        """
+        with self.locked():
+            record = self._record(task_id, self._header()[1]) if self._open() else None
+            return self._decode(task_id, record) if record is not None else None
+
+    def has_pending_title(self, title: str, exclude: Iterable[int] = ()) -> bool:
+        """
+        Checks whether a task with this title is still pending, comparing the
+        heap bytes only of records whose title has the same length.
+
+        Args:
+            title (str): The title to look for.
+            exclude (Iterable[int]): IDs of tasks to ignore.
+
+        Returns:
+            bool: True if a task with this title is not done.
+        """
+        key = title.encode('utf-8')
+        exclude = set(exclude)
+        with self.locked():
+            if not self._open():
+                return False
+            heap = self._heap_map
+            for task_id, fields in self._records(self._header()[1]):
+                if (fields[0] & LIVE and fields[5] == len(key) and fields[1] != _STATUS_DONE
+                        and heap[fields[4]:fields[4] + fields[5]] == key and task_id not in exclude):
+                    return True
+        return False
+
+    def max_id(self) -> int:
+        """
+        Returns the highest task ID ever handed out, from the header. IDs of
+        deleted tasks are not reused.
+
+        Returns:
+            int: The highest ID, or 0 if there have been no tasks.
+        """
+        with self.locked():
+            return self._header()[1] if self._open() else 0
@@ -0,0 +1,89 @@
+import marshal
+import os
+from dataclasses import fields
+from typing import List, Optional
+from .models import Task
+
+# Bump when the cache layout changes. The Task field names are stored too, so
+# adding or renaming a field invalidates old caches automatically.
+CACHE_VERSION = 1
+TASK_FIELDS = tuple(f.name for f in fields(Task))
+
+
+class SnapshotCache:
+    """
+    A binary sidecar holding the decoded records of a JSON task file.
+
+    The cache stores each task as a tuple of field values, serialized with
+    ``marshal``, behind a length-prefixed header with the schema version and the mtime, size
+    and inode of the JSON file it was built from (saves replace the file, so
+    each one gets a new inode). It is only used when that header still
+    matches the JSON file; otherwise callers fall back to parsing the JSON.
+
+    Attributes:
+        path (str): The path of the cache file.
+    """
+    def __init__(self, path: str):
+        """
+        Initializes the SnapshotCache.
+
+        Args:
+            path (str): The path of the cache file.
+        """
+        self.path = path
+
+    @staticmethod
+    def _signature(stat: os.stat_result) -> tuple:
+        return (CACHE_VERSION, TASK_FIELDS, stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def load(self, stat: os.stat_result) -> Optional[List[Task]]:
+        """
+        Returns the cached tasks if the cache matches the given file state.
+
+        Args:
+            stat (os.stat_result): The current stat of the JSON file.
+
+        Returns:
+            Optional[List[Task]]: The tasks, or None if the cache is missing,
+                                  stale or unreadable.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                header_size = int.from_bytes(f.read(4), 'little')
+                if marshal.loads(f.read(header_size)) != self._signature(stat):
+                    return None
+                # marshal.loads on one buffer is far faster than marshal.load on a file
+                rows = marshal.loads(f.read())
+            return [Task(*row) for row in rows]
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def store(self, tasks: List[Task], stat: os.stat_result):
+        """
+        Writes the cache for the given tasks and JSON file state atomically.
+
+        Failures are ignored; the cache is only an accelerator.
+
+        Args:
+            tasks (List[Task]): The tasks stored in the JSON file.
+            stat (os.stat_result): The stat of the JSON file they came from.
+        """
+        rows = [tuple(getattr(task, name) for name in TASK_FIELDS) for task in tasks]
+        temp_name = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            header = marshal.dumps(self._signature(stat))
+            with open(temp_name, 'wb') as f:
+                f.write(len(header).to_bytes(4, 'little'))
+                f.write(header)
+                f.write(marshal.dumps(rows))
+            os.replace(temp_name, self.path)
+        except (OSError, ValueError):
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+
+    def clear(self):
+        """
+        Removes the cache file if it exists.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,170 @@
+import json
+import os
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+from . import profiling
+from .models import Task
+from .storage import FileLockMixin
+
+# Bytes per sequence index entry: the log offset of one change
+INDEX_ENTRY_SIZE = 8
+
+
+class ChangeFeed(FileLockMixin):
+    """
+    An append-only feed of task changes, stamped with a growing sequence number.
+
+    Every commit appends one JSON line per task it touched to the log
+    (``<file>.changes``): ``{"seq": N, "id": ID, "op": "put", "task": {...}}``
+    with the task as saved, or a ``{"seq": N, "id": ID, "op": "delete"}``
+    tombstone. The sequence index (``<file>.changes.idx``) holds the log
+    offset of every sequence number as fixed-size entries, so reading the
+    changes after a sequence number seeks straight to them and costs time
+    proportional to the number of changes read, not to the number of tasks.
+    The high-water mark, the last sequence number handed out, is the number
+    of index entries.
+
+    The feed starts with the first commit or read that finds no index. It is
+    seeded with a put for every stored task at that point, so a consumer
+    reading from 0 gets the whole task list followed by every later change,
+    even on a store that predates the feed.
+
+    Appends serialize through an exclusive lock on ``<file>.changes.lock``.
+    A line is written before its index entry; a line left without one by a
+    crash is dropped by the next append, and so is a torn index entry.
+
+    Attributes:
+        path (str): The path of the log.
+        index_path (str): The path of the sequence index.
+    """
+    def __init__(self, path: str):
+        """
+        Initializes the ChangeFeed. Nothing is read until needed.
+
+        Args:
+            path (str): The path of the log, usually ``<storage.file_path>.changes``.
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        self.lock_path = path + ".lock"
+
+    def high_water_mark(self) -> int:
+        """
+        Returns the last sequence number handed out, or 0 if none.
+        """
+        try:
+            return os.path.getsize(self.index_path) // INDEX_ENTRY_SIZE
+        except FileNotFoundError:
+            return 0
+
+    def record(self, changed: Iterable[Task], deleted: Iterable[int], snapshot: Optional[Callable[[], Iterable[Task]]] = None) -> int:
+        """
+        Appends a commit's changes, one sequence number per task. Called by
+        TaskManager after every successful persist.
+
+        Args:
+            changed (Iterable[Task]): Tasks that were added or modified.
+            deleted (Iterable[int]): IDs of tasks that were removed.
+            snapshot (Optional[Callable[[], Iterable[Task]]]): Returns the
+                stored tasks, this commit included; used instead of the
+                changes when this commit starts the feed.
+
+        Returns:
+            int: The new high-water mark.
+        """
+        entries = [(task.id, task.to_dict()) for task in changed] + [(task_id, None) for task_id in deleted]
+        if not entries:
+            return self.high_water_mark()
+        with self.locked(), profiling.span("changes.record"):
+            if snapshot is not None and not os.path.exists(self.index_path):
+                entries = [(task.id, task.to_dict()) for task in snapshot()]
+            seq = self._append(entries)
+        profiling.count("changes_recorded", len(entries))
+        return seq
+
+    def _append(self, entries) -> int:
+        """
+        Writes (id, task dict or None for a tombstone) entries with the next
+        sequence numbers, creating the files if needed. Called with the lock
+        held.
+
+        Returns:
+            int: The new high-water mark.
+        """
+        with open(self.index_path, 'a+b') as index, open(self.path, 'a+b') as log:
+            seq = index.seek(0, os.SEEK_END) // INDEX_ENTRY_SIZE
+            index.truncate(seq * INDEX_ENTRY_SIZE)
+            end = self._log_end(index, log, seq)
+            log.truncate(end)
+            lines = []
+            offsets = []
+            for task_id, item in entries:
+                seq += 1
+                if item is None:
+                    change = {"seq": seq, "id": task_id, "op": "delete"}
+                else:
+                    change = {"seq": seq, "id": task_id, "op": "put", "task": item}
+                line = (json.dumps(change) + "\n").encode('utf-8')
+                offsets.append(end)
+                end += len(line)
+                lines.append(line)
+            log.write(b"".join(lines))
+            log.flush()
+            index.write(b"".join(offset.to_bytes(INDEX_ENTRY_SIZE, 'little') for offset in offsets))
+        return seq
+
+    @staticmethod
+    def _log_end(index, log, seq: int) -> int:
+        """
+        Returns the log offset just past the line of sequence number ``seq``.
+        """
+        if seq == 0:
+            return 0
+        index.seek((seq - 1) * INDEX_ENTRY_SIZE)
+        offset = int.from_bytes(index.read(INDEX_ENTRY_SIZE), 'little')
+        log.seek(offset)
+        return offset + len(log.readline())
+
+    def read(self, since: int = 0, snapshot: Optional[Callable[[], Iterable[Task]]] = None) -> Tuple[Iterator[dict], int]:
+        """
+        Returns the changes stamped after a sequence number, oldest first,
+        with the high-water mark they run up to.
+
+        The changes are read lazily, and only those up to the returned mark,
+        so a consumer can store the mark and pass it as ``since`` next time.
+
+        Args:
+            since (int): The last sequence number already seen; 0 for all.
+            snapshot (Optional[Callable[[], Iterable[Task]]]): Returns the
+                stored tasks; seeds the feed if this read starts it.
+
+        Returns:
+            Tuple[Iterator[dict], int]: The changes and the high-water mark.
+
+        Raises:
+            ValueError: If since is negative.
+        """
+        if since < 0:
+            raise ValueError("Sequence numbers are not negative")
+        if not os.path.exists(self.index_path):
+            with self.locked():
+                if not os.path.exists(self.index_path):
+                    self._append([(task.id, task.to_dict()) for task in snapshot()] if snapshot is not None else [])
+        mark = self.high_water_mark()
+        return self._iter(since, mark), mark
+
+    def _iter(self, since: int, mark: int) -> Iterator[dict]:
+        """
+        Yields the changes with sequence numbers in ``(since, mark]``.
+        """
+        if since >= mark:
+            return
+        with open(self.index_path, 'rb') as index:
+            index.seek(since * INDEX_ENTRY_SIZE)
+            offset = int.from_bytes(index.read(INDEX_ENTRY_SIZE), 'little')
+        with open(self.path, 'rb') as log:
+            log.seek(offset)
+            for line in log:
+                change = json.loads(line)
+                if change["seq"] > mark:
+                    return
+                yield change
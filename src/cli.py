@@ -1,22 +1,34 @@
 import os
+import sys
 import argparse
-from .manager import TaskManager
-from .storage import Storage
+import json
+from itertools import chain, islice
+from . import profiling
+from .constants import BACKENDS, SORT_FIELDS, STORAGE_FORMATS
 
-def main(storage_path: str = None):
-    """
-    The main entry point for the Task CLI application.
+# Subcommands a running daemon serves. The others read or write files or
+# stdin/stdout of the caller and always run in-process.
+DAEMON_COMMANDS = ("add", "update", "list", "delete", "done", "search", "overdue", "agenda", "rollover", "archive", "stats")
+# Commands after which the TASK_CLI_ARCHIVE_AFTER_DAYS policy runs
+AUTO_ARCHIVE_COMMANDS = ("add", "update", "delete", "done", "rollover", "import")
+# Lines of `list` output joined into one write
+RENDER_CHUNK_ROWS = 4096
 
-    Args:
-        storage_path (str): The path to the JSON file where tasks are stored.
+# Only the modules needed to parse arguments are imported at startup. The
+# manager, storage and export modules are imported once a command needs them,
+# so `--help` and usage errors never pay for them or for loading tasks.
+
+def build_parser() -> argparse.ArgumentParser:
     """
-    if storage_path is None:
-        storage_path = os.path.join(os.path.expanduser("~"), ".ojt-tasks.json")
-        
-    storage = Storage(storage_path)
-    manager = TaskManager(storage)
+    Builds the argument parser for every subcommand.
 
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
     parser = argparse.ArgumentParser(description="Task CLI")
+    parser.add_argument("--profile", action="store_true", help="Print a timing breakdown of the command to stderr (or set TASK_CLI_PROFILE=1)")
+    parser.add_argument("--profile-format", choices=["text", "json"], help="Format of the --profile report (default: text, or TASK_CLI_PROFILE=json)")
+    parser.add_argument("--profile-cprofile", metavar="FILE", help="Write a cProfile dump of the command to FILE")
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
 
     # Add command
@@ -25,7 +37,7 @@ def main(storage_path: str = None):
     add_parser.add_argument("--project", help="Project name")
     add_parser.add_argument("--priority", choices=["Low", "Medium", "High"], default="Medium", help="Task priority")
     add_parser.add_argument("--recurrence", help="Recurrence pattern (e.g., daily, weekly)")
-    add_parser.add_argument("--due-date", help="Due date (YYYY-MM-DD)")
+    add_parser.add_argument("--due-date", help="Due date (YYYY-MM-DD, today, tomorrow or +N days)")
 
     # Update command
     update_parser = subparsers.add_parser("update", help="Update a task")
@@ -35,12 +47,28 @@ def main(storage_path: str = None):
     update_parser.add_argument("--priority", choices=["Low", "Medium", "High"], help="New priority")
     update_parser.add_argument("--recurrence", help="New recurrence")
     update_parser.add_argument("--status", choices=["pending", "done"], help="New status")
-    update_parser.add_argument("--due-date", help="New due date (YYYY-MM-DD)")
+    update_parser.add_argument("--due-date", help="New due date (YYYY-MM-DD, today, tomorrow or +N days)")
 
     # List command
     list_parser = subparsers.add_parser("list", help="List tasks")
     list_parser.add_argument("--project", help="Filter by project")
     list_parser.add_argument("--priority", help="Filter by priority")
+    list_parser.add_argument("--status", choices=["pending", "done"], help="Filter by status")
+    list_parser.add_argument("--due-before", help="Only tasks due before this date")
+    list_parser.add_argument("--due-after", help="Only tasks due after this date")
+    list_parser.add_argument("--include-archived", action="store_true", help="Also list archived tasks")
+    list_parser.add_argument("--sort", choices=SORT_FIELDS, help="Order by this field instead of insertion order")
+    list_parser.add_argument("--reverse", action="store_true", help="Reverse the order")
+    list_parser.add_argument("--limit", type=int, help="Show at most this many tasks")
+    list_parser.add_argument("--offset", type=int, default=0, help="Skip this many tasks first (default: 0)")
+    list_parser.add_argument("--format", choices=["table", "jsonl"], default="table", help="Output format (default: table)")
+
+    # Overdue command
+    subparsers.add_parser("overdue", help="List pending tasks past their due date")
+
+    # Agenda command
+    agenda_parser = subparsers.add_parser("agenda", help="List pending tasks due in the coming days")
+    agenda_parser.add_argument("--days", type=int, default=7, help="Number of days to cover, including today (default: 7)")
 
     # Delete command
     delete_parser = subparsers.add_parser("delete", help="Delete a task")
@@ -50,11 +78,216 @@ def main(storage_path: str = None):
     done_parser = subparsers.add_parser("done", help="Mark task as done")
     done_parser.add_argument("id", type=int, help="Task ID")
 
+    # Rollover command
+    rollover_parser = subparsers.add_parser("rollover", help="Create the missed occurrences of recurring tasks")
+    rollover_parser.add_argument("--until", help="Last due date to generate (default: today)")
+
+    # Archive command
+    archive_parser = subparsers.add_parser("archive", help="Move completed tasks into the compressed archive")
+    archive_parser.add_argument("--older-than", type=int, default=0, metavar="DAYS", help="Only tasks completed at least DAYS days ago (default: 0)")
+
+    # Stats command
+    stats_parser = subparsers.add_parser("stats", help="Show task counts, completion throughput and lead times")
+    stats_parser.add_argument("--recompute", action="store_true", help="Rebuild the stored counters from every task and report whether they were correct")
+
+    # Search command
+    search_parser = subparsers.add_parser("search", help="Search task titles and projects")
+    search_parser.add_argument("query", nargs="+", help="Words to match; use OR between alternatives and word* for prefixes")
+    search_parser.add_argument("--limit", type=int, default=20, help="Maximum number of results (default: 20, 0 for all)")
+
+    # Changes command
+    changes_parser = subparsers.add_parser("changes", help="Print the changes committed after a sequence number as JSON lines")
+    changes_parser.add_argument("--since", type=int, default=0, metavar="SEQ", help="Last sequence number already seen (default: 0, all changes)")
+
     # Export command
-    export_parser = subparsers.add_parser("export", help="Export tasks to CSV")
-    export_parser.add_argument("filename", nargs="?", default="tasks.csv", help="Output CSV filename (default: tasks.csv)")
+    export_parser = subparsers.add_parser("export", help="Export tasks to CSV, TSV or JSONL")
+    export_parser.add_argument("filename", nargs="?", default="tasks.csv", help="Output filename, or - for stdout (default: tasks.csv)")
+    export_parser.add_argument("--project", help="Filter by project")
+    export_parser.add_argument("--priority", help="Filter by priority")
+    export_parser.add_argument("--status", choices=["pending", "done"], help="Filter by status")
+    export_parser.add_argument("--columns", help="Comma-separated columns to include (e.g. id,title,due_date)")
+    export_parser.add_argument("--format", choices=["csv", "tsv", "jsonl"], help="Output format (default: from the file extension, else csv)")
+    export_parser.add_argument("--gzip", action="store_true", help="Compress the output (implied by a .gz filename)")
+    export_parser.add_argument("--include-archived", action="store_true", help="Also export archived tasks")
+
+    # Import command
+    import_parser = subparsers.add_parser("import", help="Import tasks from a CSV, TSV or JSONL file")
+    import_parser.add_argument("filename", help="File to import (use - for stdin)")
+    import_parser.add_argument("--format", choices=["csv", "tsv", "jsonl"], help="File format (default: from the file extension)")
+    import_parser.add_argument("--on-duplicate", choices=["skip", "allow", "fail"], default="skip", help="How to handle titles that are already pending (default: skip)")
+
+    # Migrate command
+    migrate_parser = subparsers.add_parser("migrate", help="Copy all tasks into another storage backend")
+    migrate_parser.add_argument("--to", dest="target", choices=BACKENDS, required=True, help="Backend to copy tasks into")
+    migrate_parser.add_argument("--from", dest="source", choices=BACKENDS, default="json", help="Backend to copy tasks from (default: json)")
+    migrate_parser.add_argument("--format", choices=STORAGE_FORMATS, help="File format for a json or journal target; with the same backend, converts the file in place")
+
+    # Daemon command
+    daemon_parser = subparsers.add_parser("daemon", help="Serve commands from memory over a Unix socket")
+    daemon_parser.add_argument("--commit-delay", type=float, default=2.0, help="Milliseconds to wait for more writes before committing a group (default: 2)")
+
+    return parser
 
+def main(storage_path: str = None):
+    """
+    The main entry point for the Task CLI application.
+
+    Args:
+        storage_path (str): The path to the JSON file where tasks are stored.
+    """
+    if storage_path is None:
+        storage_path = os.path.join(os.path.expanduser("~"), ".ojt-tasks.json")
+
+    parser = build_parser()
     args = parser.parse_args()
+    if args.command is None:
+        parser.print_help()
+        return
+
+    profile_env = os.environ.get("TASK_CLI_PROFILE", "")
+    profile_format = args.profile_format or ("json" if profile_env == "json" else "text")
+    profile = args.profile or profile_env not in ("", "0") or args.profile_cprofile
+
+    # Hand the command to a running daemon, if any; profiling runs locally
+    if args.command in DAEMON_COMMANDS and not profile and os.environ.get("TASK_CLI_DAEMON", "1") != "0":
+        socket_path = storage_path + ".sock"
+        if os.path.exists(socket_path):
+            from .client import send_command
+            if send_command(socket_path, sys.argv[1:]):
+                return
+
+    if args.command == "daemon":
+        from .daemon import serve
+        serve(storage_path, commit_delay=args.commit_delay / 1000)
+        return
+
+    if args.profile or profile_env not in ("", "0"):
+        profiling.enable()
+    profiler = None
+    if args.profile_cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        with profiling.span("command"):
+            from .manager import TaskManager
+            from .storage import open_storage
+
+            # Tasks are loaded lazily, only by the commands that read them
+            manager = TaskManager(open_storage(storage_path))
+            run_command(manager, args, storage_path)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_cprofile)
+        if profiling.is_enabled():
+            print(profiling.format_report(profile_format), file=sys.stderr)
+
+def _table_lines(tasks):
+    """
+    Yields the lines of the table shown by `list`, or a notice if there are
+    no tasks.
+    """
+    empty = True
+    for task in tasks:
+        if empty:
+            yield f"{'ID':<5} {'Title':<30} {'Project':<15} {'Priority':<10} {'Status':<10} {'Recurrence':<12} {'Due Date':<12}\n"
+            yield "-" * 108 + "\n"
+            empty = False
+        project = task.project if task.project else ""
+        recurrence = task.recurrence if task.recurrence else ""
+        due_date = task.due_date if task.due_date else ""
+        yield f"{task.id:<5} {task.title[:28]:<30} {project[:13]:<15} {task.priority:<10} {task.status:<10} {recurrence[:10]:<12} {due_date:<12}\n"
+    if empty:
+        yield "No tasks found.\n"
+
+def print_tasks(tasks, fmt: str = "table"):
+    """
+    Prints tasks as the table shown by `list`, or as JSON Lines.
+
+    Lines are joined and written RENDER_CHUNK_ROWS at a time rather than
+    printed one by one. Iterators are consumed lazily.
+
+    Args:
+        tasks (Iterable[Task]): The tasks to print.
+        fmt (str): "table" or "jsonl".
+    """
+    if fmt == "jsonl":
+        from .exporter import DEFAULT_COLUMNS, iter_json_lines
+        lines = iter_json_lines(tasks, DEFAULT_COLUMNS)
+    else:
+        lines = _table_lines(tasks)
+    while True:
+        chunk = "".join(islice(lines, RENDER_CHUNK_ROWS))
+        if not chunk:
+            break
+        sys.stdout.write(chunk)
+
+def format_duration(seconds: float) -> str:
+    """
+    Formats a duration in the largest unit that keeps it above one.
+
+    Args:
+        seconds (float): The duration.
+
+    Returns:
+        str: e.g. "45s", "12.0m", "3.5h" or "2.1d".
+    """
+    for unit, size in (("d", 86400), ("h", 3600), ("m", 60)):
+        if seconds >= size:
+            return f"{seconds / size:.1f}{unit}"
+    return f"{seconds:.0f}s"
+
+def print_stats(stats):
+    """
+    Prints the report shown by `stats`.
+
+    Args:
+        stats (Stats): The aggregates to report.
+    """
+    from .dates import add_days, today
+
+    def breakdown(counts):
+        return ", ".join(f"{key or '(none)'} {count}" for key, count in sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    day = today().isoformat()
+    lines = [f"Tasks: {stats.total}"]
+    for field in ("status", "priority", "project"):
+        if stats.counts[field]:
+            lines.append(f"By {field}: {breakdown(stats.counts[field])}")
+    lines.append(f"Completed: {stats.completed_since(day)} today, {stats.completed_since(add_days(day, -6))} in 7 days, "
+                 f"{stats.completed_since(add_days(day, -29))} in 30 days")
+    if stats.lead_count > 0:
+        percentiles = ", ".join(f"p{p} {format_duration(stats.lead_time_percentile(p))}" for p in (50, 90, 99))
+        lines.append(f"Lead time ({stats.lead_count} tasks): mean {format_duration(stats.lead_time_mean())}, {percentiles}")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+def auto_archive(manager):
+    """
+    Applies the TASK_CLI_ARCHIVE_AFTER_DAYS policy: once a day, archives the
+    tasks completed at least that many days ago. Does nothing if unset.
+
+    Args:
+        manager (TaskManager): The manager to archive from.
+    """
+    days = os.environ.get("TASK_CLI_ARCHIVE_AFTER_DAYS", "")
+    if days.isdigit() and manager.archive is not None:
+        manager.auto_archive(int(days))
+
+def run_command(manager, args: argparse.Namespace, storage_path: str, prompt=None):
+    """
+    Runs one parsed subcommand against a TaskManager.
+
+    Args:
+        manager (TaskManager): The manager to operate on.
+        args (argparse.Namespace): The parsed arguments.
+        storage_path (str): The path to the JSON file where tasks are stored.
+        prompt (callable): Asks the user a yes/no question and returns the
+                           answer. Defaults to ``input``.
+    """
+    if prompt is None:
+        prompt = input
 
     if args.command == "add":
         try:
@@ -62,7 +295,7 @@ def main(storage_path: str = None):
             print(f"Task added: {task.id} - {task.title}")
         except ValueError as e:
             if str(e) == "Task already exists":
-                confirm = input(f"Task '{args.title}' already exists. Do you want to add it anyway? (y/n): ")
+                confirm = prompt(f"Task '{args.title}' already exists. Do you want to add it anyway? (y/n): ")
                 if confirm.lower() == 'y':
                     task = manager.add_task(args.title, args.project, args.priority, args.recurrence, args.due_date, allow_duplicates=True)
                     print(f"Task added: {task.id} - {task.title}")
@@ -72,28 +305,41 @@ def main(storage_path: str = None):
                 print(f"Error: {e}")
     
     elif args.command == "list":
-        tasks = manager.list_tasks(args.project, args.priority)
-        if not tasks:
-            print("No tasks found.")
-        else:
-            print(f"{'ID':<5} {'Title':<30} {'Project':<15} {'Priority':<10} {'Status':<10} {'Recurrence':<12} {'Due Date':<12}")
-            print("-" * 108)
-            for task in tasks:
-                project = task.project if task.project else ""
-                recurrence = task.recurrence if task.recurrence else ""
-                due_date = task.due_date if task.due_date else ""
-                print(f"{task.id:<5} {task.title[:28]:<30} {project[:13]:<15} {task.priority:<10} {task.status:<10} {recurrence[:10]:<12} {due_date:<12}")
+        from .manager import page_tasks
+
+        try:
+            tasks = manager.list_tasks(args.project, args.priority, args.status, due_before=args.due_before, due_after=args.due_after)
+            if args.include_archived:
+                archived = manager.archived_tasks(args.project, args.priority, args.status, due_before=args.due_before,
+                                                  due_after=args.due_after, exclude=(task.id for task in tasks))
+                tasks = chain(tasks, archived)
+            if args.sort or args.reverse or args.limit is not None or args.offset:
+                tasks = page_tasks(tasks, args.sort, args.reverse, args.limit, args.offset)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print_tasks(tasks, args.format)
+
+    elif args.command == "overdue":
+        print_tasks(manager.overdue_tasks())
+
+    elif args.command == "agenda":
+        print_tasks(manager.agenda(args.days))
 
     elif args.command == "update":
-        task = manager.update_task(
-            args.id, 
-            title=args.title, 
-            project=args.project, 
-            priority=args.priority, 
-            recurrence=args.recurrence, 
-            status=args.status,
-            due_date=args.due_date
-        )
+        try:
+            task = manager.update_task(
+                args.id, 
+                title=args.title, 
+                project=args.project, 
+                priority=args.priority, 
+                recurrence=args.recurrence, 
+                status=args.status,
+                due_date=args.due_date
+            )
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
         if task:
             print(f"Task {task.id} updated.")
         else:
@@ -101,11 +347,10 @@ def main(storage_path: str = None):
 
     elif args.command == "delete":
         # Check if task is pending before deleting
-        tasks = manager.list_tasks()
-        task_to_delete = next((t for t in tasks if t.id == args.id), None)
+        task_to_delete = manager.get_task_by_id(args.id)
         
         if task_to_delete and task_to_delete.status == "pending":
-            confirm = input(f"Task {args.id} is pending. Are you sure you want to delete it? (y/n): ")
+            confirm = prompt(f"Task {args.id} is pending. Are you sure you want to delete it? (y/n): ")
             if confirm.lower() != 'y':
                 print("Deletion cancelled.")
                 return
@@ -121,15 +366,109 @@ def main(storage_path: str = None):
         else:
             print(f"Task {args.id} not found.")
 
+    elif args.command == "rollover":
+        try:
+            counts = manager.rollover(args.until)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print(f"Created {counts['created']} tasks for {counts['series']} recurring series.")
+
+    elif args.command == "archive":
+        try:
+            count = manager.archive_tasks(args.older_than)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print(f"Archived {count} tasks.")
+
+    elif args.command == "stats":
+        if args.recompute:
+            result = manager.recompute_stats()
+            print("Stored counters were correct." if result["matched"] else "Stored counters were missing or wrong; rebuilt them.")
+            print_stats(result["stats"])
+        else:
+            print_stats(manager.stats())
+
+    elif args.command == "search":
+        hits = manager.search_tasks(" ".join(args.query), args.limit or None)
+        if not hits:
+            print("No tasks found.")
+        else:
+            print(f"{'ID':<5} {'Title':<30} {'Project':<15} {'Status':<10} {'Score':>6}")
+            print("-" * 70)
+            for hit in hits:
+                project = hit.project if hit.project else ""
+                print(f"{hit.id:<5} {hit.title[:28]:<30} {project[:13]:<15} {hit.status:<10} {hit.score:>6.2f}")
+
+    elif args.command == "changes":
+        try:
+            changes, mark = manager.changes(args.since)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        for change in changes:
+            print(json.dumps(change))
+        print(json.dumps({"high_water_mark": mark}))
+
     elif args.command == "export":
+        from .exporter import detect_format, parse_columns
+
         try:
-            manager.export_tasks_to_csv(args.filename)
-            print(f"Tasks exported to {args.filename}")
+            fmt = args.format or detect_format(args.filename)
+            compress = args.gzip or args.filename.endswith(".gz")
+            manager.export_tasks(
+                args.filename,
+                fmt=fmt,
+                columns=parse_columns(args.columns),
+                project=args.project,
+                priority=args.priority,
+                status=args.status,
+                compress=compress,
+                include_archived=args.include_archived
+            )
+            if args.filename != "-":
+                print(f"Tasks exported to {args.filename}")
+        except BrokenPipeError:
+            # The reader of stdout went away (e.g. `| head`); stop quietly
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
         except Exception as e:
-            print(f"Error exporting tasks: {e}")
+            print(f"Error exporting tasks: {e}", file=sys.stderr if args.filename == "-" else sys.stdout)
 
-    else:
-        parser.print_help()
+    elif args.command == "import":
+        reported = []
+
+        def report(rows):
+            reported.append(rows)
+            print(f"\rRead {rows} rows...", end="", file=sys.stderr, flush=True)
+
+        try:
+            counts = manager.import_tasks(args.filename, args.format, args.on_duplicate, progress=report)
+        except (ValueError, OSError) as e:
+            print(f"Error importing tasks: {e}")
+            return
+        finally:
+            if reported:
+                print(file=sys.stderr)
+        print(f"Imported {counts['imported']} tasks ({counts['skipped']} duplicates skipped).")
+
+    elif args.command == "migrate":
+        from .storage import open_storage, migrate_storage
+
+        if args.source == args.target and not args.format:
+            print("Error: source and target backends are the same.")
+            return
+        source = open_storage(storage_path, args.source)
+        target = open_storage(storage_path, args.target, fmt=args.format)
+        count = migrate_storage(source, target)
+        if args.source == args.target:
+            print(f"Converted {count} tasks to {args.format}.")
+        else:
+            print(f"Migrated {count} tasks from {args.source} to {args.target}.")
+
+    if args.command in AUTO_ARCHIVE_COMMANDS:
+        auto_archive(manager)
 
 if __name__ == "__main__":
     main("tasks.json")
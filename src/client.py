@@ -0,0 +1,52 @@
+import json
+import socket
+import sys
+from typing import List
+
+# Client side of the daemon protocol (see daemon.py). Kept free of heavy
+# imports so that commands sent to a daemon start as fast as `--help`.
+
+def send_command(socket_path: str, argv: List[str]) -> bool:
+    """
+    Runs a command on the daemon listening on ``socket_path`` and prints its
+    output.
+
+    When the command asks a question, the question is shown here and the
+    command is sent again with the collected answers.
+
+    Args:
+        socket_path (str): The daemon's Unix socket.
+        argv (List[str]): The command line arguments, without the program name.
+
+    Returns:
+        bool: True if the daemon ran the command, False if no daemon answered
+              and the caller should run it in-process.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            return False
+
+        answers = []
+        with sock.makefile('rwb') as stream:
+            while True:
+                try:
+                    stream.write(json.dumps({"argv": argv, "answers": answers}).encode() + b"\n")
+                    stream.flush()
+                    line = stream.readline()
+                except OSError:
+                    line = b""
+                if not line:
+                    if answers:
+                        # The daemon went away after starting a conversation
+                        print("Error: task daemon closed the connection.", file=sys.stderr)
+                        return True
+                    return False
+                response = json.loads(line)
+                if "prompt" in response:
+                    answers.append(input(response["prompt"]))
+                    continue
+                sys.stdout.write(response.get("stdout", ""))
+                sys.stderr.write(response.get("stderr", ""))
+                return True
@@ -0,0 +1,162 @@
+import json
+import os
+import sys
+from dataclasses import MISSING, fields
+from typing import Callable, Dict, Iterable, Iterator, Tuple
+
+# Records encoded per write by encode_batches.
+ENCODE_BATCH = 4096
+
+# Opt-in: TASK_CLI_FAST_JSON=1 parses and encodes task files with orjson, if
+# installed. It is only imported then, to keep it out of CLI startup.
+orjson = None
+FAST_JSON = False
+if os.environ.get("TASK_CLI_FAST_JSON") == "1":
+    try:
+        import orjson
+        FAST_JSON = True
+    except ImportError:  # optional: pip install orjson
+        pass
+
+_compact_encoder = json.JSONEncoder(separators=(',', ':'))
+
+
+def compile_encoder(cls) -> Callable[[object], dict]:
+    """
+    Generates a function converting instances of a dataclass to dicts.
+
+    The function reads each field by name into a dict literal, which is
+    several times faster than ``dataclasses.asdict``: it makes no copies and
+    does not recurse, which is all flat records need.
+
+    Args:
+        cls (type): The dataclass.
+
+    Returns:
+        Callable[[object], dict]: The encoder.
+    """
+    items = ", ".join(f"{f.name!r}: obj.{f.name}" for f in fields(cls))
+    namespace = {}
+    exec(f"def encode(obj):\n    return {{{items}}}\n", namespace)
+    return namespace["encode"]
+
+
+def compile_decoder(cls, interned: Tuple[str, ...] = (), factories: Dict[str, Callable[[], object]] = None) -> Callable[[dict], object]:
+    """
+    Generates a function building instances of a slotted dataclass from dicts.
+
+    The function sets each field directly on a new instance, bypassing
+    ``__init__`` and ``__post_init__``, so whatever those do must be given
+    here instead. Unknown keys are ignored and missing keys get the field's
+    default, so records written by newer or older versions still load.
+
+    Args:
+        cls (type): The dataclass.
+        interned (Tuple[str, ...]): Fields whose string values are interned.
+        factories (Dict[str, Callable[[], object]]): Fields computed by a
+            function when missing or empty, e.g. a creation timestamp.
+
+    Returns:
+        Callable[[dict], object]: The decoder. It raises TypeError if a
+                                  field without a default is missing.
+    """
+    factories = factories or {}
+    namespace = {"_new": cls.__new__, "_cls": cls, "_intern": sys.intern}
+    required = []
+    optional = []
+    for f in fields(cls):
+        is_required = f.default is MISSING and f.default_factory is MISSING
+        if is_required:
+            value = f"data[{f.name!r}]"
+        elif f.default is not MISSING:
+            namespace[f"_default_{f.name}"] = f.default
+            value = f"get({f.name!r}, _default_{f.name})"
+        else:
+            namespace[f"_default_{f.name}"] = f.default_factory
+            value = f"data[{f.name!r}] if {f.name!r} in data else _default_{f.name}()"
+        if f.name in factories:
+            namespace[f"_factory_{f.name}"] = factories[f.name]
+            line = f"obj.{f.name} = ({value}) or _factory_{f.name}()"
+        elif f.name in interned:
+            line = f"value = {value}; obj.{f.name} = value if value is None else _intern(value)"
+        else:
+            line = f"obj.{f.name} = {value}"
+        (required if is_required else optional).append(line)
+    lines = ["def decode(data):", "    get = data.get", "    obj = _new(_cls)"]
+    if required:
+        lines.append("    try:")
+        lines += [f"        {line}" for line in required]
+        lines += ["    except KeyError as e:", "        raise TypeError(f'Record is missing {e}') from None"]
+    lines += [f"    {line}" for line in optional]
+    lines.append("    return obj")
+    exec("\n".join(lines) + "\n", namespace)
+    return namespace["decode"]
+
+
+def loads(data):
+    """
+    Parses a JSON document, with orjson in fast mode.
+
+    Args:
+        data (bytes or str): The document.
+
+    Returns:
+        The parsed value.
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON. orjson's
+                              error is a subclass of it.
+    """
+    if FAST_JSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value) -> bytes:
+    """
+    Encodes a value as compact UTF-8 JSON, with orjson in fast mode.
+
+    Args:
+        value: A JSON-serializable value.
+
+    Returns:
+        bytes: The encoded value.
+    """
+    if FAST_JSON:
+        return orjson.dumps(value)
+    return _compact_encoder.encode(value).encode('utf-8')
+
+
+def encode_batches(records: Iterable[dict], separator: bytes = b"\n") -> Iterator[bytes]:
+    """
+    Encodes records compactly, ``ENCODE_BATCH`` at a time, for a buffered
+    writer. Records are joined by ``separator``; batches start with it,
+    except the first, so the output never ends with one.
+
+    Args:
+        records (Iterable[dict]): The records, e.g. from ``Task.to_dict``.
+        separator (bytes): Written between two records.
+
+    Yields:
+        bytes: One encoded batch.
+    """
+    batch = []
+    prefix = b""
+    if FAST_JSON:
+        join = separator.join
+        encode = orjson.dumps
+    else:
+        text_join = separator.decode('utf-8').join
+        encode = _compact_encoder.encode
+
+        def join(items):
+            return text_join(items).encode('utf-8')
+
+    for record in records:
+        batch.append(encode(record))
+        if len(batch) == ENCODE_BATCH:
+            yield prefix + join(batch)
+            prefix = separator
+            batch = []
+    if batch:
+        yield prefix + join(batch)
@@ -11,3 +11,12 @@ STATUS_DONE = "done"
 RECURRENCE_DAILY = "daily"
 RECURRENCE_WEEKLY = "weekly"
 RECURRENCE_MONTHLY = "monthly"
+
+# Orders accepted by list --sort
+SORT_FIELDS = ("id", "priority", "due", "created")
+
+# Storage Backends
+BACKENDS = ("json", "journal", "sqlite", "sharded", "binary")
+
+# Task file formats of the json and journal backends
+STORAGE_FORMATS = ("json", "jsonl")
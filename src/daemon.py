@@ -0,0 +1,241 @@
+import asyncio
+import io
+import json
+import os
+import signal
+import socket
+from contextlib import redirect_stderr, redirect_stdout
+from typing import List
+from .cli import DAEMON_COMMANDS, build_parser, run_command
+from .manager import TaskManager
+from .storage import open_storage
+
+# Protocol: one JSON object per line in each direction. A request is
+# {"argv": [...], "answers": [...]}, the command line as typed plus the answers
+# to any questions asked so far. The reply is {"stdout": ..., "stderr": ...},
+# or {"prompt": ...} when the command needs one more answer, in which case the
+# client asks the user and resends the request with the answer appended.
+
+DEFAULT_COMMIT_DELAY = 0.002
+
+class _NeedsAnswer(Exception):
+    """
+    Raised from the daemon's prompt when the request carries no answer for it.
+    """
+    def __init__(self, prompt: str):
+        super().__init__(prompt)
+        self.prompt = prompt
+
+class TaskDaemon:
+    """
+    Serves CLI commands over a Unix socket from a resident TaskManager.
+
+    Requests that arrive together are run as one group inside a single
+    ``manager.batch()``, so they are written with one ``storage.persist`` call
+    (group commit). Replies are sent only after the group is persisted. Before
+    each group the manager drops its tasks if another process changed the
+    storage, so direct `task.py` invocations and the daemon can be mixed.
+
+    Attributes:
+        manager (TaskManager): The manager holding the tasks in memory.
+        storage_path (str): The path of the task file being served.
+        commit_delay (float): Seconds to wait for more requests before
+                              running a group.
+    """
+    def __init__(self, manager: TaskManager, storage_path: str, commit_delay: float = DEFAULT_COMMIT_DELAY):
+        """
+        Initializes the TaskDaemon.
+
+        Args:
+            manager (TaskManager): The manager to run commands against.
+            storage_path (str): The path of the task file being served.
+            commit_delay (float): Seconds to wait for more requests before
+                                  running a group.
+        """
+        self.manager = manager
+        self.storage_path = storage_path
+        self.commit_delay = commit_delay
+        self.parser = build_parser()
+        self._pending = []
+        self._wakeup = None
+        self._stop = None
+        self._loop = None
+
+    async def run(self, socket_path: str):
+        """
+        Listens on ``socket_path`` until ``stop`` is called.
+
+        Args:
+            socket_path (str): The Unix socket to listen on.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stop = asyncio.Event()
+        server = await asyncio.start_unix_server(self._handle, path=socket_path)
+        os.chmod(socket_path, 0o600)
+        committer = asyncio.ensure_future(self._commit_loop())
+        try:
+            await self._stop.wait()
+        finally:
+            server.close()
+            await server.wait_closed()
+            committer.cancel()
+
+    def stop(self):
+        """
+        Stops ``run``. Safe to call from any thread.
+        """
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Answers the requests of one connection, in order.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"stderr": "Error: malformed request.\n"}
+                else:
+                    future = self._loop.create_future()
+                    self._pending.append((request, future))
+                    self._wakeup.set()
+                    response = await future
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _commit_loop(self):
+        """
+        Runs the queued requests in groups as they arrive.
+        """
+        while True:
+            await self._wakeup.wait()
+            if self.commit_delay:
+                await asyncio.sleep(self.commit_delay)
+            self._wakeup.clear()
+            group, self._pending = self._pending, []
+            responses = self.run_group([request for request, _ in group])
+            for (_, future), response in zip(group, responses):
+                if not future.done():
+                    future.set_result(response)
+
+    def run_group(self, requests: List[dict]) -> List[dict]:
+        """
+        Runs requests in one batch and persists their changes together.
+
+        Args:
+            requests (List[dict]): The decoded requests.
+
+        Returns:
+            List[dict]: One reply per request. If persisting fails, every
+                        request in the group gets the error instead.
+        """
+        self.manager.refresh()
+        responses = []
+        try:
+            with self.manager.batch():
+                for request in requests:
+                    responses.append(self.execute(request))
+        except Exception as e:
+            return [{"stderr": f"Error: could not save tasks: {e}\n"} for _ in requests]
+        return responses
+
+    def execute(self, request: dict) -> dict:
+        """
+        Runs one request, capturing what the command prints.
+
+        The command runs in its own nested batch, so a command that fails or
+        stops to ask a question leaves no changes behind.
+
+        Args:
+            request (dict): The decoded request.
+
+        Returns:
+            dict: The reply.
+        """
+        stdout, stderr = io.StringIO(), io.StringIO()
+        answers = list(request.get("answers", ()))
+
+        def prompt(text):
+            if answers:
+                return answers.pop(0)
+            raise _NeedsAnswer(text)
+
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                args = self.parser.parse_args(request.get("argv", []))
+                if args.command not in DAEMON_COMMANDS:
+                    print(f"Error: the daemon does not run '{args.command}'.", file=stderr)
+                else:
+                    with self.manager.batch():
+                        run_command(self.manager, args, self.storage_path, prompt=prompt)
+        except _NeedsAnswer as e:
+            return {"prompt": e.prompt}
+        except SystemExit:
+            # argparse already printed the usage error
+            pass
+        except Exception as e:
+            stderr.write(f"Error: {e}\n")
+        return {"stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+def is_running(socket_path: str) -> bool:
+    """
+    Checks whether a daemon is accepting connections on ``socket_path``.
+
+    Args:
+        socket_path (str): The Unix socket to probe.
+
+    Returns:
+        bool: True if something is listening.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+def serve(storage_path: str, commit_delay: float = DEFAULT_COMMIT_DELAY):
+    """
+    Loads the tasks and serves them on ``<storage_path>.sock`` until
+    interrupted or terminated.
+
+    Args:
+        storage_path (str): The path of the task file to serve.
+        commit_delay (float): Seconds to wait for more requests before
+                              running a group.
+    """
+    socket_path = storage_path + ".sock"
+    if is_running(socket_path):
+        print(f"Error: a daemon is already serving {storage_path}.")
+        return
+    if os.path.exists(socket_path):
+        # Left behind by a daemon that did not shut down cleanly
+        os.remove(socket_path)
+
+    manager = TaskManager(open_storage(storage_path))
+    daemon = TaskDaemon(manager, storage_path, commit_delay)
+    print(f"Serving {len(manager.tasks)} tasks from {storage_path} on {socket_path}")
+
+    async def main():
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, daemon.stop)
+        await daemon.run(socket_path)
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
@@ -0,0 +1,71 @@
+import datetime
+import re
+from typing import Optional
+
+# Due dates are stored as zero-padded ISO dates, so comparing the strings
+# compares the dates and the manager can keep them in a sorted index.
+_DATE = re.compile(r"(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})")
+_RELATIVE = re.compile(r"\+(\d+)([dw]?)")
+
+
+def today() -> datetime.date:
+    """
+    Returns the current local date.
+    """
+    return datetime.date.today()
+
+
+def normalize_due_date(value: str) -> str:
+    """
+    Validates a due date and returns it as YYYY-MM-DD.
+
+    Accepts ISO dates with ``-``, ``/`` or ``.`` separators and unpadded
+    months or days (``2024-1-5``), ``today``, ``tomorrow``, and a number of
+    days or weeks from today (``+3``, ``+3d``, ``+2w``).
+
+    Args:
+        value (str): The date as entered.
+
+    Returns:
+        str: The normalized date.
+
+    Raises:
+        ValueError: If the value is not a valid date.
+    """
+    text = value.strip().lower()
+    if text == "today":
+        return today().isoformat()
+    if text == "tomorrow":
+        return (today() + datetime.timedelta(days=1)).isoformat()
+    match = _RELATIVE.fullmatch(text)
+    if match:
+        days = int(match.group(1)) * (7 if match.group(2) == "w" else 1)
+        return (today() + datetime.timedelta(days=days)).isoformat()
+    match = _DATE.fullmatch(text)
+    if match:
+        try:
+            return datetime.date(*(int(part) for part in match.groups())).isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid due date '{value}', expected YYYY-MM-DD")
+
+
+def add_days(date: str, days: int) -> str:
+    """
+    Shifts a YYYY-MM-DD date by a number of days.
+
+    Args:
+        date (str): The date.
+        days (int): Days to add; may be negative.
+
+    Returns:
+        str: The shifted date.
+    """
+    return (datetime.date.fromisoformat(date) + datetime.timedelta(days=days)).isoformat()
+
+
+def optional_due_date(value: Optional[str]) -> Optional[str]:
+    """
+    Like ``normalize_due_date``, but passes empty values through as None.
+    """
+    return normalize_due_date(value) if value else None
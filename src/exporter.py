@@ -0,0 +1,178 @@
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+from contextlib import contextmanager
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Sequence
+from .importer import CSV_COLUMNS
+from .models import Task
+
+EXPORT_FORMATS = ("csv", "tsv", "jsonl")
+# Export columns in their default order. "Relist Count" is only written when
+# asked for with --columns, so the default output does not change.
+DEFAULT_COLUMNS = ["ID", "Title", "Status", "Priority", "Project", "Recurrence", "Due Date", "Created At", "Completed At"]
+# Rows serialized per write for JSON Lines.
+CHUNK_ROWS = 4096
+# Size of the buffer between the encoder and the output file.
+BUFFER_SIZE = 1024 * 1024
+
+
+def parse_columns(spec: Optional[str]) -> List[str]:
+    """
+    Resolves a comma-separated column list to export header names.
+
+    Columns can be given as header names ("Due Date") or Task field names
+    ("due_date"), in any case.
+
+    Args:
+        spec (Optional[str]): The column list, or None for the default columns.
+
+    Returns:
+        List[str]: Header names, in the requested order.
+
+    Raises:
+        ValueError: If a column is unknown.
+    """
+    if not spec:
+        return list(DEFAULT_COLUMNS)
+    lookup = {}
+    for header, field in CSV_COLUMNS.items():
+        lookup[header.lower()] = header
+        lookup[field] = header
+    columns = []
+    for name in spec.split(","):
+        header = lookup.get(name.strip().lower())
+        if header is None:
+            raise ValueError(f"Unknown column: {name.strip()}")
+        columns.append(header)
+    return columns
+
+
+def detect_format(filename: str) -> str:
+    """
+    Guesses the export format from a file extension, ignoring a trailing ".gz".
+
+    Args:
+        filename (str): The output file name.
+
+    Returns:
+        str: One of EXPORT_FORMATS; "csv" if the extension is not recognised.
+    """
+    name = filename[:-3] if filename.endswith(".gz") else filename
+    extension = os.path.splitext(name)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension == ".tsv":
+        return "tsv"
+    return "csv"
+
+
+def iter_rows(tasks: Iterable[Task], columns: Sequence[str]) -> Iterator[list]:
+    """
+    Yields one list of cell values per task, as written by the CSV writer.
+
+    Missing optional values become empty strings.
+
+    Args:
+        tasks (Iterable[Task]): The tasks to export.
+        columns (Sequence[str]): Header names of the columns to include.
+
+    Yields:
+        list: The cell values of one task.
+    """
+    fields = [CSV_COLUMNS[column] for column in columns]
+    for task in tasks:
+        row = []
+        for field in fields:
+            value = getattr(task, field)
+            row.append("" if value is None else value)
+        yield row
+
+
+def iter_json_lines(tasks: Iterable[Task], columns: Sequence[str]) -> Iterator[str]:
+    """
+    Yields one JSON object per task, keyed by Task field name.
+
+    Args:
+        tasks (Iterable[Task]): The tasks to export.
+        columns (Sequence[str]): Header names of the columns to include.
+
+    Yields:
+        str: A JSON document followed by a newline.
+    """
+    fields = [CSV_COLUMNS[column] for column in columns]
+    dumps = json.dumps
+    for task in tasks:
+        yield dumps({field: getattr(task, field) for field in fields}) + "\n"
+
+
+@contextmanager
+def open_output(filename: str, compress: bool = False):
+    """
+    Opens a buffered text stream for export output.
+
+    Args:
+        filename (str): The output file, or "-" for standard output.
+        compress (bool): Whether to gzip the output.
+
+    Yields:
+        io.TextIOWrapper: The stream. Standard output is flushed but not closed.
+    """
+    to_stdout = filename == "-"
+    raw = sys.stdout.buffer if to_stdout else open(filename, 'wb', buffering=BUFFER_SIZE)
+    target = gzip.GzipFile(fileobj=raw, mode='wb') if compress else raw
+    stream = io.TextIOWrapper(target, encoding='utf-8', newline='')
+    try:
+        yield stream
+    finally:
+        stream.flush()
+        stream.detach()
+        if compress:
+            target.close()
+        if to_stdout:
+            raw.flush()
+        else:
+            raw.close()
+
+
+def write_tasks(stream, tasks: Iterable[Task], fmt: str = "csv", columns: Optional[Sequence[str]] = None) -> int:
+    """
+    Streams tasks to an open text stream.
+
+    Rows are produced lazily from ``tasks``, so no intermediate list is built.
+
+    Args:
+        stream: A text stream opened with ``newline=''``.
+        tasks (Iterable[Task]): The tasks to export.
+        fmt (str): One of EXPORT_FORMATS.
+        columns (Optional[Sequence[str]]): Header names to include, default all.
+
+    Returns:
+        int: The number of tasks written.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    columns = list(columns or DEFAULT_COLUMNS)
+    count = 0
+
+    def counted(items):
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    if fmt == "jsonl":
+        lines = iter_json_lines(counted(tasks), columns)
+        while True:
+            chunk = "".join(islice(lines, CHUNK_ROWS))
+            if not chunk:
+                break
+            stream.write(chunk)
+    else:
+        writer = csv.writer(stream, delimiter="\t" if fmt == "tsv" else ",")
+        writer.writerow(columns)
+        writer.writerows(iter_rows(counted(tasks), columns))
+    return count
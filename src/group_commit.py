@@ -0,0 +1,342 @@
+import asyncio
+import copy
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+from . import profiling
+from .manager import TaskManager
+from .models import Task
+
+DEFAULT_MAX_DELAY = 0.002
+DEFAULT_MAX_BATCH = 256
+
+
+def _detach(result):
+    """
+    Copies a task, or the tasks in a list, so that callers never share the
+    objects the manager keeps mutating on the writer thread.
+    """
+    if isinstance(result, Task):
+        return copy.copy(result)
+    if isinstance(result, list):
+        return [copy.copy(item) if isinstance(item, Task) else item for item in result]
+    return result
+
+
+class GroupCommitManager:
+    """
+    Makes a TaskManager safe to share between threads, and writes the
+    mutations of concurrent callers together.
+
+    Mutations are queued and return a ``concurrent.futures.Future``. A
+    background writer thread takes the queue in groups and runs each group
+    inside one ``manager.batch()``, so the whole group is written with a
+    single ``storage.persist`` call (group commit). A group starts when the
+    first mutation arrives and closes after ``max_delay`` seconds or at
+    ``max_batch`` mutations, whichever comes first. While a group is being
+    written the next one fills up, so the number of writes stays roughly
+    constant as callers are added, instead of growing with them.
+
+    Each mutation runs in its own nested batch: one that raises leaves no
+    changes behind and fails only its own future. A future resolves after
+    its group is persisted, with the method's return value. If persisting
+    fails, every future in the group gets the error and the group's changes
+    are rolled back.
+
+    Reads go through ``read`` (or the shortcuts below), which holds the same
+    lock as the writer, so they never see a half-applied group. Tasks and
+    task lists handed out, by reads and by futures alike, are copies taken
+    under the lock, so later groups do not change them and changing them
+    does not affect the manager.
+
+    Attributes:
+        manager (TaskManager): The wrapped manager. Do not use it directly
+                               while the writer runs.
+        max_delay (float): Seconds a group stays open for more mutations.
+        max_batch (int): Mutations after which a group closes early.
+        lock (threading.RLock): Held while the manager is in use.
+    """
+    def __init__(self, manager: TaskManager, max_delay: float = DEFAULT_MAX_DELAY, max_batch: int = DEFAULT_MAX_BATCH):
+        """
+        Initializes the GroupCommitManager and starts its writer thread.
+
+        Args:
+            manager (TaskManager): The manager to share.
+            max_delay (float): Seconds a group stays open for more mutations.
+            max_batch (int): Mutations after which a group closes early.
+
+        Raises:
+            ValueError: If max_delay is negative or max_batch is less than 1.
+        """
+        if max_delay < 0:
+            raise ValueError("max_delay must not be negative")
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.manager = manager
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.lock = threading.RLock()
+        self._pending = []
+        self._closed = False
+        self._cond = threading.Condition()
+        self._writer = threading.Thread(target=self._write_loop, name="task-group-commit", daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """
+        Queues a call to a TaskManager method for the next group.
+
+        Args:
+            method (str): The name of the method, e.g. ``"add_task"``.
+            *args: Positional arguments for the method.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            Future: Resolves to the method's return value once the group is
+                    persisted, or to the exception it raised.
+
+        Raises:
+            AttributeError: If TaskManager has no such method.
+            RuntimeError: If the manager was closed.
+        """
+        return self._enqueue(getattr(TaskManager, method), args, kwargs)
+
+    def _enqueue(self, function, args: tuple, kwargs: dict) -> Future:
+        """
+        Queues ``function(manager, *args, **kwargs)`` and wakes the writer.
+        """
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("GroupCommitManager is closed")
+            self._pending.append((function, args, kwargs, future))
+            self._cond.notify()
+        return future
+
+    def add_task(self, *args, **kwargs) -> Future:
+        """
+        Queues ``TaskManager.add_task``; the future resolves to the new Task.
+        """
+        return self.submit("add_task", *args, **kwargs)
+
+    def update_task(self, *args, **kwargs) -> Future:
+        """
+        Queues ``TaskManager.update_task``.
+        """
+        return self.submit("update_task", *args, **kwargs)
+
+    def complete_task(self, *args, **kwargs) -> Future:
+        """
+        Queues ``TaskManager.complete_task``.
+        """
+        return self.submit("complete_task", *args, **kwargs)
+
+    def delete_task(self, *args, **kwargs) -> Future:
+        """
+        Queues ``TaskManager.delete_task``.
+        """
+        return self.submit("delete_task", *args, **kwargs)
+
+    def read(self, method: str, *args, **kwargs):
+        """
+        Calls a read-only TaskManager method under the lock.
+
+        Args:
+            method (str): The name of the method, e.g. ``"list_tasks"``.
+            *args: Positional arguments for the method.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            The method's return value, with tasks and lists of tasks copied.
+        """
+        with self.lock:
+            return _detach(getattr(self.manager, method)(*args, **kwargs))
+
+    def list_tasks(self, *args, **kwargs) -> List[Task]:
+        """
+        Calls ``TaskManager.list_tasks`` under the lock.
+        """
+        return self.read("list_tasks", *args, **kwargs)
+
+    def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        """
+        Calls ``TaskManager.get_task_by_id`` under the lock.
+        """
+        return self.read("get_task_by_id", task_id)
+
+    def flush(self, timeout: Optional[float] = None):
+        """
+        Waits until every mutation queued so far is persisted.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait at most.
+
+        Raises:
+            concurrent.futures.TimeoutError: If the timeout expires first.
+        """
+        self._enqueue(lambda manager: None, (), {}).result(timeout)
+
+    def close(self):
+        """
+        Writes the queued mutations and stops the writer thread. Further
+        submissions raise RuntimeError. Calling it again does nothing.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._writer is not threading.current_thread():
+            self._writer.join()
+
+    def _write_loop(self):
+        """
+        Takes groups off the queue and runs them until closed and drained.
+        """
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                # Keep the group open for more mutations, unless closing
+                deadline = time.monotonic() + self.max_delay
+                while len(self._pending) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                group = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+            self.run_group(group)
+
+    def run_group(self, group: list):
+        """
+        Runs queued calls in one batch, persists them together and resolves
+        their futures.
+
+        Args:
+            group (list): ``(function, args, kwargs, future)`` entries.
+        """
+        outcomes = []
+        profiling.count("group_commits")
+        profiling.count("group_commit_calls", len(group))
+        with self.lock:
+            try:
+                self.manager.refresh()
+                with profiling.span("group_commit.run"), self.manager.batch():
+                    for function, args, kwargs, future in group:
+                        if not future.set_running_or_notify_cancel():
+                            continue
+                        try:
+                            with self.manager.batch():
+                                outcomes.append((future, _detach(function(self.manager, *args, **kwargs)), None))
+                        except Exception as e:
+                            outcomes.append((future, None, e))
+            except Exception as e:
+                for _, _, _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+class AsyncTaskManager:
+    """
+    An asyncio front end for a GroupCommitManager.
+
+    Mutations are awaitables that complete once the change is persisted;
+    the event loop keeps running while the writer thread writes. Reads run
+    in the loop's default executor, so waiting for the lock does not block
+    the loop.
+
+    Example:
+        async with AsyncTaskManager(TaskManager(Storage(path))) as tasks:
+            task = await tasks.add_task("Write report", project="Work")
+            await tasks.complete_task(task.id)
+
+    Attributes:
+        group (GroupCommitManager): The underlying group-commit manager.
+    """
+    def __init__(self, manager: TaskManager, max_delay: float = DEFAULT_MAX_DELAY, max_batch: int = DEFAULT_MAX_BATCH):
+        """
+        Initializes the AsyncTaskManager and starts the writer thread.
+
+        Args:
+            manager (TaskManager): The manager to share.
+            max_delay (float): Seconds a group stays open for more mutations.
+            max_batch (int): Mutations after which a group closes early.
+        """
+        self.group = GroupCommitManager(manager, max_delay, max_batch)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def submit(self, method: str, *args, **kwargs):
+        """
+        Runs a TaskManager mutation in the next group and returns its result
+        once persisted (see ``GroupCommitManager.submit``).
+        """
+        return await asyncio.wrap_future(self.group.submit(method, *args, **kwargs))
+
+    async def add_task(self, *args, **kwargs) -> Task:
+        """
+        Awaits ``TaskManager.add_task``; returns the new Task.
+        """
+        return await self.submit("add_task", *args, **kwargs)
+
+    async def update_task(self, *args, **kwargs):
+        """
+        Awaits ``TaskManager.update_task``.
+        """
+        return await self.submit("update_task", *args, **kwargs)
+
+    async def complete_task(self, *args, **kwargs):
+        """
+        Awaits ``TaskManager.complete_task``.
+        """
+        return await self.submit("complete_task", *args, **kwargs)
+
+    async def delete_task(self, *args, **kwargs):
+        """
+        Awaits ``TaskManager.delete_task``.
+        """
+        return await self.submit("delete_task", *args, **kwargs)
+
+    async def read(self, method: str, *args, **kwargs):
+        """
+        Runs a read-only TaskManager method in the default executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, lambda: self.group.read(method, *args, **kwargs))
+
+    async def list_tasks(self, *args, **kwargs) -> List[Task]:
+        """
+        Awaits ``TaskManager.list_tasks``.
+        """
+        return await self.read("list_tasks", *args, **kwargs)
+
+    async def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        """
+        Awaits ``TaskManager.get_task_by_id``.
+        """
+        return await self.read("get_task_by_id", task_id)
+
+    async def close(self):
+        """
+        Writes the queued mutations and stops the writer thread.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.group.close)
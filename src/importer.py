@@ -0,0 +1,179 @@
+import csv
+import datetime
+import json
+import os
+import sys
+from typing import Iterator, Optional, Tuple
+from .dates import normalize_due_date
+from .constants import PRIORITY_LOW, PRIORITY_MEDIUM, PRIORITY_HIGH, STATUS_PENDING, STATUS_DONE
+
+# Header names written by export, mapped to Task fields.
+CSV_COLUMNS = {
+    "ID": "id",
+    "Title": "title",
+    "Status": "status",
+    "Priority": "priority",
+    "Project": "project",
+    "Recurrence": "recurrence",
+    "Due Date": "due_date",
+    "Created At": "created_at",
+    "Completed At": "completed_at",
+    "Relist Count": "relist_count",
+}
+IMPORT_FORMATS = ("csv", "tsv", "jsonl")
+PRIORITIES = (PRIORITY_LOW, PRIORITY_MEDIUM, PRIORITY_HIGH)
+STATUSES = (STATUS_PENDING, STATUS_DONE)
+
+
+def detect_format(filename: str) -> str:
+    """
+    Guesses the import format from a file extension.
+
+    Args:
+        filename (str): The file name.
+
+    Returns:
+        str: One of IMPORT_FORMATS.
+
+    Raises:
+        ValueError: If the extension is not recognised.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if extension in (".csv", ".tsv"):
+        return extension[1:]
+    raise ValueError(f"Cannot tell the format of '{filename}', use --format")
+
+
+def _clean(record: dict, line_no: int) -> dict:
+    """
+    Validates one record and converts it to Task keyword arguments.
+
+    The ID is dropped because imported tasks get new IDs. Empty optional
+    fields become None.
+
+    Args:
+        record (dict): The record, keyed by Task field name.
+        line_no (int): Line number, used in error messages.
+
+    Returns:
+        dict: Keyword arguments for Task, without ``id``.
+
+    Raises:
+        ValueError: If the record is invalid.
+    """
+    title = record.get("title")
+    if not isinstance(title, str) or not title.strip():
+        raise ValueError(f"Line {line_no}: missing title")
+    status = record.get("status") or STATUS_PENDING
+    if status not in STATUSES:
+        raise ValueError(f"Line {line_no}: invalid status '{status}'")
+    priority = record.get("priority") or PRIORITY_MEDIUM
+    if priority not in PRIORITIES:
+        raise ValueError(f"Line {line_no}: invalid priority '{priority}'")
+    due_date = record.get("due_date") or None
+    if due_date:
+        try:
+            due_date = normalize_due_date(due_date)
+        except ValueError as e:
+            raise ValueError(f"Line {line_no}: {e}")
+    for field in ("project", "recurrence"):
+        value = record.get(field)
+        if value and not isinstance(value, str):
+            raise ValueError(f"Line {line_no}: invalid {field} {value!r}")
+    for field in ("created_at", "completed_at"):
+        value = record.get(field)
+        if value:
+            try:
+                datetime.datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"Line {line_no}: invalid {field} {value!r}")
+    relist_count = record.get("relist_count") or 0
+    try:
+        relist_count = int(relist_count)
+    except (TypeError, ValueError):
+        relist_count = -1
+    if relist_count < 0:
+        raise ValueError(f"Line {line_no}: invalid relist count '{record.get('relist_count')}'")
+    return {
+        "title": title,
+        "status": status,
+        "priority": priority,
+        "project": record.get("project") or None,
+        "recurrence": record.get("recurrence") or None,
+        "due_date": due_date,
+        "created_at": record.get("created_at") or "",
+        "completed_at": record.get("completed_at") or None,
+        "relist_count": relist_count,
+    }
+
+
+def _read_delimited(file, delimiter: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Streams records from a CSV/TSV file with the export header.
+    """
+    reader = csv.reader(file, delimiter=delimiter)
+    header = next(reader, None)
+    if header is None:
+        return
+    fields = [CSV_COLUMNS.get(name.strip()) for name in header]
+    if "title" not in fields:
+        raise ValueError("Line 1: header has no Title column")
+    for row in reader:
+        if not row:
+            continue
+        yield reader.line_num, {name: value for name, value in zip(fields, row) if name}
+
+
+def _read_jsonl(file) -> Iterator[Tuple[int, dict]]:
+    """
+    Streams records from a JSON Lines file in the ``Task.to_dict`` format.
+    """
+    for line_no, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_no}: invalid JSON ({e.msg})")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_no}: expected a JSON object")
+        yield line_no, record
+
+
+def read_records(filename: str, fmt: Optional[str] = None) -> Iterator[Tuple[int, dict]]:
+    """
+    Streams validated task records from a CSV, TSV or JSON Lines file.
+
+    Only one row is held in memory at a time.
+
+    Args:
+        filename (str): The file to read, or "-" for standard input.
+        fmt (Optional[str]): One of IMPORT_FORMATS. Guessed from the extension if omitted.
+
+    Yields:
+        Tuple[int, dict]: The line number and Task keyword arguments (without ``id``).
+
+    Raises:
+        ValueError: If the format is unknown or a record is invalid.
+    """
+    if fmt is None:
+        fmt = detect_format(filename)
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+
+    if filename == "-":
+        file = sys.stdin
+    else:
+        file = open(filename, 'r', newline='', encoding='utf-8')
+    try:
+        if fmt == "jsonl":
+            records = _read_jsonl(file)
+        else:
+            records = _read_delimited(file, "\t" if fmt == "tsv" else ",")
+        for line_no, record in records:
+            yield line_no, _clean(record, line_no)
+    finally:
+        if file is not sys.stdin:
+            file.close()
@@ -0,0 +1,227 @@
+import json
+import os
+from typing import Iterator, List, Optional, Tuple
+from . import profiling
+from .models import Task
+from .stats import Stats
+from .storage import Storage
+
+# Compact the journal into a fresh snapshot once it grows past this many bytes.
+DEFAULT_COMPACT_THRESHOLD = 4 * 1024 * 1024
+
+
+class JournalStorage(Storage):
+    """
+    Journaled storage: a JSON snapshot plus an append-only log of mutations.
+
+    Each mutation appends one small JSON record to ``<file_path>.journal``
+    instead of rewriting the whole snapshot. Loading replays the journal over
+    the snapshot, and the journal is folded into a new snapshot once it grows
+    past ``compact_threshold`` bytes. Changes to the aggregates are journaled
+    as deltas and added to the snapshot header's aggregates when read. Each
+    delta records the version stamp of the snapshot it applies to, so deltas
+    already folded into a newer snapshot are not counted twice.
+
+    Attributes:
+        file_path (str): The path to the JSON snapshot.
+        journal_path (str): The path to the append-only journal.
+        compact_threshold (int): Journal size in bytes that triggers compaction.
+    """
+    def __init__(self, file_path: str, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD, use_cache: bool = False, fmt: Optional[str] = None):
+        """
+        Initializes the JournalStorage instance.
+
+        Args:
+            file_path (str): The path to the JSON snapshot.
+            compact_threshold (int): Journal size in bytes that triggers compaction.
+            use_cache (bool): Cache the parsed snapshot (see Storage).
+            fmt (Optional[str]): The snapshot format (see Storage).
+        """
+        super().__init__(file_path, use_cache=use_cache, fmt=fmt)
+        self.journal_path = file_path + ".journal"
+        self.compact_threshold = compact_threshold
+
+    def load_tasks(self) -> List[Task]:
+        """
+        Loads the snapshot and replays the journal on top of it.
+
+        Records that cannot be decoded (e.g. a line torn by a crash) are skipped.
+
+        Returns:
+            List[Task]: The current list of tasks.
+        """
+        tasks = super().load_tasks()
+        snapshot_state = self._seen_state
+        journal_size = 0
+        if os.path.exists(self.journal_path):
+            with profiling.span("journal.replay"):
+                tasks, journal_size = self._replay(tasks)
+        self._seen_state = (snapshot_state, journal_size)
+        return tasks
+
+    def iter_tasks(self) -> Iterator[Task]:
+        """
+        Returns the loaded tasks; the journal can only be replayed onto the
+        full list.
+
+        Returns:
+            Iterator[Task]: The current tasks.
+        """
+        return iter(self.load_tasks())
+
+    def _replay(self, tasks: List[Task]) -> Tuple[List[Task], int]:
+        """
+        Applies the journal records to the snapshot tasks.
+
+        Returns:
+            Tuple[List[Task], int]: The tasks and the number of journal bytes read.
+        """
+        by_id = {task.id: task for task in tasks}
+        try:
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue
+                    if record.get("op") == "put":
+                        task = Task.from_dict(record["task"])
+                        by_id[task.id] = task
+                    elif record.get("op") == "del":
+                        by_id.pop(record["id"], None)
+                size = f.tell()
+        except IOError:
+            return tasks, 0
+        return list(by_id.values()), size
+
+    def _disk_state(self):
+        """
+        Returns a token for the current snapshot and journal: the snapshot
+        state and the journal size.
+        """
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except OSError:
+            journal_size = 0
+        return (self._snapshot_state(), journal_size)
+
+    def _snapshot_header(self) -> dict:
+        """
+        Reads the snapshot's header; empty if there is no snapshot.
+        """
+        try:
+            with open(self.file_path, 'r') as f:
+                return self._read_header(f)
+        except FileNotFoundError:
+            return {}
+
+    def load_stats(self) -> Optional[dict]:
+        """
+        Reads the snapshot header's aggregates and adds the journaled deltas
+        made on top of this snapshot. Deltas made on an older snapshot were
+        folded into this one by a compaction that crashed before removing the
+        journal, and are skipped.
+
+        Returns:
+            Optional[dict]: The aggregates, or None if the snapshot has none.
+        """
+        header = self._snapshot_header()
+        stored = header.get("stats")
+        if stored is None:
+            return None
+        version = header.get("version", 0)
+        stats = Stats(stored)
+        try:
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    if not line.startswith(b'{"op": "stats"'):
+                        continue
+                    try:
+                        record = json.loads(line)
+                        # Deltas journaled before base versions were recorded have none
+                        if record.get("base", version) == version:
+                            stats.merge(record["delta"])
+                    except (json.JSONDecodeError, UnicodeDecodeError, KeyError):
+                        continue
+        except FileNotFoundError:
+            pass
+        return stats.to_dict()
+
+    def _write_changes(self, tasks: List[Task], changed: List[Task], deleted: List[int], stats_delta: Optional[dict] = None):
+        """
+        Appends the changed and deleted tasks, and the change to the
+        aggregates, to the journal.
+
+        The append is flushed and fsynced before returning. If the journal has
+        grown past the compaction threshold, it is folded into a new snapshot.
+        Called by ``persist`` with the writer lock held.
+
+        Args:
+            tasks (List[Task]): The full list of tasks after the mutation.
+            changed (List[Task]): Tasks that were added or modified.
+            deleted (List[int]): IDs of tasks that were removed.
+            stats_delta (Optional[dict]): The change to the aggregates.
+        """
+        lines = [json.dumps({"op": "put", "task": task.to_dict()}) + "\n" for task in changed]
+        lines.extend(json.dumps({"op": "del", "id": task_id}) + "\n" for task_id in deleted)
+        if not lines:
+            return
+        header = self._snapshot_header()
+        # Deltas only mean something on top of a snapshot's aggregates
+        if header.get("stats") is None:
+            if header or os.path.exists(self.journal_path):
+                # Written by an older version: fold it into a snapshot with aggregates
+                self.compact(tasks)
+                return
+            # A new store starts from an empty snapshot, so it has aggregates
+            # from the first write
+            self.save_tasks([])
+            header = self._snapshot_header()
+        if stats_delta is not None:
+            lines.append(json.dumps({"op": "stats", "base": header.get("version", 0), "delta": stats_delta}) + "\n")
+
+        with open(self.journal_path, 'ab+') as f:
+            # Terminate a record torn by an earlier crash so it cannot swallow ours
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+            data = "".join(lines).encode('utf-8')
+            with profiling.span("journal.append"):
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            size = f.tell()
+        self._seen_state = (self._seen_state[0] if self._seen_state else None, size)
+        profiling.count("journal_records", len(lines))
+        profiling.count("bytes_written", len(data))
+
+        if size >= self.compact_threshold:
+            self.compact(tasks)
+
+    def save_tasks(self, tasks: List[Task]):
+        """
+        Writes a full snapshot atomically and discards the journal.
+
+        The snapshot is replaced before the journal is removed, so a crash in
+        between only leaves task records that replay idempotently, and
+        aggregate deltas that the new snapshot's version stamp marks as
+        already applied.
+
+        Args:
+            tasks (List[Task]): The list of Task objects to save.
+        """
+        with self.locked():
+            super().save_tasks(tasks)
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._seen_state = (self._seen_state, 0)
+
+    def compact(self, tasks: List[Task]):
+        """
+        Folds the journal into a new snapshot.
+
+        Args:
+            tasks (List[Task]): The current list of tasks.
+        """
+        self.save_tasks(tasks)
@@ -1,22 +1,538 @@
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+import copy
 import datetime
+import heapq
+import sys
+from itertools import chain, islice
+from . import profiling
+from .archive import Archive
+from .changes import ChangeFeed
+from .constants import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_MEDIUM, RECURRENCE_MONTHLY
+from .dates import add_days, normalize_due_date, optional_due_date, today
+from .recurrence import OccurrenceCalculator, anchor_day, may_be_clamped, next_due_date
 from .models import Task
-from .storage import Storage
-import csv
+from .search import SearchHit, SearchIndex
+from .stats import Stats
+from .storage import BaseStorage
+
+# Task attributes that list_tasks can filter on through the bucket index.
+BUCKET_FIELDS = ("project", "priority", "status")
+
+# Most urgent first; unknown priorities sort last.
+PRIORITY_RANK = {PRIORITY_HIGH: 0, PRIORITY_MEDIUM: 1, PRIORITY_LOW: 2}
+
+# Sort keys for page_tasks, by SORT_FIELDS name. Ties go to the lower ID.
+SORT_KEYS = {
+    "id": lambda task: task.id,
+    "priority": lambda task: (PRIORITY_RANK.get(task.priority, 3), task.id),
+    "due": lambda task: (task.due_date is None, task.due_date or "", task.id),
+    "created": lambda task: (task.created_at or "", task.id),
+}
+
+
+def page_tasks(tasks: Iterable[Task], sort: Optional[str] = None, reverse: bool = False, limit: Optional[int] = None, offset: int = 0) -> List[Task]:
+    """
+    Orders tasks and returns one page of them.
+
+    With a limit, the page is picked by heap selection in O(n log k) for
+    ``k = offset + limit`` instead of sorting every task.
+
+    Args:
+        tasks (Iterable[Task]): The tasks, in list order.
+        sort (Optional[str]): One of SORT_FIELDS, or None to keep list order.
+                              Tasks without a due date sort after the others.
+        reverse (bool): Reverse the order.
+        limit (Optional[int]): The maximum number of tasks, or None for all.
+        offset (int): How many tasks to skip first.
+
+    Returns:
+        List[Task]: The page.
+
+    Raises:
+        ValueError: If the sort field is unknown or limit or offset is negative.
+    """
+    if (limit is not None and limit < 0) or offset < 0:
+        raise ValueError("Limit and offset must not be negative")
+    end = None if limit is None else offset + limit
+    if sort is None:
+        if reverse:
+            tasks = list(tasks)[::-1]
+        return list(islice(tasks, offset, end))
+    key = SORT_KEYS.get(sort)
+    if key is None:
+        raise ValueError(f"Unknown sort field: {sort}")
+    with profiling.span("manager.sort"):
+        if end is None:
+            return sorted(tasks, key=key, reverse=reverse)[offset:]
+        select = heapq.nlargest if reverse else heapq.nsmallest
+        return select(end, tasks, key=key)[offset:]
 
 class TaskManager:
     """
     Manages the lifecycle of tasks, including creation, updates, deletion, and retrieval.
+
+    Every public mutation runs inside a batch, and a batch persists its changes
+    with a single ``storage.persist`` call when the outermost batch exits.
     """
-    def __init__(self, storage: Storage):
+    def __init__(self, storage: BaseStorage):
         """
         Initializes the TaskManager.
 
+        Tasks are loaded on first access to ``tasks``. Until then, backends that
+        support queries answer lookups, filters and duplicate checks directly.
+
         Args:
-            storage (Storage): The storage backend to use for persisting tasks.
+            storage (BaseStorage): The storage backend to use for persisting tasks.
         """
         self.storage = storage
-        self.tasks = self.storage.load_tasks()
+        # Kept current on every commit once it has been built by a search
+        self.search_index = SearchIndex(storage) if getattr(storage, "file_path", None) else None
+        # Completed tasks moved out of the storage; IDs stay unique across both
+        self.archive = Archive(storage.file_path + ".archive") if getattr(storage, "file_path", None) else None
+        if self.archive is not None:
+            storage.archive = self.archive
+        # Every committed change, numbered, for downstream consumers
+        self.change_feed = ChangeFeed(storage.file_path + ".changes") if getattr(storage, "file_path", None) else None
+        self._tasks = None
+        self._next_id = 1
+        # Batch state: nesting depth, pending changes and the undo log
+        self._batch_depth = 0
+        self._changed: Dict[int, Task] = {}
+        self._deleted = set()
+        # IDs of the tasks the batch moves to the archive
+        self._archived = set()
+        self._undo = []
+
+    @property
+    def tasks(self) -> List[Task]:
+        """
+        The list of all tasks, loaded from storage on first access.
+        """
+        self._load()
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, tasks: List[Task]):
+        self._set_tasks(tasks)
+
+    def _load(self):
+        """
+        Loads the tasks from storage and builds the indexes, if not done yet.
+        """
+        if self._tasks is None:
+            next_id = self._next_id
+            with profiling.span("manager.load"):
+                tasks = self.storage.load_tasks()
+            if self._changed or self._deleted:
+                # Loaded mid-batch: apply the changes not yet persisted
+                tasks = self._overlay(tasks)
+            self._set_tasks(tasks)
+            self._next_id = max(self._next_id, next_id)
+
+    def refresh(self) -> bool:
+        """
+        Drops the loaded tasks if another process changed the storage since
+        they were loaded, so the next access reloads them. Does nothing
+        inside a batch.
+
+        Returns:
+            bool: True if the tasks were dropped.
+        """
+        if self._tasks is None or self._batch_depth or not self.storage.has_changed():
+            return False
+        self._tasks = None
+        return True
+
+    def _set_tasks(self, tasks: List[Task]):
+        """
+        Replaces the task list and rebuilds the in-memory indexes from it.
+
+        The indexes are an ID map, a position key per task that increases
+        along the list, the next free ID, a count of pending tasks per title,
+        buckets of tasks keyed by (field, value) for each of BUCKET_FIELDS,
+        and a sorted list of (due_date, id) pairs for range queries.
+
+        Args:
+            tasks (List[Task]): The new task list.
+        """
+        self._tasks = tasks
+        self._by_id: Dict[int, Task] = {}
+        self._position: Dict[int, int] = {}
+        self._pending_titles: Dict[str, int] = {}
+        self._buckets: Dict[tuple, Dict[int, Task]] = {}
+        # Built in one sort below rather than one insort per task
+        self._due = None
+        self._next_id = 1
+        self._next_position = 0
+        with profiling.span("manager.index"):
+            for task in tasks:
+                self._register(task)
+            self._due = sorted((task.due_date, task.id) for task in tasks if task.due_date)
+        self._next_id = max(self._next_id, self._archived_max_id() + 1)
+
+    def _archived_max_id(self) -> int:
+        """
+        Returns the highest archived task ID, which new IDs must exceed.
+        """
+        return self.archive.max_id() if self.archive is not None else 0
+
+    def _register(self, task: Task, position: Optional[int] = None):
+        """
+        Adds a task that is already in the task list to every index.
+
+        Args:
+            task (Task): The task.
+            position (Optional[int]): Its list position key, when restoring a task.
+        """
+        self._by_id[task.id] = task
+        if position is None:
+            position = self._next_position
+            self._next_position += 1
+        self._position[task.id] = position
+        if task.id >= self._next_id:
+            self._next_id = task.id + 1
+        self._index(task)
+
+    def _unregister(self, task: Task):
+        """
+        Removes a task from every index. The caller removes it from the list.
+        """
+        self._unindex(task)
+        self._by_id.pop(task.id, None)
+        self._position.pop(task.id, None)
+
+    def _index(self, task: Task):
+        """
+        Adds a task to the indexes that depend on its mutable attributes.
+        """
+        if task.status != "done":
+            self._pending_titles[task.title] = self._pending_titles.get(task.title, 0) + 1
+        for field in BUCKET_FIELDS:
+            key = (field, getattr(task, field))
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = {}
+            bucket[task.id] = task
+        if task.due_date and self._due is not None:
+            insort(self._due, (task.due_date, task.id))
+
+    def _unindex(self, task: Task):
+        """
+        Removes a task from the indexes that depend on its mutable attributes.
+        Must be called before those attributes change.
+        """
+        if task.status != "done":
+            remaining = self._pending_titles.get(task.title, 0) - 1
+            if remaining > 0:
+                self._pending_titles[task.title] = remaining
+            else:
+                self._pending_titles.pop(task.title, None)
+        for field in BUCKET_FIELDS:
+            key = (field, getattr(task, field))
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.pop(task.id, None)
+                if not bucket:
+                    del self._buckets[key]
+        if task.due_date and self._due is not None:
+            entry = (task.due_date, task.id)
+            i = bisect_left(self._due, entry)
+            if i < len(self._due) and self._due[i] == entry:
+                del self._due[i]
+
+    def _select(self, **filters) -> List[Task]:
+        """
+        Returns the tasks matching every (field, value) filter, in list order.
+
+        Starts from the smallest matching bucket and checks the remaining
+        filters against its tasks only.
+
+        Returns:
+            List[Task]: The matching tasks.
+        """
+        buckets = [self._buckets.get((field, value), {}) for field, value in filters.items()]
+        smallest = min(buckets, key=len)
+        matches = [task for task in smallest.values()
+                   if all(getattr(task, field) == value for field, value in filters.items())]
+        if len(matches) > 1:
+            position = self._position
+            matches.sort(key=lambda task: position[task.id])
+        return matches
+
+    def _due_range(self, after: Optional[str] = None, before: Optional[str] = None) -> List[Task]:
+        """
+        Returns the tasks due strictly between two dates, by due date, using
+        the sorted due-date index: O(log n + k).
+
+        Args:
+            after (Optional[str]): Exclusive lower bound, or None.
+            before (Optional[str]): Exclusive upper bound, or None.
+
+        Returns:
+            List[Task]: The tasks, ordered by due date then ID.
+        """
+        due = self._due
+        start = bisect_right(due, (after, sys.maxsize)) if after else 0
+        end = bisect_left(due, (before,)) if before else len(due)
+        by_id = self._by_id
+        return [by_id[task_id] for _, task_id in due[start:end]]
+
+    def _use_queries(self) -> bool:
+        """
+        Whether reads should be pushed down to the storage backend.
+        """
+        return self._tasks is None and self.storage.supports_queries
+
+    def _overlay(self, tasks: List[Task], predicate=None) -> List[Task]:
+        """
+        Applies the changes of the current batch to tasks read from storage.
+
+        Args:
+            tasks (List[Task]): Tasks as stored, in ID order.
+            predicate (callable): Optional filter the changed tasks must pass.
+
+        Returns:
+            List[Task]: The tasks as the batch sees them, in ID order.
+        """
+        result = []
+        seen = set()
+        for task in tasks:
+            seen.add(task.id)
+            if task.id in self._deleted:
+                continue
+            task = self._changed.get(task.id, task)
+            if predicate is None or predicate(task):
+                result.append(task)
+        added = [task for task_id, task in self._changed.items()
+                 if task_id not in seen and (predicate is None or predicate(task))]
+        if added:
+            result.extend(added)
+            result.sort(key=lambda task: task.id)
+        return result
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups mutations into one transaction.
+
+        Mutations inside the block are applied in memory and persisted with a
+        single ``storage.persist`` call when the outermost batch exits. If an
+        exception escapes a batch, the changes made inside it are rolled back.
+        Batches nest; an inner batch only commits with the outermost one.
+
+        Example:
+            with manager.batch():
+                for task_id in ids:
+                    manager.complete_task(task_id)
+        """
+        savepoint = (len(self._undo), self._next_id)
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            self._rollback(savepoint)
+            raise
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self._commit()
+
+    def _commit(self):
+        """
+        Persists the pending changes of the outermost batch.
+        """
+        if not self._changed and not self._deleted:
+            self._undo.clear()
+            return
+        changed = list(self._changed.values())
+        deleted = list(self._deleted)
+        added = [entry[1].id for entry in self._undo if entry[0] == "insert" and entry[1].id in self._changed]
+        stats_delta = self._stats_delta()
+        # Backends without queries save the whole list, so a batch made
+        # before anything was loaded needs the stored tasks under it
+        loaded_here = self._tasks is None and not self.storage.supports_queries
+        if loaded_here:
+            self._load()
+        # The change feed is appended under the writer lock, so its order
+        # matches the order of commits across processes
+        with self.storage.locked():
+            try:
+                with profiling.span("manager.persist"):
+                    merged = self.storage.persist(self._tasks, changed=changed, deleted=deleted, added=added, stats_delta=stats_delta)
+            except BaseException:
+                if loaded_here:
+                    self._tasks = None
+                self._rollback((0, None))
+                raise
+            if merged is not None:
+                # Another process saved concurrently; adopt the merged state
+                self._set_tasks(merged)
+            if self.search_index is not None:
+                self.search_index.record(changed, deleted, self.storage.last_transition)
+            self._changed.clear()
+            self._deleted.clear()
+            self._archived.clear()
+            self._undo.clear()
+            if self.change_feed is not None:
+                self.change_feed.record(changed, deleted, snapshot=self._stored_tasks)
+
+    def _stats_delta(self) -> dict:
+        """
+        Computes the change the pending batch makes to the aggregates, from
+        the state of each touched task before the batch (in the undo log) and
+        after it.
+
+        Returns:
+            dict: The delta, in the form of ``Stats.to_dict``.
+        """
+        before: Dict[int, Optional[Task]] = {}
+        for entry in self._undo:
+            kind, task = entry[0], entry[1]
+            if kind == "insert":
+                before.setdefault(task.id, None)
+            elif kind == "modify":
+                before.setdefault(task.id, entry[2])
+            else:
+                before.setdefault(task.id, task)
+        delta = Stats()
+        for task_id, original in before.items():
+            if original is not None:
+                # Archived tasks keep their completion history in the aggregates
+                delta.add(original, -1, history=task_id not in self._archived)
+            if task_id not in self._deleted and task_id in self._changed:
+                delta.add(self._changed[task_id])
+        return delta.to_dict()
+
+    def _rollback(self, savepoint: tuple):
+        """
+        Undoes every change recorded after the savepoint.
+
+        Args:
+            savepoint (tuple): (undo log length, next ID) when the batch began.
+                               A next ID of None keeps the current counter.
+        """
+        mark, next_id = savepoint
+        loaded = self._tasks is not None
+        while len(self._undo) > mark:
+            entry = self._undo.pop()
+            kind, task = entry[0], entry[1]
+            if kind == "insert":
+                if loaded and task.id in self._by_id:
+                    if self._tasks[-1] is task:
+                        self._tasks.pop()
+                    else:
+                        del self._tasks[self._slot(self._position[task.id])]
+                    self._unregister(task)
+                self._changed.pop(task.id, None)
+            elif kind == "modify":
+                _, _, snapshot, was_changed = entry
+                if loaded and task.id in self._by_id:
+                    self._unindex(task)
+                for name in Task.__dataclass_fields__:
+                    setattr(task, name, getattr(snapshot, name))
+                if loaded and task.id in self._by_id:
+                    self._index(task)
+                if not was_changed:
+                    self._changed.pop(task.id, None)
+            elif kind == "delete":
+                _, _, was_changed, position = entry
+                if loaded:
+                    self._tasks.insert(self._slot(position), task)
+                    self._register(task, position)
+                self._deleted.discard(task.id)
+                self._archived.discard(task.id)
+                if was_changed:
+                    self._changed[task.id] = task
+        if next_id is not None:
+            self._next_id = next_id
+
+    def _insert(self, task: Task):
+        """
+        Adds a new task inside the current batch.
+        """
+        if self._tasks is not None:
+            self._tasks.append(task)
+            self._register(task)
+        elif task.id >= self._next_id:
+            self._next_id = task.id + 1
+        self._undo.append(("insert", task))
+        self._changed[task.id] = task
+
+    def _slot(self, position: int) -> int:
+        """
+        Finds the list index of a position key by binary search. The task list
+        is always in position order, so this needs no scan or task comparison.
+
+        Args:
+            position (int): A position key, of a listed task or a removed one.
+
+        Returns:
+            int: The index of the task with that key, or where it belongs.
+        """
+        tasks, keys = self._tasks, self._position
+        low, high = 0, len(tasks)
+        while low < high:
+            middle = (low + high) // 2
+            if keys[tasks[middle].id] < position:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _remove(self, task: Task):
+        """
+        Deletes a task inside the current batch.
+        """
+        position = -1
+        if self._tasks is not None:
+            position = self._position[task.id]
+            del self._tasks[self._slot(position)]
+            self._unregister(task)
+        self._undo.append(("delete", task, task.id in self._changed, position))
+        self._changed.pop(task.id, None)
+        self._deleted.add(task.id)
+
+    def _remove_many(self, tasks: List[Task]):
+        """
+        Deletes many tasks inside the current batch in one pass over the task
+        list, rebuilding the due-date index once instead of per task.
+        """
+        if self._tasks is None:
+            for task in tasks:
+                self._remove(task)
+            return
+        ids = {task.id for task in tasks}
+        due, self._due = self._due, None
+        kept = []
+        for task in self._tasks:
+            if task.id not in ids:
+                kept.append(task)
+                continue
+            position = self._position[task.id]
+            self._unregister(task)
+            self._undo.append(("delete", task, task.id in self._changed, position))
+            self._changed.pop(task.id, None)
+            self._deleted.add(task.id)
+        self._tasks[:] = kept
+        self._due = [entry for entry in due if entry[1] not in ids]
+
+    def _before_change(self, task: Task):
+        """
+        Records a task's state and takes it out of the indexes before it changes.
+        """
+        self._undo.append(("modify", task, copy.copy(task), task.id in self._changed))
+        if self._tasks is not None:
+            self._unindex(task)
+
+    def _after_change(self, task: Task):
+        """
+        Re-indexes a changed task and marks it for persisting.
+        """
+        if self._tasks is not None:
+            self._index(task)
+        self._changed[task.id] = task
 
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
         """
@@ -28,10 +544,59 @@ class TaskManager:
         Returns:
             Optional[Task]: The task if found, else None.
         """
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
+        if self._use_queries():
+            if task_id in self._deleted:
+                return None
+            task = self._changed.get(task_id)
+            return task if task is not None else self.storage.get_task(task_id)
+        self._load()
+        return self._by_id.get(task_id)
+
+    def search_tasks(self, query: str, limit: Optional[int] = 20) -> List[SearchHit]:
+        """
+        Searches task titles and projects through the persistent search index.
+
+        The index is built on first use and updated by every later commit.
+        Changes still pending in an open batch are not visible.
+
+        Args:
+            query (str): Words to match; see ``search.parse_query`` for
+                         ``OR`` and ``prefix*`` terms.
+            limit (Optional[int]): The maximum number of results, or None for all.
+
+        Returns:
+            List[SearchHit]: The matches, best first.
+        """
+        if self.search_index is None:
+            raise ValueError("Search is not supported by this storage backend")
+        return self.search_index.search(query, limit)
+
+    def changes(self, since: int = 0) -> Tuple[Iterator[dict], int]:
+        """
+        Returns the changes committed after a sequence number, with the new
+        high-water mark (see ``ChangeFeed.read``).
+
+        Args:
+            since (int): The high-water mark of the previous call; 0 for all.
+
+        Returns:
+            Tuple[Iterator[dict], int]: The changes, oldest first, and the
+                                        high-water mark to pass next time.
+
+        Raises:
+            ValueError: If the storage has no change feed or since is negative.
+        """
+        if self.change_feed is None:
+            raise ValueError("Change feeds are not supported by this storage backend")
+        return self.change_feed.read(since, snapshot=self._stored_tasks)
+
+    def _stored_tasks(self) -> Iterable[Task]:
+        """
+        Returns the tasks as stored, to seed a new change feed.
+        """
+        if self._tasks is not None and not (self._changed or self._deleted):
+            return self._tasks
+        return self.storage.iter_tasks()
 
     def get_active_tasks(self) -> List[Task]:
         """
@@ -49,21 +614,90 @@ class TaskManager:
         Args:
             filename (str): The name of the file to export to.
         """
-        with open(filename, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(["ID", "Title", "Status", "Priority", "Project", "Recurrence", "Due Date", "Created At", "Completed At"])
-            for task in self.tasks:
-                writer.writerow([
-                    task.id,
-                    task.title,
-                    task.status,
-                    task.priority,
-                    task.project if task.project else "",
-                    task.recurrence if task.recurrence else "",
-                    task.due_date if task.due_date else "",
-                    task.created_at,
-                    task.completed_at if task.completed_at else ""
-                ])
+        self.export_tasks(filename)
+
+    def export_tasks(self, filename: str, fmt: str = "csv", columns: Optional[List[str]] = None, project: Optional[str] = None, priority: Optional[str] = None, status: Optional[str] = None, compress: bool = False, include_archived: bool = False) -> int:
+        """
+        Exports tasks, optionally filtered, as CSV, TSV or JSON Lines.
+
+        Rows are streamed from the task list through a buffered writer. With
+        the default arguments the output matches ``export_tasks_to_csv``.
+
+        Args:
+            filename (str): The file to export to, or "-" for standard output.
+            fmt (str): "csv", "tsv" or "jsonl".
+            columns (Optional[List[str]]): Header names to include, default all.
+            project (Optional[str]): Filter by project name.
+            priority (Optional[str]): Filter by priority level.
+            status (Optional[str]): Filter by status.
+            compress (bool): Whether to gzip the output.
+            include_archived (bool): Also export archived tasks, streamed
+                                     after the others.
+
+        Returns:
+            int: The number of tasks exported.
+        """
+        from .exporter import open_output, write_tasks
+
+        tasks = self.list_tasks(project, priority, status)
+        if include_archived:
+            tasks = chain(tasks, self.archived_tasks(project, priority, status, exclude=(task.id for task in tasks)))
+        with open_output(filename, compress) as stream:
+            return write_tasks(stream, tasks, fmt, columns)
+
+    def import_tasks(self, filename: str, fmt: Optional[str] = None, on_duplicate: str = "skip", progress=None, progress_every: int = 10000) -> Dict[str, int]:
+        """
+        Imports tasks from a CSV, TSV or JSON Lines file in one transaction.
+
+        Rows are streamed from the file, validated and given new IDs in file
+        order. Everything is persisted with a single write at the end; if any
+        row is invalid, nothing is imported.
+
+        Args:
+            filename (str): The file to import, or "-" for standard input.
+            fmt (Optional[str]): "csv", "tsv" or "jsonl". Guessed from the extension if omitted.
+            on_duplicate (str): What to do with a pending task whose title is
+                                already pending: "skip", "allow" or "fail".
+            progress (callable): Called with the number of rows read so far.
+            progress_every (int): How many rows between progress calls.
+
+        Returns:
+            Dict[str, int]: Counts of "imported" and "skipped" rows.
+
+        Raises:
+            ValueError: If a row is invalid, or a duplicate is found with "fail".
+        """
+        from .importer import read_records
+
+        if on_duplicate not in ("skip", "allow", "fail"):
+            raise ValueError(f"Unknown duplicate policy: {on_duplicate}")
+        counts = {"imported": 0, "skipped": 0}
+        with self.batch():
+            self._load()
+            rows = 0
+            inserted = []
+            # Re-sort the due-date index once at the end instead of per insert
+            due, self._due = self._due, None
+            try:
+                for line_no, record in read_records(filename, fmt):
+                    rows += 1
+                    if progress is not None and rows % progress_every == 0:
+                        progress(rows)
+                    if on_duplicate != "allow" and record["status"] != "done" and self._pending_titles.get(record["title"]):
+                        if on_duplicate == "fail":
+                            raise ValueError(f"Line {line_no}: task '{record['title']}' already exists")
+                        counts["skipped"] += 1
+                        continue
+                    task = Task(id=self._next_id, **record)
+                    self._insert(task)
+                    if task.due_date:
+                        inserted.append((task.due_date, task.id))
+                    counts["imported"] += 1
+            finally:
+                due.extend(inserted)
+                due.sort()
+                self._due = due
+        return counts
 
     def add_task(self, title: str, project: Optional[str] = None, priority: str = "Medium", recurrence: Optional[str] = None, due_date: Optional[str] = None, allow_duplicates: bool = False) -> Task:
         """
@@ -74,44 +708,175 @@ class TaskManager:
             project (Optional[str]): The project name.
             priority (str): The priority level (default: "Medium").
             recurrence (Optional[str]): Recurrence pattern.
-            due_date (Optional[str]): Due date in YYYY-MM-DD format.
+            due_date (Optional[str]): Due date; see ``dates.normalize_due_date``
+                                      for the accepted forms. Stored as YYYY-MM-DD.
             allow_duplicates (bool): Whether to allow duplicate tasks.
 
         Returns:
             Task: The newly created task.
+
+        Raises:
+            ValueError: If the task already exists or the due date is invalid.
+        """
+        return self._add(title, project, priority, recurrence, optional_due_date(due_date), allow_duplicates)
+
+    def _add(self, title: str, project: Optional[str], priority: str, recurrence: Optional[str], due_date: Optional[str], allow_duplicates: bool) -> Task:
+        """
+        Adds a new task without validating its fields.
         """
-        # Check for duplicates
-        if not allow_duplicates:
-            for task in self.tasks:
-                if task.title == title and task.status != "done":
+        with self.batch():
+            if self._use_queries():
+                if not allow_duplicates and self._pending_title_in_storage(title):
                     raise ValueError("Task already exists")
+                new_id = max(self.storage.max_id() + 1, self._next_id, self._archived_max_id() + 1)
+            else:
+                self._load()
+                # Check for duplicates
+                if not allow_duplicates and self._pending_titles.get(title):
+                    raise ValueError("Task already exists")
+                new_id = self._next_id
 
-        new_id = 1
-        if self.tasks:
-            new_id = max(t.id for t in self.tasks) + 1
-        
-        task = Task(id=new_id, title=title, project=project, priority=priority, recurrence=recurrence, due_date=due_date)
-        self.tasks.append(task)
-        self.storage.save_tasks(self.tasks)
+            task = Task(id=new_id, title=title, project=project, priority=priority, recurrence=recurrence, due_date=due_date)
+            self._insert(task)
         return task
 
-    def list_tasks(self, project: Optional[str] = None, priority: Optional[str] = None) -> List[Task]:
+    def _pending_title_in_storage(self, title: str) -> bool:
+        """
+        Duplicate check against a query backend, including uncommitted changes.
+
+        Args:
+            title (str): The title to look for.
+
+        Returns:
+            bool: True if a task with this title is pending.
+        """
+        if any(t.title == title and t.status != "done" for t in self._changed.values()):
+            return True
+        return self.storage.has_pending_title(title, exclude=set(self._changed) | self._deleted)
+
+    def list_tasks(self, project: Optional[str] = None, priority: Optional[str] = None, status: Optional[str] = None, due_before: Optional[str] = None, due_after: Optional[str] = None, sort: Optional[str] = None, reverse: bool = False, limit: Optional[int] = None, offset: int = 0) -> List[Task]:
         """
-        Lists tasks, optionally filtering by project or priority.
+        Lists tasks, optionally filtering by project, priority, status or a
+        due-date range, and optionally sorted and paginated (see ``page_tasks``).
 
         Args:
             project (Optional[str]): Filter by project name.
             priority (Optional[str]): Filter by priority level.
+            status (Optional[str]): Filter by status.
+            due_before (Optional[str]): Only tasks due before this date.
+            due_after (Optional[str]): Only tasks due after this date.
+            sort (Optional[str]): One of SORT_FIELDS, or None for list order.
+            reverse (bool): Reverse the order.
+            limit (Optional[int]): The maximum number of tasks, or None for all.
+            offset (int): How many matching tasks to skip first.
 
         Returns:
             List[Task]: A list of matching tasks.
+
+        Raises:
+            ValueError: If a due-date bound is not a valid date, the sort field
+                        is unknown, or limit or offset is negative.
+        """
+        tasks = self._matching(project, priority, status, due_before, due_after)
+        if sort or reverse or limit is not None or offset:
+            return page_tasks(tasks, sort, reverse, limit, offset)
+        return tasks
+
+    def _matching(self, project: Optional[str], priority: Optional[str], status: Optional[str], due_before: Optional[str], due_after: Optional[str]) -> List[Task]:
         """
-        filtered_tasks = self.tasks
+        Returns the tasks matching the filters of ``list_tasks``, in list order.
+        """
+        filters = {}
         if project:
-            filtered_tasks = [t for t in filtered_tasks if t.project == project]
+            filters["project"] = project
         if priority:
-            filtered_tasks = [t for t in filtered_tasks if t.priority == priority]
-        return filtered_tasks
+            filters["priority"] = priority
+        if status:
+            filters["status"] = status
+        due_before = optional_due_date(due_before)
+        due_after = optional_due_date(due_after)
+        if due_before or due_after:
+            tasks = self.due_tasks(after=due_after, before=due_before, **filters)
+            return sorted(tasks, key=lambda task: task.id) if self._use_queries() else self._in_list_order(tasks)
+        if self._use_queries():
+            tasks = self.storage.query_tasks(project, priority, status)
+            if self._changed or self._deleted:
+                tasks = self._overlay(tasks, lambda t: all(getattr(t, field) == value for field, value in filters.items()))
+            return tasks
+        if not filters:
+            return self.tasks
+        if self._tasks is None and not (self._changed or self._deleted):
+            # Nothing loaded yet: filter while streaming rather than loading
+            # and indexing every task for one query
+            with profiling.span("manager.filter"):
+                return [task for task in self.storage.iter_tasks()
+                        if all(getattr(task, field) == value for field, value in filters.items())]
+        self._load()
+        with profiling.span("manager.filter"):
+            return self._select(**filters)
+
+    def _in_list_order(self, tasks: List[Task]) -> List[Task]:
+        """
+        Sorts loaded tasks by their position in the task list.
+        """
+        position = self._position
+        return sorted(tasks, key=lambda task: position[task.id])
+
+    def due_tasks(self, after: Optional[str] = None, before: Optional[str] = None, **filters) -> List[Task]:
+        """
+        Returns the tasks due strictly between two dates, ordered by due date.
+
+        Tasks without a due date never match. With tasks loaded this is a
+        range scan of the sorted due-date index; query backends run it as an
+        indexed query instead.
+
+        Args:
+            after (Optional[str]): Exclusive lower bound (YYYY-MM-DD), or None.
+            before (Optional[str]): Exclusive upper bound (YYYY-MM-DD), or None.
+            **filters: Exact-match filters on project, priority or status.
+
+        Returns:
+            List[Task]: The tasks, ordered by due date then ID.
+        """
+        def matches(task):
+            return (task.due_date is not None
+                    and (after is None or task.due_date > after)
+                    and (before is None or task.due_date < before)
+                    and all(getattr(task, field) == value for field, value in filters.items()))
+
+        if self._use_queries():
+            tasks = self.storage.query_tasks(due_after=after, due_before=before, **filters)
+            if self._changed or self._deleted:
+                tasks = self._overlay(tasks, matches)
+            return sorted(tasks, key=lambda task: (task.due_date, task.id))
+        self._load()
+        with profiling.span("manager.filter"):
+            tasks = self._due_range(after, before)
+            if filters:
+                tasks = [task for task in tasks if matches(task)]
+        return tasks
+
+    def overdue_tasks(self) -> List[Task]:
+        """
+        Returns the pending tasks whose due date has passed.
+
+        Returns:
+            List[Task]: The tasks, oldest due date first.
+        """
+        return self.due_tasks(before=today().isoformat(), status="pending")
+
+    def agenda(self, days: int = 7) -> List[Task]:
+        """
+        Returns the pending tasks due today or within the next days.
+
+        Args:
+            days (int): How many days to cover, including today.
+
+        Returns:
+            List[Task]: The tasks, by due date.
+        """
+        start = today().isoformat()
+        return self.due_tasks(after=add_days(start, -1), before=add_days(start, days), status="pending")
 
     def update_task(self, task_id: int, title: Optional[str] = None, project: Optional[str] = None, priority: Optional[str] = None, recurrence: Optional[str] = None, status: Optional[str] = None, due_date: Optional[str] = None) -> Optional[Task]:
         """
@@ -124,32 +889,40 @@ class TaskManager:
             priority (Optional[str]): New priority.
             recurrence (Optional[str]): New recurrence.
             status (Optional[str]): New status.
-            due_date (Optional[str]): New due date.
+            due_date (Optional[str]): New due date, normalized to YYYY-MM-DD.
 
         Returns:
             Optional[Task]: The updated task, or None if not found.
+
+        Raises:
+            ValueError: If the due date is invalid.
         """
-        for task in self.tasks:
-            if task.id == task_id:
-                if title:
-                    task.title = title
-                if project:
-                    task.project = project
-                if priority:
-                    task.priority = priority
-                if recurrence:
-                    task.recurrence = recurrence
-                if status:
-                    # if changing from done to pending, clear completed_at
-                    if task.status == "done" and status == "pending":
-                        task.completed_at = None
-                    task.status = status
-                if due_date:
-                    task.due_date = due_date
-                
-                self.storage.save_tasks(self.tasks)
-                return task
-        return None
+        if due_date:
+            due_date = normalize_due_date(due_date)
+        with self.batch():
+            task = self.get_task_by_id(task_id)
+            if task is None:
+                return None
+
+            self._before_change(task)
+            if title:
+                task.title = title
+            if project:
+                task.project = project
+            if priority:
+                task.priority = priority
+            if recurrence:
+                task.recurrence = recurrence
+            if status:
+                # if changing from done to pending, clear completed_at and count the relist
+                if task.status == "done" and status == "pending":
+                    task.completed_at = None
+                    task.relist_count += 1
+                task.status = status
+            if due_date:
+                task.due_date = due_date
+            self._after_change(task)
+        return task
 
     def delete_task(self, task_id: int) -> bool:
         """
@@ -161,12 +934,12 @@ class TaskManager:
         Returns:
             bool: True if the task was deleted, False if not found.
         """
-        initial_count = len(self.tasks)
-        self.tasks = [t for t in self.tasks if t.id != task_id]
-        if len(self.tasks) < initial_count:
-            self.storage.save_tasks(self.tasks)
-            return True
-        return False
+        with self.batch():
+            task = self.get_task_by_id(task_id)
+            if task is None:
+                return False
+            self._remove(task)
+        return True
 
     def complete_task(self, task_id: int) -> bool:
         """
@@ -178,21 +951,229 @@ class TaskManager:
         Returns:
             bool: True if the task was completed, False if not found.
         """
-        for task in self.tasks:
-            if task.id == task_id:
-                task.status = "done"
-                task.completed_at = datetime.datetime.now().isoformat()
-                
-                # Handle recurrence
-                if task.recurrence:
-                    self.add_task(
-                        title=task.title,
-                        project=task.project,
-                        priority=task.priority,
-                        recurrence=task.recurrence,
-                        due_date=task.due_date
-                    )
-                
-                self.storage.save_tasks(self.tasks)
-                return True
-        return False
+        with self.batch():
+            task = self.get_task_by_id(task_id)
+            if task is None:
+                return False
+
+            self._before_change(task)
+            task.status = "done"
+            task.completed_at = datetime.datetime.now().isoformat()
+            self._after_change(task)
+
+            # Handle recurrence. The follow-up continues this task, so it is not a
+            # duplicate. Its due date advances by one period; custom patterns and
+            # missing or pre-validation dates are copied as is.
+            if task.recurrence:
+                due_date = next_due_date(task.due_date, task.recurrence, self._series_day(task))
+                if due_date is None:
+                    due_date = task.due_date
+                elif self._has_occurrence(task, due_date):
+                    # Already generated, e.g. by rollover
+                    return True
+                self._add(
+                    title=task.title,
+                    project=task.project,
+                    priority=task.priority,
+                    recurrence=task.recurrence,
+                    due_date=due_date,
+                    allow_duplicates=True
+                )
+        return True
+
+    def _series_day(self, task: Task) -> Optional[int]:
+        """
+        Finds the day of month a monthly series is anchored on, so that a
+        date clamped to the end of a short month does not become the new day.
+        Only such dates need the earlier occurrences, found by due date.
+        """
+        if task.recurrence.lower() != RECURRENCE_MONTHLY or not may_be_clamped(task.due_date):
+            return None
+        filters = {"project": task.project} if task.project else {}
+        earlier = [other.due_date for other in self.due_tasks(before=task.due_date, **filters)
+                   if other.title == task.title and other.project == task.project and other.recurrence == task.recurrence]
+        return anchor_day(earlier + [task.due_date])
+
+    def _has_occurrence(self, task: Task, due_date: str) -> bool:
+        """
+        Checks whether the series of a recurring task already has a task due
+        on the given date, using the due-date index.
+        """
+        filters = {"project": task.project} if task.project else {}
+        return any(other.title == task.title and other.project == task.project and other.recurrence == task.recurrence
+                   for other in self.due_tasks(after=add_days(due_date, -1), before=add_days(due_date, 1), **filters))
+
+    def rollover(self, until: Optional[str] = None) -> Dict[str, int]:
+        """
+        Generates every missed occurrence of every recurring task up to a date.
+
+        Tasks with the same title, project and recurrence form a series. For
+        each series with a daily, weekly or monthly recurrence and a due date,
+        a pending task is added for each due date after the latest one in the
+        series, up to and including ``until``. Re-running with the same date
+        adds nothing. Everything is written in one batch.
+
+        Args:
+            until (Optional[str]): The last due date to generate; defaults to today.
+
+        Returns:
+            Dict[str, int]: Counts of "created" tasks and of "series" that got any.
+
+        Raises:
+            ValueError: If ``until`` is not a valid date.
+        """
+        until = normalize_due_date(until) if until else today().isoformat()
+        calculator = OccurrenceCalculator(until)
+        counts = {"created": 0, "series": 0}
+        with self.batch():
+            self._load()
+            latest: Dict[tuple, Task] = {}
+            # Due dates of monthly series, for their day of month
+            monthly: Dict[tuple, List[str]] = {}
+            for task in self._tasks:
+                if task.recurrence and task.due_date:
+                    key = (task.title, task.project, task.recurrence)
+                    current = latest.get(key)
+                    if current is None or task.due_date > current.due_date:
+                        latest[key] = task
+                    if task.recurrence.lower() == RECURRENCE_MONTHLY:
+                        monthly.setdefault(key, []).append(task.due_date)
+
+            created_at = datetime.datetime.now().isoformat()
+            inserted = []
+            # Re-sort the due-date index once at the end instead of per insert
+            due, self._due = self._due, None
+            try:
+                for key, task in latest.items():
+                    day = anchor_day(monthly[key]) if key in monthly else None
+                    dates = calculator.after(task.due_date, task.recurrence, day)
+                    if dates:
+                        counts["series"] += 1
+                    for due_date in dates:
+                        occurrence = Task(id=self._next_id, title=task.title, project=task.project, priority=task.priority,
+                                          recurrence=task.recurrence, created_at=created_at, due_date=due_date)
+                        self._insert(occurrence)
+                        inserted.append((due_date, occurrence.id))
+            finally:
+                due.extend(inserted)
+                due.sort()
+                self._due = due
+            counts["created"] = len(inserted)
+        return counts
+
+    def archive_tasks(self, older_than_days: int = 0, auto_date: Optional[str] = None) -> int:
+        """
+        Moves completed tasks out of the storage into the archive.
+
+        The tasks are written to a new archive segment before they are removed
+        from the storage. If the removal fails the segment is discarded again;
+        only a crash in between leaves a copy in both tiers, rather than
+        losing them. Done tasks without a completion time are archived
+        regardless of age.
+
+        Args:
+            older_than_days (int): Only archive tasks completed at least this
+                                   many days ago.
+            auto_date (Optional[str]): Recorded as the date of the last
+                                       automatic run (see ``auto_archive``).
+
+        Returns:
+            int: The number of tasks archived.
+
+        Raises:
+            ValueError: If the storage backend has no archive.
+        """
+        if self.archive is None:
+            raise ValueError("Archiving is not supported by this storage backend")
+        cutoff = (datetime.datetime.now() - datetime.timedelta(days=older_than_days)).isoformat()
+        if not self.storage.supports_queries:
+            self._load()
+        tasks = [task for task in self.list_tasks(status="done")
+                 if task.completed_at is None or task.completed_at <= cutoff]
+        with self.archive.appending(tasks, auto_date=auto_date), self.batch():
+            self._remove_many(tasks)
+            self._archived.update(task.id for task in tasks)
+        return len(tasks)
+
+    def auto_archive(self, older_than_days: int) -> int:
+        """
+        Runs ``archive_tasks`` at most once a day.
+
+        Args:
+            older_than_days (int): Only archive tasks completed at least this
+                                   many days ago.
+
+        Returns:
+            int: The number of tasks archived; 0 if it already ran today.
+        """
+        date = today().isoformat()
+        if self.archive is None or self.archive.last_auto() == date:
+            return 0
+        return self.archive_tasks(older_than_days, auto_date=date)
+
+    def archived_tasks(self, project: Optional[str] = None, priority: Optional[str] = None, status: Optional[str] = None, due_before: Optional[str] = None, due_after: Optional[str] = None, exclude: Iterable[int] = ()) -> Iterator[Task]:
+        """
+        Streams archived tasks lazily, with the same filters as ``list_tasks``.
+
+        Args:
+            project (Optional[str]): Filter by project name.
+            priority (Optional[str]): Filter by priority level.
+            status (Optional[str]): Filter by status.
+            due_before (Optional[str]): Only tasks due before this date.
+            due_after (Optional[str]): Only tasks due after this date.
+            exclude (Iterable[int]): IDs to skip, e.g. of tasks already listed
+                                     from the storage.
+
+        Returns:
+            Iterator[Task]: The archived tasks, in the order they were archived.
+
+        Raises:
+            ValueError: If a due-date bound is not a valid date.
+        """
+        if self.archive is None:
+            return iter(())
+        exclude = set(exclude)
+        tasks = self.archive.iter_tasks(project, priority, status, optional_due_date(due_after), optional_due_date(due_before))
+        return (task for task in tasks if task.id not in exclude)
+
+    def stats(self) -> Stats:
+        """
+        Returns the aggregates over the stored tasks.
+
+        They come from the storage when it persists them, which takes no scan
+        of the tasks; otherwise they are computed from every task.
+
+        Returns:
+            Stats: The aggregates.
+        """
+        stored = self.storage.load_stats() if self._tasks is None or not (self._changed or self._deleted) else None
+        if stored is not None:
+            return Stats(stored)
+        return self._scan_stats()
+
+    def _scan_stats(self) -> Stats:
+        """
+        Computes the aggregates from every task, with the completion history
+        of the archived ones.
+        """
+        with profiling.span("manager.stats"):
+            stats = Stats.from_tasks(self.tasks)
+        if self.archive is not None:
+            stats.merge(self.archive.history())
+        return stats
+
+    def recompute_stats(self) -> Dict[str, object]:
+        """
+        Recomputes the aggregates from every task, compares them with the
+        stored ones and stores them if they differ.
+
+        Returns:
+            Dict[str, object]: "stats", the recomputed Stats, and "matched",
+                               whether the stored aggregates were correct.
+        """
+        stored = self.storage.load_stats()
+        stats = self._scan_stats()
+        matched = stored is not None and Stats(stored).to_dict() == stats.to_dict()
+        if not matched:
+            self.storage.save_stats(stats.to_dict())
+        return {"stats": stats, "matched": matched}
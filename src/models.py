@@ -1,7 +1,36 @@
 import datetime
-from dataclasses import dataclass, asdict
+import sys
+from dataclasses import dataclass, fields
 from typing import Optional
+from .codec import compile_decoder, compile_encoder
 
+# String fields interned so that equal values share one object
+INTERNED_FIELDS = ("status", "priority", "project", "recurrence")
+
+def _slotted(cls):
+    """
+    Recreates a dataclass with ``__slots__`` so instances carry no ``__dict__``.
+
+    This is what ``dataclass(slots=True)`` does on Python 3.10+, kept here so
+    older interpreters get the same memory savings.
+
+    Args:
+        cls (type): The dataclass to rebuild.
+
+    Returns:
+        type: An equivalent class with a slot per field.
+    """
+    names = tuple(f.name for f in fields(cls))
+    namespace = dict(cls.__dict__)
+    namespace["__slots__"] = names
+    for name in names:
+        # Defaults live in the generated __init__, so the class attributes can go
+        namespace.pop(name, None)
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+@_slotted
 @dataclass
 class Task:
     """
@@ -17,6 +46,7 @@ class Task:
         created_at (str): ISO format timestamp of when the task was created.
         completed_at (Optional[str]): ISO format timestamp of when the task was completed.
         due_date (Optional[str]): Due date for the task in YYYY-MM-DD format.
+        relist_count (int): How many times the task went from done back to pending.
     """
     id: int
     title: str
@@ -27,13 +57,23 @@ class Task:
     created_at: str = "" 
     completed_at: Optional[str] = None
     due_date: Optional[str] = None
+    relist_count: int = 0
 
     def __post_init__(self):
         """
         Post-initialization hook to set the creation timestamp if not provided.
+
+        The enum-like string fields are interned so that every task shares one
+        copy of values such as "pending", "Medium" or a project name.
         """
         if not self.created_at:
-            self.created_at = datetime.datetime.now().isoformat()
+            self.created_at = _now()
+        self.status = sys.intern(self.status)
+        self.priority = sys.intern(self.priority)
+        if self.project is not None:
+            self.project = sys.intern(self.project)
+        if self.recurrence is not None:
+            self.recurrence = sys.intern(self.recurrence)
 
     def to_dict(self):
         """
@@ -42,17 +82,31 @@ class Task:
         Returns:
             dict: A dictionary representation of the task.
         """
-        return asdict(self)
+        return _encode(self)
 
     @classmethod
     def from_dict(cls, data):
         """
         Creates a Task instance from a dictionary.
 
+        Unknown keys are ignored and missing ones get their defaults, so
+        records written by other versions load. The fields are set directly,
+        with the same interning and creation timestamp as ``__post_init__``.
+
         Args:
             data (dict): A dictionary containing task data.
 
         Returns:
             Task: A new Task instance.
+
+        Raises:
+            TypeError: If the id or title is missing.
         """
-        return cls(**data)
+        return _decode(data)
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
+
+# Field-by-field converters generated for Task (see codec)
+_encode = compile_encoder(Task)
+_decode = compile_decoder(Task, interned=INTERNED_FIELDS, factories={"created_at": _now})
@@ -0,0 +1,151 @@
+"""
+Lightweight hot-path instrumentation.
+
+Code marks phases with ``with profiling.span("name"):`` and bumps counters with
+``profiling.count("name", n)``. Both are no-ops until ``enable()`` is called:
+``span`` then returns a shared do-nothing context manager and ``count`` returns
+immediately, so instrumented code pays only a function call when profiling is
+off.
+"""
+import json
+import time
+from typing import Dict, List
+
+_enabled = False
+# span name -> [calls, total seconds]
+_spans: Dict[str, List[float]] = {}
+_counters: Dict[str, int] = {}
+
+
+class _NullSpan:
+    """
+    The context manager handed out while profiling is disabled.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """
+    Times one entry into a named phase.
+    """
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        stats = _spans.get(self.name)
+        if stats is None:
+            _spans[self.name] = [1, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+        return False
+
+
+def enable():
+    """
+    Turns instrumentation on and clears previous measurements.
+    """
+    global _enabled
+    _enabled = True
+    reset()
+
+
+def disable():
+    """
+    Turns instrumentation off. Measurements are kept until ``reset``.
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """
+    Returns whether instrumentation is on.
+    """
+    return _enabled
+
+
+def reset():
+    """
+    Clears every span and counter.
+    """
+    _spans.clear()
+    _counters.clear()
+
+
+def span(name: str):
+    """
+    Returns a context manager that times the enclosed block under ``name``.
+
+    Args:
+        name (str): The phase name, e.g. "storage.parse".
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def count(name: str, value: int = 1):
+    """
+    Adds ``value`` to the counter ``name``.
+
+    Args:
+        name (str): The counter name, e.g. "tasks_loaded".
+        value (int): The amount to add.
+    """
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def report() -> dict:
+    """
+    Returns the measurements collected so far.
+
+    Returns:
+        dict: {"spans": {name: {"calls": n, "ms": total}}, "counters": {name: value}}
+    """
+    return {
+        "spans": {name: {"calls": int(calls), "ms": round(total * 1000, 3)}
+                  for name, (calls, total) in _spans.items()},
+        "counters": dict(_counters),
+    }
+
+
+def format_report(fmt: str = "text") -> str:
+    """
+    Formats the measurements as a phase table or as JSON.
+
+    Args:
+        fmt (str): "text" or "json".
+
+    Returns:
+        str: The formatted report.
+    """
+    data = report()
+    if fmt == "json":
+        return json.dumps(data)
+    lines = [f"{'phase':<28} {'calls':>7} {'total ms':>10}"]
+    for name, stats in sorted(data["spans"].items(), key=lambda item: -item[1]["ms"]):
+        lines.append(f"{name:<28} {stats['calls']:>7} {stats['ms']:>10.2f}")
+    if data["counters"]:
+        lines.append("")
+        lines.append(f"{'counter':<28} {'value':>18}")
+        for name, value in sorted(data["counters"].items()):
+            lines.append(f"{name:<28} {value:>18}")
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+import calendar
+import datetime
+from typing import Dict, Iterable, List, Optional
+from .constants import RECURRENCE_DAILY, RECURRENCE_WEEKLY, RECURRENCE_MONTHLY
+
+# Fixed-length recurrences, in days. Monthly steps are computed by calendar.
+STEP_DAYS = {RECURRENCE_DAILY: 1, RECURRENCE_WEEKLY: 7}
+RECURRENCES = (RECURRENCE_DAILY, RECURRENCE_WEEKLY, RECURRENCE_MONTHLY)
+
+
+def _add_months(date: datetime.date, months: int, day: Optional[int] = None) -> datetime.date:
+    """
+    Shifts a date by whole months, clamping the day to the month's length.
+
+    ``day`` replaces the day of ``date``, so a series anchored on the 31st can
+    step from a clamped date such as Feb 28 back to the 31st.
+    """
+    years, month = divmod(date.month - 1 + months, 12)
+    year = date.year + years
+    day = min(day or date.day, calendar.monthrange(year, month + 1)[1])
+    return datetime.date(year, month + 1, day)
+
+
+def may_be_clamped(due_date: str) -> bool:
+    """
+    Checks whether a monthly due date could have been moved back from a later
+    day of the month, i.e. whether it is the last day of a short month.
+    """
+    try:
+        date = datetime.date.fromisoformat(due_date)
+    except (TypeError, ValueError):
+        return False
+    last = calendar.monthrange(date.year, date.month)[1]
+    return date.day == last < 31
+
+
+def anchor_day(due_dates: Iterable[str]) -> Optional[int]:
+    """
+    Derives the day of month of a monthly series from its due dates.
+
+    Clamping only ever moves a date to an earlier day, so the latest day of
+    month among the occurrences is the one the series was anchored on.
+
+    Args:
+        due_dates (Iterable[str]): Due dates (YYYY-MM-DD) of the series.
+
+    Returns:
+        Optional[int]: The anchor day, or None if there are no valid dates.
+    """
+    days = []
+    for due_date in due_dates:
+        try:
+            days.append(datetime.date.fromisoformat(due_date).day)
+        except (TypeError, ValueError):
+            continue
+    return max(days, default=None)
+
+
+def _parse(due_date: Optional[str], recurrence: Optional[str]) -> Optional[datetime.date]:
+    """
+    Returns the due date as a date if both it and the recurrence are usable.
+    """
+    if not due_date or not recurrence or recurrence.lower() not in RECURRENCES:
+        return None
+    try:
+        return datetime.date.fromisoformat(due_date)
+    except ValueError:
+        return None
+
+
+def next_due_date(due_date: Optional[str], recurrence: Optional[str], day: Optional[int] = None) -> Optional[str]:
+    """
+    Computes the due date of the occurrence after ``due_date``.
+
+    Args:
+        due_date (Optional[str]): The current due date (YYYY-MM-DD).
+        recurrence (Optional[str]): One of RECURRENCES, in any case.
+        day (Optional[int]): The day of month of a monthly series (see
+                             ``anchor_day``); defaults to that of ``due_date``.
+
+    Returns:
+        Optional[str]: The next due date, or None if the recurrence is not one
+                       of RECURRENCES or the due date is missing or not ISO.
+    """
+    start = _parse(due_date, recurrence)
+    if start is None:
+        return None
+    step = STEP_DAYS.get(recurrence.lower())
+    if step is not None:
+        return (start + datetime.timedelta(days=step)).isoformat()
+    return _add_months(start, 1, day).isoformat()
+
+
+class OccurrenceCalculator:
+    """
+    Computes the occurrences of many recurring series up to one date.
+
+    Daily and weekly series step through date ordinals, and each ordinal is
+    formatted once per calculator, so thousands of series that share dates
+    cost little more than one.
+
+    Attributes:
+        until (str): The last date to generate (YYYY-MM-DD), inclusive.
+    """
+    def __init__(self, until: str):
+        """
+        Initializes the OccurrenceCalculator.
+
+        Args:
+            until (str): The last date to generate (YYYY-MM-DD), inclusive.
+        """
+        self.until = until
+        self._until = datetime.date.fromisoformat(until)
+        self._formatted: Dict[int, str] = {}
+
+    def _format(self, ordinal: int) -> str:
+        text = self._formatted.get(ordinal)
+        if text is None:
+            text = self._formatted[ordinal] = datetime.date.fromordinal(ordinal).isoformat()
+        return text
+
+    def after(self, due_date: Optional[str], recurrence: Optional[str], day: Optional[int] = None) -> List[str]:
+        """
+        Lists the due dates that follow ``due_date`` up to ``until``.
+
+        Monthly dates keep the series' day of month, so a series due on the
+        31st comes back to the 31st after shorter months.
+
+        Args:
+            due_date (Optional[str]): The latest existing due date of the series.
+            recurrence (Optional[str]): One of RECURRENCES, in any case.
+            day (Optional[int]): The day of month of a monthly series (see
+                                 ``anchor_day``); defaults to that of ``due_date``.
+
+        Returns:
+            List[str]: The missing due dates, oldest first; empty if the series
+                       is up to date or cannot be computed.
+        """
+        start = _parse(due_date, recurrence)
+        if start is None or start >= self._until:
+            return []
+        step = STEP_DAYS.get(recurrence.lower())
+        if step is not None:
+            first = start.toordinal() + step
+            return [self._format(ordinal) for ordinal in range(first, self._until.toordinal() + 1, step)]
+        dates = []
+        months = 1
+        while True:
+            date = _add_months(start, months, day)
+            if date > self._until:
+                return dates
+            dates.append(date.isoformat())
+            months += 1
@@ -0,0 +1,394 @@
+import json
+import marshal
+import math
+import os
+import re
+import sys
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set
+from . import profiling
+from .models import Task
+
+# Bump when the snapshot layout or the tokenizer changes.
+INDEX_VERSION = 2
+# Fold the log into a new snapshot once it grows past this many bytes.
+DEFAULT_COMPACT_THRESHOLD = 1024 * 1024
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    Splits text into lowercase word tokens.
+
+    Args:
+        text (Optional[str]): The text to split.
+
+    Returns:
+        List[str]: The tokens, in order, with duplicates.
+    """
+    if not text:
+        return []
+    return _TOKEN.findall(text.lower())
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """
+    Parses a search query into OR-groups of AND-terms.
+
+    Terms are ANDed; the keyword ``OR`` separates alternatives, and ``AND``
+    may be written for clarity. A term ending in ``*`` matches any word that
+    starts with it.
+
+    Example:
+        ``"deploy* api OR release"`` -> ``[["deploy*", "api"], ["release"]]``
+
+    Args:
+        query (str): The query text.
+
+    Returns:
+        List[List[str]]: The non-empty groups.
+    """
+    groups = [[]]
+    for word in query.split():
+        if word == "OR":
+            groups.append([])
+        elif word != "AND":
+            prefix = word.endswith("*")
+            for token in tokenize(word):
+                groups[-1].append(token)
+            if prefix and groups[-1]:
+                groups[-1][-1] += "*"
+    return [group for group in groups if group]
+
+
+@dataclass
+class SearchHit:
+    """
+    A task matched by a search, with the fields the index keeps.
+    """
+    id: int
+    title: str
+    project: Optional[str]
+    status: str
+    score: float
+
+
+class SearchIndex:
+    """
+    A persistent inverted index over task titles and projects.
+
+    The index lives next to the storage file as a marshal snapshot
+    (``<file>.search``) plus an append-only JSON log (``<file>.search.log``).
+    Every commit appends one log record with the changed and deleted tasks and
+    the storage ``state_token`` before and after the commit; loading replays
+    the log over the snapshot. If the records do not chain from the snapshot
+    to the storage's current token (a writer that did not maintain the index,
+    a lost append), the index is rebuilt from the storage instead.
+
+    In memory the index holds a posting set of task IDs per token, a sorted
+    vocabulary for prefix lookups, and the title, project and status of each
+    task so results can be shown without loading the tasks.
+
+    Attributes:
+        storage (BaseStorage): The storage the index is derived from.
+        path (str): The path of the snapshot file.
+        log_path (str): The path of the log file.
+        compact_threshold (int): Log size in bytes that triggers compaction.
+    """
+    def __init__(self, storage, path: Optional[str] = None, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD):
+        """
+        Initializes the SearchIndex. Nothing is read until the first search.
+
+        Args:
+            storage (BaseStorage): The storage the index is derived from.
+            path (Optional[str]): The snapshot path. Defaults to
+                                  ``<storage.file_path>.search``.
+            compact_threshold (int): Log size in bytes that triggers compaction.
+        """
+        self.storage = storage
+        self.path = path or storage.file_path + ".search"
+        self.log_path = self.path + ".log"
+        self.compact_threshold = compact_threshold
+        self._loaded = False
+        self._token = None
+        self._log_offset = 0
+        self._docs: Dict[int, tuple] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocab: List[str] = []
+
+    @staticmethod
+    def _normalize(token):
+        # Tokens round-trip through JSON in the log, so compare them as JSON
+        return json.loads(json.dumps(token))
+
+    def _add(self, task_id: int, title: str, project: Optional[str], status: str):
+        """
+        Indexes one task, replacing any previous entry for its ID.
+        """
+        if task_id in self._docs:
+            self._remove(task_id)
+        self._docs[task_id] = (title, project, status)
+        postings = self._postings
+        for token in set(tokenize(title) + tokenize(project)):
+            ids = postings.get(token)
+            if ids is None:
+                token = sys.intern(token)
+                postings[token] = {task_id}
+                if self._loaded:
+                    insort(self._vocab, token)
+            else:
+                ids.add(task_id)
+
+    def _remove(self, task_id: int):
+        """
+        Drops one task from the index. Emptied tokens stay in the vocabulary
+        and are skipped by lookups until the next compaction.
+        """
+        doc = self._docs.pop(task_id, None)
+        if doc is None:
+            return
+        for token in set(tokenize(doc[0]) + tokenize(doc[1])):
+            ids = self._postings.get(token)
+            if ids is not None:
+                ids.discard(task_id)
+
+    def _apply(self, record: dict):
+        """
+        Applies one log record.
+        """
+        for task_id in record["del"]:
+            self._remove(task_id)
+        for task_id, title, project, status in record["put"]:
+            self._add(task_id, title, project, status)
+
+    def _load(self) -> bool:
+        """
+        Loads the snapshot and replays the log.
+
+        Returns:
+            bool: True if the result matches the storage's current state.
+        """
+        current = self._normalize(self.storage.state_token())
+        try:
+            with open(self.path, 'rb') as f:
+                header_size = int.from_bytes(f.read(4), 'little')
+                version, token = marshal.loads(f.read(header_size))
+                if version != INDEX_VERSION:
+                    return False
+                self._docs, self._postings, self._vocab = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        self._token = token
+        self._log_offset = 0
+        self._loaded = True
+        self._replay()
+        return self._token is not None and self._token == current
+
+    def _replay(self):
+        """
+        Applies the log records written since ``_log_offset`` that chain from
+        the current token. Sets the token to None if the chain is broken.
+        """
+        try:
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._log_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    self._log_offset += len(line)
+                    try:
+                        record = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        self._token = None
+                        continue
+                    if self._token is None or record["from"] != self._token:
+                        self._token = None
+                        continue
+                    self._apply(record)
+                    self._token = record["to"]
+        except FileNotFoundError:
+            pass
+
+    def rebuild(self):
+        """
+        Builds the index from every stored task and writes a new snapshot.
+        """
+        with profiling.span("search.rebuild"):
+            token = self._normalize(self.storage.state_token())
+            tasks = self.storage.load_tasks()
+            self._docs, self._postings, self._vocab = {}, {}, []
+            self._loaded = False
+            for task in tasks:
+                self._add(task.id, task.title, task.project, task.status)
+            self._token = token
+            self._loaded = True
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        """
+        Writes the in-memory index as the new snapshot and empties the log.
+
+        A record appended by another process in between is lost, which breaks
+        the chain and triggers a rebuild on the next load.
+        """
+        self._vocab = sorted(token for token, ids in self._postings.items() if ids)
+        self._postings = {token: self._postings[token] for token in self._vocab}
+        temp_name = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            header = marshal.dumps((INDEX_VERSION, self._token))
+            with open(temp_name, 'wb') as f:
+                f.write(len(header).to_bytes(4, 'little'))
+                f.write(header)
+                f.write(marshal.dumps((self._docs, self._postings, self._vocab)))
+            os.replace(temp_name, self.path)
+            with open(self.log_path, 'wb'):
+                pass
+            self._log_offset = 0
+        except (OSError, ValueError):
+            if os.path.exists(temp_name):
+                os.remove(temp_name)
+
+    def _ensure_current(self):
+        """
+        Brings the in-memory index up to date with the storage, loading,
+        replaying or rebuilding as needed.
+        """
+        current = self._normalize(self.storage.state_token())
+        if self._loaded and self._token is not None:
+            if self._token == current:
+                return
+            # Another process committed: pick up its log records
+            self._replay()
+            if self._token == current:
+                return
+        with profiling.span("search.load"):
+            if self._load():
+                if self._log_offset >= self.compact_threshold:
+                    self._write_snapshot()
+                return
+        self.rebuild()
+
+    def record(self, changed: Iterable[Task], deleted: Iterable[int], transition: Optional[tuple]):
+        """
+        Logs a commit. Called by TaskManager after every successful persist.
+
+        Does nothing until the index has been built once, so stores that are
+        never searched pay only for an existence check.
+
+        Args:
+            changed (Iterable[Task]): Tasks that were added or modified.
+            deleted (Iterable[int]): IDs of tasks that were removed.
+            transition (Optional[tuple]): The storage's ``state_token`` before
+                                          and after the commit.
+        """
+        if transition is None or not os.path.exists(self.path):
+            return
+        before, after = transition
+        record = {
+            "from": self._normalize(before),
+            "to": self._normalize(after),
+            "put": [[task.id, task.title, task.project, task.status] for task in changed],
+            "del": list(deleted),
+        }
+        data = (json.dumps(record) + "\n").encode('utf-8')
+        try:
+            with open(self.log_path, 'ab') as f:
+                offset = f.tell()
+                f.write(data)
+        except OSError:
+            return
+        if self._loaded and self._token == record["from"] and offset == self._log_offset:
+            # Keep a resident index (e.g. in the daemon) current without re-reading
+            self._apply(record)
+            self._token = record["to"]
+            self._log_offset += len(data)
+
+    def _lookup(self, term: str) -> Iterable[int]:
+        """
+        Returns the IDs of tasks containing a token, or any token with the
+        given prefix when the term ends in ``*``.
+        """
+        if not term.endswith("*"):
+            return self._postings.get(term, ())
+        prefix = term[:-1]
+        ids = []
+        vocab = self._vocab
+        i = bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            ids.extend(self._postings.get(vocab[i], ()))
+            i += 1
+        return ids
+
+    @staticmethod
+    def _has(doc: tuple, term: str) -> bool:
+        """
+        Checks whether an indexed task's title or project contains a term.
+        """
+        tokens = tokenize(doc[0]) + tokenize(doc[1])
+        if term.endswith("*"):
+            prefix = term[:-1]
+            return any(token.startswith(prefix) for token in tokens)
+        return term in tokens
+
+    def search(self, query: str, limit: Optional[int] = 20) -> List[SearchHit]:
+        """
+        Finds the tasks matching a query, best first.
+
+        Within an AND-group only the rarest term's posting list is read; the
+        other terms are checked against the matching tasks' titles, so a query
+        costs time proportional to its rarest term. Each group a task matches
+        adds the inverse document frequencies of the group's terms to its
+        score, so rare words weigh more than common ones. Ties go to pending
+        tasks, then to lower IDs.
+
+        Args:
+            query (str): The query (see ``parse_query``).
+            limit (Optional[int]): The maximum number of hits, or None for all.
+
+        Returns:
+            List[SearchHit]: The hits.
+        """
+        self._ensure_current()
+        with profiling.span("search.query"):
+            docs = self._docs
+            total = max(len(docs), 1)
+            groups = []
+            for group in parse_query(query):
+                lookups = sorted(((self._lookup(term), term) for term in group), key=lambda pair: len(pair[0]))
+                weight = sum(math.log(1 + total / max(len(ids), 1)) for ids, _ in lookups)
+                matched = set(lookups[0][0])
+                others = [term for _, term in lookups[1:]]
+                if others:
+                    matched = {task_id for task_id in matched if all(self._has(docs[task_id], term) for term in others)}
+                groups.append((matched, weight))
+
+            # Scores take few distinct values (one per combination of groups),
+            # so hits are ranked level by level rather than sorted by a key
+            if len(groups) == 1:
+                levels = {groups[0][1]: groups[0][0]}
+                hit_count = len(groups[0][0])
+            else:
+                scores: Dict[int, float] = {}
+                for matched, weight in groups:
+                    for task_id in matched & scores.keys():
+                        scores[task_id] += weight
+                    scores.update(dict.fromkeys(matched - scores.keys(), weight))
+                levels = {}
+                for task_id, score in scores.items():
+                    levels.setdefault(score, []).append(task_id)
+                hit_count = len(scores)
+
+            def ranked():
+                for score in sorted(levels, reverse=True):
+                    ids = sorted(levels[score])
+                    for pending in (True, False):
+                        for task_id in ids:
+                            if (docs[task_id][2] == "pending") == pending:
+                                yield task_id, score
+
+            hits = [SearchHit(task_id, *docs[task_id], score) for task_id, score in islice(ranked(), limit)]
+            profiling.count("search_hits", hit_count)
+        return hits
@@ -0,0 +1,537 @@
+import json
+import os
+import re
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from . import profiling
+from .constants import STATUS_DONE
+from .models import Task
+from .stats import Stats
+from .storage import BaseStorage, FileLockMixin
+
+MANIFEST_NAME = "manifest.json"
+ID_MAP_NAME = "ids.bin"
+# Bytes per ID map entry: the 1-based shard number, 0 if the ID is unused
+ID_ENTRY_SIZE = 4
+# Pending-title counts are spread over this many files by title hash
+TITLE_BUCKETS = 64
+# Upper bound on threads reading shards for one query
+MAX_READERS = 8
+
+_UNSAFE = re.compile(r"[^\w-]+")
+
+
+def _title_bucket(title: str) -> int:
+    """
+    Returns the number of the title-count file holding a title.
+    """
+    return zlib.crc32(title.encode('utf-8')) % TITLE_BUCKETS
+
+
+class ShardedStorage(FileLockMixin, BaseStorage):
+    """
+    Stores tasks in a directory with one JSON file per project.
+
+    The directory holds:
+
+    - ``manifest.json``: a version stamp bumped on every write, the highest ID
+      ever handed out, the shard file of each project, and the aggregates
+      over the tasks (see ``Stats``).
+    - One shard per project, plus one for tasks without a project: a JSON list
+      with one task per line, in ID order.
+    - ``ids.bin``: the shard number of every task ID, as fixed-size entries.
+    - ``titles-NN.json``: the number of pending tasks per title, spread over
+      TITLE_BUCKETS files by title hash.
+
+    Each command reads only what it needs: filtering by project reads one
+    shard, a lookup by ID reads one entry of the ID map and one shard, and the
+    duplicate-title check reads one title file. A mutation rewrites only the
+    shards and title files it touched and the ID map entries that moved, then
+    the manifest. Queries across projects read the shards in parallel.
+
+    Writers serialize through an exclusive ``fcntl`` lock on ``lock`` in the
+    directory, and the manifest is written last. Reads take no lock; each file
+    is replaced atomically, and a reader racing a writer may see some of its
+    shards updated before the manifest is.
+
+    Attributes:
+        directory (str): The directory holding the shards.
+        file_path (str): The path of the manifest.
+    """
+    supports_queries = True
+
+    def __init__(self, directory: str):
+        """
+        Initializes the ShardedStorage instance. Nothing is read until needed.
+
+        Args:
+            directory (str): The directory holding the shards. Created on the
+                             first write.
+        """
+        self.directory = directory
+        self.file_path = os.path.join(directory, MANIFEST_NAME)
+        self.lock_path = os.path.join(directory, "lock")
+        self.id_map_path = os.path.join(directory, ID_MAP_NAME)
+        # Manifest state when this instance last read or wrote the tasks
+        self._seen_state = None
+        # Parsed shards by file name, with the stat they were parsed from
+        self._shards: Dict[str, tuple] = {}
+
+    def _read_manifest(self) -> dict:
+        """
+        Reads the manifest. Its ``state`` key holds the version stamp and
+        inode, which identify the stored contents.
+        """
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                stat = os.fstat(f.fileno())
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {"version": 0, "max_id": 0, "shards": [], "stats": Stats().to_dict(), "state": None}
+        manifest["state"] = (manifest["version"], stat.st_ino)
+        return manifest
+
+    def state_token(self):
+        """
+        Returns the manifest's version stamp and inode.
+        """
+        return self._read_manifest()["state"]
+
+    def has_changed(self) -> bool:
+        """
+        Checks the manifest against the state last loaded or written.
+
+        Returns:
+            bool: True if another process wrote since this instance loaded.
+        """
+        return self.state_token() != self._seen_state
+
+    def _write_file(self, path: str, text: str):
+        """
+        Replaces a file atomically with the given text.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=self.directory, delete=False, encoding='utf-8') as tf:
+            temp_name = tf.name
+            try:
+                tf.write(text)
+                profiling.count("bytes_written", tf.tell())
+            except BaseException:
+                tf.close()
+                os.remove(temp_name)
+                raise
+        os.replace(temp_name, path)
+
+    def _write_manifest(self, manifest: dict):
+        """
+        Writes the manifest with its version stamp bumped.
+        """
+        manifest = {key: value for key, value in manifest.items() if key != "state"}
+        manifest["version"] += 1
+        self._write_file(self.file_path, json.dumps(manifest, indent=4) + "\n")
+        self._seen_state = (manifest["version"], os.stat(self.file_path).st_ino)
+
+    @staticmethod
+    def _shard_name(shards: List[list], project: Optional[str]) -> str:
+        """
+        Picks an unused file name for a project's shard.
+        """
+        if project is None:
+            base = "_none"
+        else:
+            base = f"{_UNSAFE.sub('_', project)[:40]}-{zlib.crc32(project.encode('utf-8')):08x}"
+        used = {name for _, name in shards}
+        name = base + ".json"
+        suffix = 1
+        while name in used:
+            suffix += 1
+            name = f"{base}-{suffix}.json"
+        return name
+
+    def _read_shard(self, name: str) -> List[dict]:
+        """
+        Returns the tasks of one shard as dicts, parsing the file only if it
+        changed since this instance last did. The dicts must not be modified.
+        """
+        try:
+            with open(os.path.join(self.directory, name), 'rb') as f:
+                stat = os.fstat(f.fileno())
+                key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                cached = self._shards.get(name)
+                if cached is not None and cached[0] == key:
+                    return cached[1]
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        items = json.loads(data)
+        profiling.count("bytes_read", len(data))
+        self._shards[name] = (key, items)
+        return items
+
+    def _read_shards(self, names: List[str], select=None) -> List[dict]:
+        """
+        Reads several shards, in parallel when there is more than one.
+
+        Args:
+            names (List[str]): The shard file names.
+            select (callable): Optional filter applied to each task dict.
+
+        Returns:
+            List[dict]: The selected tasks, shard by shard.
+        """
+        def read(name):
+            items = self._read_shard(name)
+            return items if select is None else [item for item in items if select(item)]
+
+        if len(names) <= 1:
+            results = [read(name) for name in names]
+        else:
+            with ThreadPoolExecutor(max_workers=min(MAX_READERS, len(names))) as pool:
+                results = list(pool.map(read, names))
+        return [item for items in results for item in items]
+
+    def _write_shard(self, name: str, items: List[dict]):
+        """
+        Writes one shard, one task per line, and keeps it parsed.
+        """
+        path = os.path.join(self.directory, name)
+        self._write_file(path, "[\n" + ",\n".join(json.dumps(item) for item in items) + "\n]\n")
+        stat = os.stat(path)
+        self._shards[name] = ((stat.st_ino, stat.st_mtime_ns, stat.st_size), items)
+
+    def _titles_path(self, bucket: int) -> str:
+        return os.path.join(self.directory, f"titles-{bucket:02d}.json")
+
+    def _read_titles(self, bucket: int) -> Dict[str, int]:
+        """
+        Reads the pending-task counts of one title bucket.
+        """
+        try:
+            with open(self._titles_path(bucket), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _shard_numbers(self, ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Looks up the shard numbers of task IDs in the ID map.
+
+        Returns:
+            Dict[int, int]: The 1-based shard number of each ID that is in use.
+        """
+        numbers = {}
+        try:
+            with open(self.id_map_path, 'rb') as f:
+                for task_id in sorted(ids):
+                    if task_id < 1:
+                        continue
+                    f.seek(task_id * ID_ENTRY_SIZE)
+                    number = int.from_bytes(f.read(ID_ENTRY_SIZE), 'little')
+                    if number:
+                        numbers[task_id] = number
+        except FileNotFoundError:
+            pass
+        return numbers
+
+    def _stored(self, shards: List[list], ids: Iterable[int]) -> Dict[int, tuple]:
+        """
+        Reads the stored versions of some tasks from their shards.
+
+        Returns:
+            Dict[int, tuple]: (shard name, task dict) for each ID found.
+        """
+        wanted: Dict[str, set] = {}
+        for task_id, number in self._shard_numbers(ids).items():
+            if number <= len(shards):
+                wanted.setdefault(shards[number - 1][1], set()).add(task_id)
+        found = {}
+        for name, shard_ids in wanted.items():
+            for item in self._read_shard(name):
+                if item["id"] in shard_ids:
+                    found[item["id"]] = (name, item)
+        return found
+
+    def load_tasks(self) -> List[Task]:
+        """
+        Loads every task, reading the shards in parallel.
+
+        Returns:
+            List[Task]: All stored tasks, in ID order.
+        """
+        manifest = self._read_manifest()
+        with profiling.span("storage.parse"):
+            items = self._read_shards([name for _, name in manifest["shards"]])
+        with profiling.span("storage.decode"):
+            tasks = [Task.from_dict(item) for item in items]
+            tasks.sort(key=lambda task: task.id)
+        self._seen_state = manifest["state"]
+        profiling.count("tasks_loaded", len(tasks))
+        return tasks
+
+    def save_tasks(self, tasks: List[Task]):
+        """
+        Replaces the stored tasks, rewriting every file in the directory.
+
+        The ID counter never goes down, so IDs handed out before stay unused.
+
+        Args:
+            tasks (List[Task]): The list of Task objects to save.
+        """
+        with self.locked():
+            profiling.count("saves")
+            old = self._read_manifest()
+            groups: Dict[Optional[str], List[dict]] = {}
+            counts: List[Dict[str, int]] = [{} for _ in range(TITLE_BUCKETS)]
+            with profiling.span("storage.encode"):
+                for task in sorted(tasks, key=lambda task: task.id):
+                    groups.setdefault(task.project, []).append(task.to_dict())
+                    if task.status != STATUS_DONE:
+                        bucket = counts[_title_bucket(task.title)]
+                        bucket[task.title] = bucket.get(task.title, 0) + 1
+            max_id = max((task.id for task in tasks), default=0)
+            id_map = bytearray((max_id + 1) * ID_ENTRY_SIZE)
+            shards: List[list] = []
+            with profiling.span("storage.write"):
+                for project, items in groups.items():
+                    name = self._shard_name(shards, project)
+                    shards.append([project, name])
+                    self._write_shard(name, items)
+                    entry = len(shards).to_bytes(ID_ENTRY_SIZE, 'little')
+                    for item in items:
+                        offset = item["id"] * ID_ENTRY_SIZE
+                        id_map[offset:offset + ID_ENTRY_SIZE] = entry
+                with open(self.id_map_path, 'wb') as f:
+                    f.write(id_map)
+                for bucket, bucket_counts in enumerate(counts):
+                    self._write_file(self._titles_path(bucket), json.dumps(bucket_counts))
+                old["shards"], old["max_id"] = shards, max(old["max_id"], max_id)
+                old["stats"] = self._scan_stats(tasks)
+                self._write_manifest(old)
+            names = {name for _, name in shards}
+            for name in os.listdir(self.directory):
+                if name.endswith(".json") and name != MANIFEST_NAME and not name.startswith("titles-") and name not in names:
+                    os.remove(os.path.join(self.directory, name))
+                    self._shards.pop(name, None)
+
+    def persist(self, tasks: Optional[List[Task]], changed: Iterable[Task] = (), deleted: Iterable[int] = (), added: Iterable[int] = (), stats_delta: Optional[dict] = None) -> Optional[List[Task]]:
+        """
+        Writes a mutation to the shards it touches, under the writer lock.
+
+        Tasks are read back from their stored shard rather than taken from
+        ``tasks``, so the caller does not need every task loaded, and changes
+        made concurrently by other processes to other tasks are kept. New
+        tasks whose ID another process took meanwhile are renumbered after
+        the highest ID handed out; their Task objects are updated in place.
+
+        Args:
+            tasks (Optional[List[Task]]): The caller's full task list, or None
+                                          if it has not loaded one.
+            changed (Iterable[Task]): Tasks that were added or modified.
+            deleted (Iterable[int]): IDs of tasks that were removed.
+            added (Iterable[int]): IDs of the changed tasks that are new.
+            stats_delta (Optional[dict]): The change to the aggregates in the
+                                          manifest.
+
+        Returns:
+            Optional[List[Task]]: Every stored task if the caller has a task
+                                  list and another process wrote since it was
+                                  loaded, which the caller should adopt; else None.
+        """
+        changed = list(changed)
+        deleted = list(deleted)
+        added = set(added)
+        with self.locked():
+            profiling.count("saves")
+            manifest = self._read_manifest()
+            before = manifest["state"]
+            concurrent = before != self._seen_state
+            new_tasks = [task for task in changed if task.id in added]
+            archived = self._archived_max_id()
+            if self._shard_numbers(task.id for task in new_tasks) or any(task.id <= archived for task in new_tasks):
+                profiling.count("merges")
+                next_id = max(manifest["max_id"], archived) + 1
+                for task in new_tasks:
+                    task.id = next_id
+                    next_id += 1
+            with profiling.span("storage.write"):
+                self._write_changes(manifest, changed, deleted, {task.id for task in new_tasks}, stats_delta)
+            self.last_transition = (before, self._seen_state)
+        if concurrent and tasks is not None:
+            return self.load_tasks()
+        return None
+
+    def _write_changes(self, manifest: dict, changed: List[Task], deleted: List[int], added: set, stats_delta: Optional[dict]):
+        """
+        Rewrites the shards, title buckets and ID map entries affected by a
+        mutation, then the manifest. Called with the lock held.
+        """
+        shards = manifest["shards"]
+        numbers = {project: number for number, (project, _) in enumerate(shards, 1)}
+        stored = self._stored(shards, [task.id for task in changed if task.id not in added] + deleted)
+        # Shard name -> task ID -> new task dict, or None to drop it
+        edits: Dict[str, Dict[int, Optional[dict]]] = {}
+        moved: Dict[int, int] = {}
+        title_deltas: Dict[str, int] = {}
+
+        def count(item, delta):
+            if item["status"] != STATUS_DONE:
+                title_deltas[item["title"]] = title_deltas.get(item["title"], 0) + delta
+
+        for task_id in deleted:
+            old = stored.get(task_id)
+            if old is not None:
+                edits.setdefault(old[0], {})[task_id] = None
+                count(old[1], -1)
+            moved[task_id] = 0
+        for task in changed:
+            number = numbers.get(task.project)
+            if number is None:
+                shards.append([task.project, self._shard_name(shards, task.project)])
+                number = numbers[task.project] = len(shards)
+            name = shards[number - 1][1]
+            old = stored.get(task.id)
+            if old is not None:
+                count(old[1], -1)
+                if old[0] != name:
+                    edits.setdefault(old[0], {})[task.id] = None
+            if old is None or old[0] != name:
+                moved[task.id] = number
+            item = task.to_dict()
+            edits.setdefault(name, {})[task.id] = item
+            count(item, 1)
+
+        for name, shard_edits in edits.items():
+            items = [item for item in self._read_shard(name) if item["id"] not in shard_edits]
+            items.extend(item for item in shard_edits.values() if item is not None)
+            items.sort(key=lambda item: item["id"])
+            self._write_shard(name, items)
+
+        buckets: Dict[int, Dict[str, int]] = {}
+        for title, delta in title_deltas.items():
+            if delta:
+                buckets.setdefault(_title_bucket(title), {})[title] = delta
+        for bucket, deltas in buckets.items():
+            counts = dict(self._read_titles(bucket))
+            for title, delta in deltas.items():
+                total = counts.get(title, 0) + delta
+                if total > 0:
+                    counts[title] = total
+                else:
+                    counts.pop(title, None)
+            self._write_file(self._titles_path(bucket), json.dumps(counts))
+
+        if moved:
+            # Entries are updated in place; IDs past the end extend the file
+            with open(self.id_map_path, 'ab'):
+                pass
+            with open(self.id_map_path, 'r+b') as f:
+                for task_id, number in sorted(moved.items()):
+                    f.seek(task_id * ID_ENTRY_SIZE)
+                    f.write(number.to_bytes(ID_ENTRY_SIZE, 'little'))
+
+        manifest["max_id"] = max([manifest["max_id"]] + [task.id for task in changed])
+        if stats_delta is not None and manifest.get("stats") is not None:
+            stats = Stats(manifest["stats"])
+            stats.merge(stats_delta)
+            manifest["stats"] = stats.to_dict()
+        self._write_manifest(manifest)
+
+    def load_stats(self) -> Optional[dict]:
+        """
+        Reads the aggregates from the manifest.
+
+        Returns:
+            Optional[dict]: The aggregates, or None if none were stored.
+        """
+        return self._read_manifest().get("stats")
+
+    def save_stats(self, stats: dict):
+        """
+        Replaces the aggregates in the manifest.
+
+        Args:
+            stats (dict): The aggregates in the form of ``Stats.to_dict``.
+        """
+        with self.locked():
+            manifest = self._read_manifest()
+            manifest["stats"] = stats
+            self._write_manifest(manifest)
+
+    def query_tasks(self, project: Optional[str] = None, priority: Optional[str] = None, status: Optional[str] = None, due_after: Optional[str] = None, due_before: Optional[str] = None) -> List[Task]:
+        """
+        Returns the tasks matching the given filters.
+
+        With a project only that project's shard is read; otherwise every
+        shard is read in parallel.
+
+        Args:
+            project (Optional[str]): Filter by project name.
+            priority (Optional[str]): Filter by priority level.
+            status (Optional[str]): Filter by status.
+            due_after (Optional[str]): Only tasks due strictly after this date.
+            due_before (Optional[str]): Only tasks due strictly before this date.
+
+        Returns:
+            List[Task]: The matching tasks, in ID order.
+        """
+        shards = self._read_manifest()["shards"]
+        names = [name for shard_project, name in shards if not project or shard_project == project]
+
+        def select(item):
+            due = item["due_date"]
+            return ((not priority or item["priority"] == priority)
+                    and (not status or item["status"] == status)
+                    and (not due_after or (due is not None and due > due_after))
+                    and (not due_before or (due is not None and due < due_before)))
+
+        select_all = not (priority or status or due_after or due_before)
+        with profiling.span("storage.parse"):
+            items = self._read_shards(names, None if select_all else select)
+        tasks = [Task.from_dict(item) for item in items]
+        tasks.sort(key=lambda task: task.id)
+        return tasks
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """
+        Returns the task with the given ID, reading only its shard.
+
+        Args:
+            task_id (int): The ID of the task.
+
+        Returns:
+            Optional[Task]: The task if found, else None.
+        """
+        found = self._stored(self._read_manifest()["shards"], [task_id]).get(task_id)
+        return Task.from_dict(found[1]) if found is not None else None
+
+    def has_pending_title(self, title: str, exclude: Iterable[int] = ()) -> bool:
+        """
+        Checks whether a task with this title is still pending, reading only
+        the title's bucket and the shards of the excluded tasks.
+
+        Args:
+            title (str): The title to look for.
+            exclude (Iterable[int]): IDs of tasks to ignore.
+
+        Returns:
+            bool: True if a task with this title is not done.
+        """
+        count = self._read_titles(_title_bucket(title)).get(title, 0)
+        if count:
+            shards = self._read_manifest()["shards"]
+            for _, item in self._stored(shards, exclude).values():
+                if item["title"] == title and item["status"] != STATUS_DONE:
+                    count -= 1
+        return count > 0
+
+    def max_id(self) -> int:
+        """
+        Returns the highest task ID ever handed out, from the manifest. IDs of
+        deleted tasks are not reused.
+
+        Returns:
+            int: The highest ID, or 0 if there have been no tasks.
+        """
+        return self._read_manifest()["max_id"]
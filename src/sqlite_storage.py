@@ -0,0 +1,337 @@
+import json
+import os
+import sqlite3
+from dataclasses import fields
+from typing import Iterable, List, Optional
+from . import profiling
+from .models import Task
+from .stats import Stats
+from .storage import BaseStorage
+
+# Columns that get a secondary index; title backs the duplicate check in add_task.
+INDEXED_COLUMNS = ("project", "priority", "status", "due_date", "title")
+
+
+class SQLiteStorage(BaseStorage):
+    """
+    Stores tasks in an SQLite database, one row per task.
+
+    Mutations only touch the affected rows, and filtering, lookups by ID and
+    the duplicate-title check run as indexed queries, so TaskManager does not
+    need to load every task for them. The aggregates over the tasks are kept
+    as JSON in a ``meta`` table and updated in the same transaction as the rows.
+
+    Attributes:
+        file_path (str): The path to the SQLite database file.
+    """
+    supports_queries = True
+
+    def __init__(self, file_path: str):
+        """
+        Initializes the SQLiteStorage instance. The database is opened lazily.
+
+        Args:
+            file_path (str): The path to the SQLite database file.
+        """
+        self.file_path = file_path
+        self.columns = [f.name for f in fields(Task)]
+        self._conn = None
+        self._data_version = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """
+        The open database connection, created with its schema on first use.
+        """
+        if self._conn is None:
+            dirname = os.path.dirname(self.file_path)
+            if dirname:
+                os.makedirs(dirname, exist_ok=True)
+            self._conn = sqlite3.connect(self.file_path)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._create_schema()
+        return self._conn
+
+    def _create_schema(self):
+        """
+        Creates the tasks table and its indexes, adding columns for any Task
+        fields missing from an older database.
+        """
+        column_defs = []
+        for f in fields(Task):
+            if f.name == "id":
+                column_defs.append("id INTEGER PRIMARY KEY")
+            else:
+                column_defs.append(f"{f.name} INTEGER DEFAULT {f.default}" if f.type is int else f"{f.name} TEXT")
+        with self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS tasks ({', '.join(column_defs)})")
+            existing = {row[1] for row in self._conn.execute("PRAGMA table_info(tasks)")}
+            for name, column_def in zip(self.columns, column_defs):
+                if name not in existing:
+                    self._conn.execute(f"ALTER TABLE tasks ADD COLUMN {column_def}")
+            for column in INDEXED_COLUMNS:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tasks_{column} ON tasks ({column})")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            # An empty database starts with empty aggregates; older databases
+            # with tasks get theirs from save_tasks or stats --recompute.
+            if self._conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is None:
+                self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('stats', ?)", (json.dumps(Stats().to_dict()),))
+
+    def close(self):
+        """
+        Closes the database connection if it is open.
+        """
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            # The data version is per connection
+            self._data_version = None
+
+    def _select(self, where: str = "", params: tuple = ()) -> List[Task]:
+        """
+        Runs a SELECT over the tasks table and builds Task objects.
+
+        Args:
+            where (str): Optional WHERE clause, without the keyword.
+            params (tuple): Parameters for the clause.
+
+        Returns:
+            List[Task]: The matching tasks, in ID order.
+        """
+        sql = f"SELECT {', '.join(self.columns)} FROM tasks"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " ORDER BY id"
+        columns = self.columns
+        with profiling.span("sqlite.select"):
+            tasks = [Task.from_dict(dict(zip(columns, row))) for row in self.conn.execute(sql, params)]
+        profiling.count("tasks_loaded", len(tasks))
+        return tasks
+
+    def _rows(self, tasks: Iterable[Task]):
+        """
+        Yields the column values of each task, in column order.
+        """
+        columns = self.columns
+        for task in tasks:
+            yield tuple(getattr(task, name) for name in columns)
+
+    def load_tasks(self) -> List[Task]:
+        """
+        Loads every task from the database.
+
+        Returns:
+            List[Task]: All stored tasks, in ID order.
+        """
+        tasks = self._select()
+        self._data_version = self._current_data_version()
+        return tasks
+
+    def _current_data_version(self) -> int:
+        """
+        Returns SQLite's data version, which changes whenever another
+        connection commits to the database.
+        """
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def has_changed(self) -> bool:
+        """
+        Checks whether another connection committed since the last full load.
+
+        Returns:
+            bool: True if the database changed under this instance.
+        """
+        return self._data_version is not None and self._current_data_version() != self._data_version
+
+    def save_tasks(self, tasks: List[Task]):
+        """
+        Replaces the contents of the database in a single transaction.
+
+        Args:
+            tasks (List[Task]): The list of Task objects to save.
+        """
+        placeholders = ", ".join("?" for _ in self.columns)
+        with self.conn:
+            self.conn.execute("DELETE FROM tasks")
+            self.conn.executemany(
+                f"INSERT INTO tasks ({', '.join(self.columns)}) VALUES ({placeholders})",
+                self._rows(tasks),
+            )
+            self._store_stats(self._scan_stats(tasks))
+
+    def _store_stats(self, stats: dict):
+        """
+        Writes the aggregates. Called inside a transaction.
+        """
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('stats', ?)", (json.dumps(stats),))
+
+    def load_stats(self) -> Optional[dict]:
+        """
+        Reads the aggregates from the meta table.
+
+        Returns:
+            Optional[dict]: The aggregates, or None if none were stored.
+        """
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'stats'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_stats(self, stats: dict):
+        """
+        Replaces the aggregates in the meta table.
+
+        Args:
+            stats (dict): The aggregates in the form of ``Stats.to_dict``.
+        """
+        with self.conn:
+            self._store_stats(stats)
+
+    def persist(self, tasks: List[Task], changed: Iterable[Task] = (), deleted: Iterable[int] = (), added: Iterable[int] = (), stats_delta: Optional[dict] = None) -> Optional[List[Task]]:
+        """
+        Writes the changed tasks and deletes the removed ones in one
+        immediate transaction, adding ``stats_delta`` to the stored aggregates.
+
+        New tasks are inserted, never replaced. If another process took their
+        IDs since they were handed out, they are renumbered after the highest
+        ID in use or archived, in order, and their Task objects are updated in
+        place, as ``Storage`` does when merging.
+
+        Args:
+            tasks (List[Task]): The loaded tasks, or None if nothing is loaded;
+                                only the changed rows are written.
+            changed (Iterable[Task]): Tasks that were added or modified.
+            deleted (Iterable[int]): IDs of tasks that were removed.
+            added (Iterable[int]): IDs of the changed tasks that are new.
+            stats_delta (Optional[dict]): The change to the aggregates.
+
+        Returns:
+            Optional[List[Task]]: The stored tasks if new tasks were renumbered
+                                  while tasks were loaded, which the caller
+                                  should adopt; else None.
+        """
+        changed = list(changed)
+        added = set(added)
+        new_tasks = [task for task in changed if task.id in added]
+        modified = [task for task in changed if task.id not in added]
+        placeholders = ", ".join("?" for _ in self.columns)
+        profiling.count("saves")
+        before = self.state_token()
+        renumbered = False
+        with profiling.span("sqlite.persist"), self.conn:
+            # Take the write lock up front, so the ID check below holds
+            # until the new rows are in
+            self.conn.execute("BEGIN IMMEDIATE")
+            if new_tasks:
+                in_use = max(self.max_id(), self._archived_max_id())
+                if min(task.id for task in new_tasks) <= in_use:
+                    profiling.count("merges")
+                    for next_id, task in enumerate(new_tasks, in_use + 1):
+                        task.id = next_id
+                    renumbered = True
+            self.conn.executemany(
+                f"INSERT INTO tasks ({', '.join(self.columns)}) VALUES ({placeholders})",
+                self._rows(new_tasks),
+            )
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO tasks ({', '.join(self.columns)}) VALUES ({placeholders})",
+                self._rows(modified),
+            )
+            self.conn.executemany("DELETE FROM tasks WHERE id = ?", ((task_id,) for task_id in deleted))
+            stored = self.load_stats() if stats_delta is not None else None
+            if stored is not None:
+                stats = Stats(stored)
+                stats.merge(stats_delta)
+                self._store_stats(stats.to_dict())
+        self.last_transition = (before, self.state_token())
+        if renumbered and tasks is not None:
+            return self.load_tasks()
+        return None
+
+    def state_token(self):
+        """
+        Returns the mtime and size of the database file and its write-ahead
+        log, which change with every commit.
+        """
+        token = []
+        for path in (self.file_path, self.file_path + "-wal"):
+            try:
+                stat = os.stat(path)
+                token.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                token.append(None)
+        return tuple(token)
+
+    def query_tasks(self, project: Optional[str] = None, priority: Optional[str] = None, status: Optional[str] = None, due_after: Optional[str] = None, due_before: Optional[str] = None) -> List[Task]:
+        """
+        Returns the tasks matching the given filters using the column indexes.
+
+        Args:
+            project (Optional[str]): Filter by project name.
+            priority (Optional[str]): Filter by priority level.
+            status (Optional[str]): Filter by status.
+            due_after (Optional[str]): Only tasks due strictly after this date.
+            due_before (Optional[str]): Only tasks due strictly before this date.
+
+        Returns:
+            List[Task]: The matching tasks, in ID order.
+        """
+        clauses = []
+        params = []
+        if project:
+            clauses.append("project = ?")
+            params.append(project)
+        if priority:
+            clauses.append("priority = ?")
+            params.append(priority)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if due_after:
+            clauses.append("due_date > ?")
+            params.append(due_after)
+        if due_before:
+            clauses.append("due_date < ?")
+            params.append(due_before)
+        return self._select(" AND ".join(clauses), tuple(params))
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """
+        Returns the task with the given ID.
+
+        Args:
+            task_id (int): The ID of the task.
+
+        Returns:
+            Optional[Task]: The task if found, else None.
+        """
+        rows = self._select("id = ?", (task_id,))
+        return rows[0] if rows else None
+
+    def has_pending_title(self, title: str, exclude: Iterable[int] = ()) -> bool:
+        """
+        Checks whether a task with this title is still pending.
+
+        Args:
+            title (str): The title to look for.
+            exclude (Iterable[int]): IDs of tasks to ignore.
+
+        Returns:
+            bool: True if a task with this title is not done.
+        """
+        exclude = set(exclude)
+        for (task_id,) in self.conn.execute(
+            "SELECT id FROM tasks WHERE title = ? AND status != 'done'", (title,)
+        ):
+            if task_id not in exclude:
+                return True
+        return False
+
+    def max_id(self) -> int:
+        """
+        Returns the highest task ID in use.
+
+        Returns:
+            int: The highest ID, or 0 if there are no tasks.
+        """
+        row = self.conn.execute("SELECT MAX(id) FROM tasks").fetchone()
+        return row[0] or 0
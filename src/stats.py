@@ -0,0 +1,212 @@
+import datetime
+import math
+from typing import Dict, Iterable, Optional
+from .constants import STATUS_DONE
+from .models import Task
+
+# Task attributes counted per value.
+COUNTED_FIELDS = ("project", "priority", "status")
+# Lead times are kept in a histogram whose buckets grow by this factor, so
+# percentiles are exact to within 10%.
+BUCKET_BASE = 1.1
+_LOG_BASE = math.log(BUCKET_BASE)
+
+
+def lead_seconds(task: Task) -> Optional[int]:
+    """
+    Returns the whole seconds between a done task's creation and completion.
+
+    Args:
+        task (Task): The task.
+
+    Returns:
+        Optional[int]: The lead time, or None if the task is not done or a
+                       timestamp is missing or not ISO.
+    """
+    if task.status != STATUS_DONE or not task.completed_at or not task.created_at:
+        return None
+    try:
+        delta = datetime.datetime.fromisoformat(task.completed_at) - datetime.datetime.fromisoformat(task.created_at)
+    except ValueError:
+        return None
+    return max(int(delta.total_seconds()), 0)
+
+
+def _bucket(seconds: int) -> int:
+    """
+    Returns the histogram bucket of a lead time: the smallest k with
+    ``BUCKET_BASE ** k >= seconds``.
+    """
+    return 0 if seconds <= 1 else math.ceil(math.log(seconds) / _LOG_BASE - 1e-9)
+
+
+def _add_counts(target: dict, counts: dict):
+    """
+    Adds per-key counts into a dict, dropping keys that reach zero.
+    """
+    for key, value in counts.items():
+        total = target.get(key, 0) + value
+        if total:
+            target[key] = total
+        else:
+            target.pop(key, None)
+
+
+class Stats:
+    """
+    Aggregates over a set of tasks that can be updated one task at a time.
+
+    Tracks the number of tasks, counts per project, priority and status, the
+    number of tasks completed per day, and a histogram of lead times
+    (``completed_at - created_at`` of done tasks). TaskManager builds a delta
+    from every commit and the storage adds it to the aggregates it persists,
+    so reading them never requires scanning the tasks.
+
+    The dict form (``to_dict``) is what backends store and what deltas are
+    exchanged as; zero counts are left out, so equal aggregates have equal
+    dicts.
+    """
+    def __init__(self, data: Optional[dict] = None):
+        """
+        Initializes the Stats.
+
+        Args:
+            data (Optional[dict]): Aggregates in the form of ``to_dict``.
+        """
+        self.total = 0
+        self.counts: Dict[str, Dict[str, int]] = {field: {} for field in COUNTED_FIELDS}
+        self.completed_by_day: Dict[str, int] = {}
+        self.lead_count = 0
+        self.lead_sum = 0
+        self.lead_buckets: Dict[int, int] = {}
+        if data:
+            self.merge(data)
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[Task]) -> "Stats":
+        """
+        Computes the aggregates of a set of tasks by scanning them.
+
+        Args:
+            tasks (Iterable[Task]): The tasks.
+
+        Returns:
+            Stats: Their aggregates.
+        """
+        stats = cls()
+        for task in tasks:
+            stats.add(task)
+        return stats
+
+    def add(self, task: Task, sign: int = 1, history: bool = True):
+        """
+        Counts a task in, or out with ``sign=-1``.
+
+        Args:
+            task (Task): The task.
+            sign (int): 1 to add the task, -1 to remove it.
+            history (bool): Also count its completion day and lead time.
+                            Archived tasks leave the counts but keep these.
+        """
+        self.total += sign
+        for field in COUNTED_FIELDS:
+            counts = self.counts[field]
+            value = getattr(task, field) or ""
+            counts[value] = counts.get(value, 0) + sign
+        if history:
+            self.add_history(task, sign)
+
+    def add_history(self, task: Task, sign: int = 1):
+        """
+        Counts a done task's completion day and lead time in, or out with
+        ``sign=-1``, without counting the task itself.
+
+        Args:
+            task (Task): The task.
+            sign (int): 1 to add the history, -1 to remove it.
+        """
+        seconds = lead_seconds(task)
+        if seconds is not None:
+            day = task.completed_at[:10]
+            self.completed_by_day[day] = self.completed_by_day.get(day, 0) + sign
+            self.lead_count += sign
+            self.lead_sum += sign * seconds
+            bucket = _bucket(seconds)
+            self.lead_buckets[bucket] = self.lead_buckets.get(bucket, 0) + sign
+
+    def merge(self, data: dict):
+        """
+        Adds aggregates, or a delta, in the form of ``to_dict``.
+
+        Args:
+            data (dict): The aggregates to add.
+        """
+        self.total += data.get("total", 0)
+        for field in COUNTED_FIELDS:
+            _add_counts(self.counts[field], data.get(field, {}))
+        _add_counts(self.completed_by_day, data.get("completed_by_day", {}))
+        lead = data.get("lead_time", {})
+        self.lead_count += lead.get("count", 0)
+        self.lead_sum += lead.get("sum", 0)
+        _add_counts(self.lead_buckets, {int(bucket): count for bucket, count in lead.get("buckets", {}).items()})
+
+    def to_dict(self) -> dict:
+        """
+        Returns the aggregates as a JSON-serializable dict without zero counts.
+
+        Returns:
+            dict: The aggregates.
+        """
+        def nonzero(counts):
+            return {key: value for key, value in counts.items() if value}
+
+        return {
+            "total": self.total,
+            **{field: nonzero(self.counts[field]) for field in COUNTED_FIELDS},
+            "completed_by_day": nonzero(self.completed_by_day),
+            "lead_time": {
+                "count": self.lead_count,
+                "sum": self.lead_sum,
+                "buckets": {str(bucket): count for bucket, count in sorted(self.lead_buckets.items()) if count},
+            },
+        }
+
+    def completed_since(self, day: str) -> int:
+        """
+        Counts the tasks completed on or after a day.
+
+        Args:
+            day (str): The first day (YYYY-MM-DD).
+
+        Returns:
+            int: The number of completions.
+        """
+        return sum(count for completed, count in self.completed_by_day.items() if completed >= day)
+
+    def lead_time_percentile(self, percent: float) -> Optional[float]:
+        """
+        Estimates a lead-time percentile from the histogram.
+
+        Args:
+            percent (float): The percentile, from 0 to 100.
+
+        Returns:
+            Optional[float]: The lead time in seconds (the upper bound of the
+                             bucket holding the percentile), or None if no
+                             task has a lead time.
+        """
+        if self.lead_count <= 0:
+            return None
+        rank = max(math.ceil(self.lead_count * percent / 100), 1)
+        seen = 0
+        for bucket in sorted(self.lead_buckets):
+            seen += self.lead_buckets[bucket]
+            if seen >= rank:
+                return 0.0 if bucket == 0 else BUCKET_BASE ** bucket
+        return BUCKET_BASE ** max(self.lead_buckets)
+
+    def lead_time_mean(self) -> Optional[float]:
+        """
+        Returns the exact mean lead time in seconds, or None if no task has one.
+        """
+        return self.lead_sum / self.lead_count if self.lead_count > 0 else None
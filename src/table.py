@@ -0,0 +1,218 @@
+from array import array
+from dataclasses import fields
+from typing import Dict, Iterable, Iterator, List, Optional
+from .models import Task
+
+TASK_FIELDS = tuple(f.name for f in fields(Task))
+_DEFAULTS = {f.name: f.default for f in fields(Task) if isinstance(f.default, str)}
+
+
+class StringPool:
+    """
+    Interns repeated strings and hands out small integer codes for them.
+
+    Code 0 is reserved for None.
+    """
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        """
+        Returns the code for a value, adding it to the pool if needed.
+
+        Args:
+            value (Optional[str]): The string to encode.
+
+        Returns:
+            int: The code of the value.
+        """
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+# Columns stored as pool codes in an unsigned int array, with the pool they use.
+CODED_COLUMNS = ("status", "priority", "project", "recurrence", "due_date")
+
+
+class TaskTable:
+    """
+    A columnar, memory-lean container of tasks.
+
+    IDs live in a signed 64-bit array. Enum-like and highly repeated fields
+    (status, priority, project, recurrence, due date) are stored as codes into
+    a shared string pool, and only titles and timestamps are kept as per-task
+    strings. Relist counts live in an unsigned int array. Rows are exposed through TaskRow views with the Task attribute API.
+    """
+    def __init__(self):
+        """
+        Initializes an empty TaskTable.
+        """
+        self.pool = StringPool()
+        self.ids = array('q')
+        self.coded = {name: array('I') for name in CODED_COLUMNS}
+        self.titles: List[str] = []
+        self.created_at: List[str] = []
+        self.completed_at: List[Optional[str]] = []
+        self.relist_counts = array('I')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> "TaskRow":
+        if index < 0:
+            index += len(self.ids)
+        if not 0 <= index < len(self.ids):
+            raise IndexError("TaskTable index out of range")
+        return TaskRow(self, index)
+
+    def __iter__(self) -> Iterator["TaskRow"]:
+        for index in range(len(self.ids)):
+            yield TaskRow(self, index)
+
+    def append(self, task: Task):
+        """
+        Appends a task to the table.
+
+        Args:
+            task (Task): The task to copy into the table.
+        """
+        self.append_dict(task.to_dict())
+
+    def append_dict(self, data: dict):
+        """
+        Appends a task given in the ``Task.to_dict`` format.
+
+        Args:
+            data (dict): The task data.
+        """
+        if not data.get("created_at"):
+            # Let Task fill in defaults the same way it does on construction
+            data = Task.from_dict(data).to_dict()
+        self.ids.append(data["id"])
+        self.titles.append(data["title"])
+        self.created_at.append(data["created_at"])
+        self.completed_at.append(data.get("completed_at"))
+        self.relist_counts.append(data.get("relist_count", 0))
+        code = self.pool.code
+        for name in CODED_COLUMNS:
+            self.coded[name].append(code(data.get(name, _DEFAULTS.get(name))))
+
+    def extend(self, tasks: Iterable[Task]):
+        """
+        Appends every task from an iterable.
+
+        Args:
+            tasks (Iterable[Task]): The tasks to append.
+        """
+        for task in tasks:
+            self.append(task)
+
+    def index_of(self, task_id: int) -> int:
+        """
+        Returns the row index of the task with the given ID.
+
+        Args:
+            task_id (int): The ID to look for.
+
+        Returns:
+            int: The row index.
+
+        Raises:
+            KeyError: If no row has this ID.
+        """
+        try:
+            return self.ids.index(task_id)
+        except ValueError:
+            raise KeyError(task_id)
+
+    def to_dicts(self) -> List[dict]:
+        """
+        Converts every row to the ``Task.to_dict`` format.
+
+        Returns:
+            List[dict]: One dictionary per row.
+        """
+        return [row.to_dict() for row in self]
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[dict]) -> "TaskTable":
+        """
+        Builds a table from dictionaries in the ``Task.to_dict`` format.
+
+        Args:
+            records (Iterable[dict]): The task data.
+
+        Returns:
+            TaskTable: A new table holding the records.
+        """
+        table = cls()
+        for data in records:
+            table.append_dict(data)
+        return table
+
+
+def _column(name: str) -> property:
+    """
+    Builds a TaskRow property reading and writing one column of the table.
+    """
+    if name in CODED_COLUMNS:
+        def getter(row):
+            table = row._table
+            return table.pool.values[table.coded[name][row._index]]
+
+        def setter(row, value):
+            table = row._table
+            table.coded[name][row._index] = table.pool.code(value)
+    else:
+        attr = {"id": "ids", "title": "titles", "relist_count": "relist_counts"}.get(name, name)
+
+        def getter(row):
+            return getattr(row._table, attr)[row._index]
+
+        def setter(row, value):
+            getattr(row._table, attr)[row._index] = value
+    return property(getter, setter)
+
+
+class TaskRow:
+    """
+    A view of one row of a TaskTable with the same attributes as Task.
+
+    Reading or assigning an attribute goes straight to the table's columns.
+    """
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: TaskTable, index: int):
+        self._table = table
+        self._index = index
+
+    def to_dict(self) -> dict:
+        """
+        Converts the row to a dictionary in the ``Task.to_dict`` format.
+
+        Returns:
+            dict: A dictionary representation of the task.
+        """
+        return {name: getattr(self, name) for name in TASK_FIELDS}
+
+    def to_task(self) -> Task:
+        """
+        Copies the row into a standalone Task.
+
+        Returns:
+            Task: A new Task instance.
+        """
+        return Task.from_dict(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"TaskRow({self.to_dict()!r})"
+
+
+for _name in TASK_FIELDS:
+    setattr(TaskRow, _name, _column(_name))
@@ -3,8 +3,8 @@ import sys
 from src.cli import main
 
 if __name__ == "__main__":
-    # Default storage path
+    # Default storage path, overridable with TASK_CLI_FILE
     data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-    storage_path = os.path.join(data_dir, "tasks.json")
+    storage_path = os.environ.get("TASK_CLI_FILE", os.path.join(data_dir, "tasks.json"))
     
     main(storage_path)
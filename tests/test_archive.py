@@ -0,0 +1,127 @@
+import unittest
+import datetime
+import gzip
+import io
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from unittest import mock
+from src.cli import build_parser, run_command
+from src.manager import TaskManager
+from src.storage import Storage, open_storage
+
+class TestArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.directory, "tasks.json")
+        self.manager = TaskManager(Storage(self.test_file))
+        self.manager.add_task("Old report", project="Work")
+        self.manager.add_task("Water plants", project="Home", recurrence="weekly", due_date="2024-01-01")
+        self.manager.add_task("Still open", project="Work")
+        self.manager.complete_task(1)
+        self.manager.complete_task(2)
+        # Task 1 finished long ago
+        self.manager.tasks[0].completed_at = "2020-01-01T09:00:00"
+        self.manager.storage.save_tasks(self.manager.tasks)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_cli(self, *argv, manager=None):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_command(manager or self.manager, build_parser().parse_args(argv), self.test_file)
+        return output.getvalue()
+
+    def test_archive_moves_done_tasks(self):
+        self.assertEqual(self.manager.archive_tasks(older_than_days=30), 1)
+        fresh = TaskManager(Storage(self.test_file))
+        self.assertEqual([t.id for t in fresh.tasks], [2, 3, 4])
+        segments = sorted(os.listdir(self.manager.archive.directory))
+        self.assertIn("segment-000001.jsonl.gz", segments)
+        with gzip.open(os.path.join(self.manager.archive.directory, "segment-000001.jsonl.gz"), 'rt') as f:
+            self.assertIn("Old report", f.read())
+        self.assertEqual(self.manager.archive_tasks(), 1)
+        self.assertEqual(fresh.archive.count(), 2)
+        self.assertEqual([t.id for t in fresh.archived_tasks(project="Home")], [2])
+
+    def test_archive_from_a_fresh_manager(self):
+        # Nothing is loaded yet, as when the CLI runs `archive` in a new process
+        self.assertEqual(TaskManager(Storage(self.test_file)).archive_tasks(), 2)
+        fresh = TaskManager(Storage(self.test_file))
+        self.assertEqual([t.id for t in fresh.tasks], [3, 4])
+        self.assertEqual(fresh.archive.count(), 2)
+        self.assertEqual([f for f in os.listdir(self.directory) if f.endswith(".tmp")], [])
+
+    def test_failed_removal_discards_the_segment(self):
+        manager = TaskManager(Storage(self.test_file))
+        with mock.patch.object(manager.storage, "persist", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                manager.archive_tasks()
+        fresh = TaskManager(Storage(self.test_file))
+        self.assertEqual(len(fresh.tasks), 4)
+        self.assertEqual(fresh.archive.count(), 0)
+        self.assertFalse([f for f in os.listdir(fresh.archive.directory) if f.startswith("segment-")])
+        self.assertEqual(manager.archive_tasks(), 2)
+
+    def test_ids_stay_unique_across_tiers(self):
+        self.manager.add_task("Newest")
+        self.manager.complete_task(5)
+        self.manager.archive_tasks()
+        # The highest ID now lives only in the archive
+        self.assertEqual(TaskManager(Storage(self.test_file)).add_task("Next").id, 6)
+        with mock.patch.object(Storage, "supports_queries", True), \
+                mock.patch.object(Storage, "max_id", lambda storage: 4, create=True), \
+                mock.patch.object(Storage, "has_pending_title", lambda storage, title, exclude=(): False, create=True):
+            self.assertEqual(TaskManager(Storage(self.test_file)).add_task("Queried").id, 7)
+
+    def test_merges_never_reuse_archived_ids(self):
+        for backend in ("json", "journal", "binary"):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.directory, backend, "tasks.json")
+                os.makedirs(os.path.dirname(path))
+
+                def open_manager():
+                    storage = open_storage(path, backend=backend)
+                    if hasattr(storage, "close"):
+                        self.addCleanup(storage.close)
+                    return TaskManager(storage)
+
+                open_manager().add_task("First")
+                stale = open_manager()
+                self.assertEqual(len(stale.tasks), 1)
+                # Another process adds task 2 and archives it
+                other = open_manager()
+                other.add_task("Second")
+                other.complete_task(2)
+                other.archive_tasks()
+                self.assertEqual(stale.add_task("Third").id, 3)
+                self.assertEqual([t.id for t in open_manager().tasks], [1, 3])
+
+    def test_list_and_export_include_archived(self):
+        self.manager.archive_tasks()
+        output = self.run_cli("list", "--project", "Work")
+        self.assertNotIn("Old report", output)
+        output = self.run_cli("list", "--project", "Work", "--include-archived")
+        self.assertIn("Old report", output)
+        self.assertIn("Still open", output)
+        export_file = os.path.join(self.directory, "all.jsonl")
+        self.assertEqual(self.manager.export_tasks(export_file, fmt="jsonl", include_archived=True), 4)
+
+    def test_auto_archive_runs_once_a_day(self):
+        with mock.patch.dict(os.environ, {"TASK_CLI_ARCHIVE_AFTER_DAYS": "30"}):
+            self.run_cli("add", "Trigger")
+            self.assertEqual(self.manager.archive.count(), 1)
+            # Task 2 is old now, but the policy already ran today
+            self.manager.get_task_by_id(2).completed_at = "2020-01-01T09:00:00"
+            self.run_cli("add", "Again")
+            self.assertEqual(self.manager.archive.count(), 1)
+            tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+            with mock.patch("src.manager.today", return_value=tomorrow):
+                self.run_cli("done", "3")
+        self.assertEqual(self.manager.archive.count(), 2)
+        self.assertEqual(self.run_cli("archive"), "Archived 1 tasks.\n")
+
+if __name__ == '__main__':
+    unittest.main()
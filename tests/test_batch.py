@@ -0,0 +1,75 @@
+import unittest
+import glob
+import os
+from src.manager import TaskManager
+from src.storage import Storage
+
+class CountingStorage(Storage):
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        self.saves = 0
+
+    def save_tasks(self, tasks):
+        self.saves += 1
+        super().save_tasks(tasks)
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.test_file = "test_batch.json"
+        self.storage = CountingStorage(self.test_file)
+        self.manager = TaskManager(self.storage)
+
+    def tearDown(self):
+        # The task file and its sidecars (lock, change feed)
+        for path in glob.glob(self.test_file + "*"):
+            os.remove(path)
+
+    def test_one_save_per_operation(self):
+        task = self.manager.add_task("Daily", recurrence="daily")
+        self.assertEqual(self.storage.saves, 1)
+        self.manager.complete_task(task.id)
+        self.assertEqual(self.storage.saves, 2)
+        self.assertEqual(len(Storage(self.test_file).load_tasks()), 2)
+
+    def test_batch_saves_once(self):
+        with self.manager.batch():
+            ids = [self.manager.add_task(f"Task {i}").id for i in range(5)]
+            for task_id in ids[:3]:
+                self.manager.complete_task(task_id)
+            self.manager.delete_task(ids[4])
+            self.assertEqual(self.storage.saves, 0)
+        self.assertEqual(self.storage.saves, 1)
+        statuses = [t.status for t in Storage(self.test_file).load_tasks()]
+        self.assertEqual(statuses, ["done", "done", "done", "pending"])
+
+    def test_rollback_on_exception(self):
+        kept = self.manager.add_task("Kept", project="A")
+        with self.assertRaises(RuntimeError):
+            with self.manager.batch():
+                self.manager.update_task(kept.id, project="B", title="Changed")
+                self.manager.add_task("Discarded")
+                self.manager.delete_task(kept.id)
+                raise RuntimeError("boom")
+
+        self.assertEqual(self.storage.saves, 1)
+        self.assertEqual([t.title for t in self.manager.tasks], ["Kept"])
+        self.assertEqual(kept.project, "A")
+        self.assertEqual(self.manager.list_tasks(project="A"), [kept])
+        self.assertEqual(self.manager.add_task("Next").id, 2)
+        with self.assertRaises(ValueError):
+            self.manager.add_task("Kept")
+
+    def test_nested_batch_rolls_back_inner_only(self):
+        with self.manager.batch():
+            self.manager.add_task("Outer")
+            try:
+                with self.manager.batch():
+                    self.manager.add_task("Inner")
+                    raise KeyError("inner")
+            except KeyError:
+                pass
+        self.assertEqual(self.storage.saves, 1)
+        self.assertEqual([t.title for t in Storage(self.test_file).load_tasks()], ["Outer"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest import mock
+from src.binary_storage import BinaryStorage, HEADER_SIZE, RECORD
+from src.manager import TaskManager
+from src.models import Task
+
+class TestBinaryStorage(unittest.TestCase):
+    def setUp(self):
+        self.directory = os.path.join(tempfile.mkdtemp(), "tasks.records")
+        self.opened = []
+        self.storage = self.open()
+        self.manager = TaskManager(self.storage)
+        self.manager.add_task("Write report", project="Work", priority="High", due_date="2024-03-01")
+        self.manager.add_task("Groceries")
+        self.manager.add_task("Standup", project="Work", recurrence="daily", due_date="2024-03-01")
+
+    def tearDown(self):
+        for storage in self.opened:
+            storage.close()
+        shutil.rmtree(os.path.dirname(self.directory))
+
+    def open(self):
+        storage = BinaryStorage(self.directory)
+        self.opened.append(storage)
+        return storage
+
+    def fresh(self):
+        return TaskManager(self.open())
+
+    def file_state(self):
+        paths = sorted(os.listdir(self.directory))
+        return {name: os.stat(os.path.join(self.directory, name)).st_ino for name in paths}
+
+    def test_round_trip_and_record_offsets(self):
+        tasks = [Task(id=1, title="Ünïcode", project="Home", completed_at="2024-01-01T10:00:00", status="done"),
+                 Task(id=3, title="Gap before me", recurrence="weekly")]
+        self.storage.save_tasks(tasks)
+        self.assertEqual(self.open().load_tasks(), tasks)
+        with open(os.path.join(self.directory, "records.bin"), 'rb') as f:
+            f.seek(HEADER_SIZE + 2 * RECORD.size)
+            self.assertEqual(RECORD.unpack(f.read(RECORD.size))[1].rstrip(b"\0"), b"pending")
+        self.assertEqual(self.open().max_id(), 3)
+        self.assertEqual(sorted(os.listdir(self.directory)), ["lock", "records.bin", "records.bin.changes", "records.bin.changes.idx",
+                                                              "records.bin.changes.lock", "strings-1.bin"])
+
+    def test_done_patches_the_record_in_place(self):
+        before = self.file_state()
+        heap_size = os.path.getsize(os.path.join(self.directory, "strings-0.bin"))
+        manager = self.fresh()
+        with mock.patch.object(BinaryStorage, "load_tasks", side_effect=AssertionError("loaded")):
+            manager.complete_task(1)
+            manager.update_task(2, priority="Low", due_date="2024-05-01")
+        self.assertEqual(self.file_state(), before)
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, "strings-0.bin")), heap_size)
+        task = self.open().get_task(1)
+        self.assertEqual((task.status, task.project, task.due_date), ("done", "Work", "2024-03-01"))
+        self.assertIsNotNone(task.completed_at)
+        self.assertEqual(self.fresh().get_task_by_id(2).due_date, "2024-05-01")
+
+    def test_queries(self):
+        self.manager.complete_task(3)
+        self.manager.delete_task(2)
+        manager = self.fresh()
+        self.assertEqual([t.id for t in manager.list_tasks(project="Work")], [1, 3, 4])
+        self.assertEqual([t.id for t in manager.list_tasks(status="pending", project="Work")], [1, 4])
+        self.assertEqual([t.id for t in manager.list_tasks(due_before="2024-03-02")], [1, 3])
+        self.assertIsNone(manager.get_task_by_id(2))
+        self.assertTrue(self.storage.has_pending_title("Write report"))
+        self.assertFalse(self.storage.has_pending_title("Write report", exclude={1}))
+        self.assertFalse(self.storage.has_pending_title("Groceries"))
+        # Deleted IDs are not reused
+        self.assertEqual(manager.add_task("Next").id, 5)
+
+    def test_crash_recovery(self):
+        with mock.patch.object(BinaryStorage, "_patch", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                self.fresh().complete_task(2)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "redo.log")))
+        # The synced redo record is replayed by the next access
+        self.assertEqual(self.fresh().get_task_by_id(2).status, "done")
+        self.assertFalse(os.path.exists(os.path.join(self.directory, "redo.log")))
+        # A torn redo record is discarded, along with its heap bytes
+        with mock.patch.object(BinaryStorage, "_patch", side_effect=OSError("crash")):
+            with self.assertRaises(OSError):
+                self.fresh().update_task(1, title="Renamed")
+        redo_path = os.path.join(self.directory, "redo.log")
+        with open(redo_path, 'r+b') as f:
+            f.truncate(os.path.getsize(redo_path) - 1)
+        self.assertEqual(self.fresh().get_task_by_id(1).title, "Write report")
+        self.fresh().update_task(3, title="Standup with the team")
+        self.assertEqual([t.title for t in self.fresh().tasks], ["Write report", "Groceries", "Standup with the team"])
+
+    def test_concurrent_adds_and_invalid_values(self):
+        first, second = self.fresh(), self.fresh()
+        first.tasks
+        second.tasks
+        self.assertEqual(first.add_task("From first").id, 4)
+        # The second process also picked ID 4; it is renumbered
+        self.assertEqual(second.add_task("From second").id, 5)
+        self.assertEqual([t.title for t in self.fresh().tasks][3:], ["From first", "From second"])
+        with self.assertRaises(ValueError):
+            self.manager.update_task(2, recurrence="every second tuesday")
+        self.assertIsNone(self.fresh().get_task_by_id(2).recurrence)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import os
+import json
+from src.models import Task
+from src.storage import Storage
+
+class TestSnapshotCache(unittest.TestCase):
+    def setUp(self):
+        self.test_file = "test_cache.json"
+        self.storage = Storage(self.test_file, use_cache=True)
+
+    def tearDown(self):
+        for path in (self.test_file, self.test_file + ".cache", self.test_file + ".lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_save_writes_cache_used_on_load(self):
+        self.storage.save_tasks([Task(id=1, title="Cached")])
+        self.assertTrue(os.path.exists(self.storage.cache.path))
+
+        # A fresh cache is trusted over the JSON file
+        stat = os.stat(self.test_file)
+        self.storage.cache.store([Task(id=1, title="From cache")], stat)
+        self.assertEqual(self.storage.load_tasks()[0].title, "From cache")
+
+    def test_stale_cache_is_rebuilt(self):
+        self.storage.save_tasks([Task(id=1, title="Old")])
+        with open(self.test_file, 'w') as f:
+            json.dump([Task(id=1, title="Edited elsewhere").to_dict()], f)
+
+        self.assertEqual(self.storage.load_tasks()[0].title, "Edited elsewhere")
+        self.assertEqual(self.storage.cache.load(os.stat(self.test_file))[0].title, "Edited elsewhere")
+
+    def test_corrupt_cache_is_ignored(self):
+        self.storage.save_tasks([Task(id=1, title="Safe")])
+        with open(self.storage.cache.path, 'wb') as f:
+            f.write(b"not a cache")
+
+        self.assertEqual(self.storage.load_tasks()[0].title, "Safe")
+        self.assertIsNotNone(self.storage.cache.load(os.stat(self.test_file)))
+
+if __name__ == '__main__':
+    unittest.main()
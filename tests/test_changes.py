@@ -0,0 +1,112 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from src.changes import INDEX_ENTRY_SIZE
+from src.cli import build_parser, run_command
+from src.manager import TaskManager
+from src.models import Task
+from src.storage import Storage
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.directory, "tasks.json")
+        self.manager = TaskManager(Storage(self.test_file))
+        self.manager.add_task("First commit")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self, since=0, manager=None):
+        changes, mark = (manager or self.manager).changes(since)
+        return [(c["seq"], c["id"], c["op"], c.get("task", {}).get("status")) for c in changes], mark
+
+    def test_records_puts_and_tombstones(self):
+        self.assertEqual(self.read(), ([(1, 1, "put", "pending")], 1))
+        self.manager.add_task("Standup", recurrence="daily", due_date="2024-03-01")
+        self.manager.update_task(1, priority="High")
+        # Completing a recurring task also adds its next occurrence
+        self.manager.complete_task(2)
+        self.manager.delete_task(1)
+        self.assertEqual(self.read(1), ([(2, 2, "put", "pending"), (3, 1, "put", "pending"),
+                                         (4, 2, "put", "done"), (5, 3, "put", "pending"),
+                                         (6, 1, "delete", None)], 6))
+        # Archiving removes tasks from the store, so it emits tombstones
+        self.manager.archive_tasks()
+        changes, mark = self.read(6)
+        self.assertEqual((changes, mark), ([(7, 2, "delete", None)], 7))
+        changes, _ = self.manager.changes(4)
+        self.assertEqual(next(changes)["task"]["due_date"], "2024-03-02")
+
+    def test_existing_store_is_seeded(self):
+        # A store written before the feed existed
+        shutil.rmtree(self.directory)
+        os.makedirs(self.directory)
+        Storage(self.test_file).save_tasks([Task(id=1, title="Old"), Task(id=2, title="Older")])
+        manager = TaskManager(Storage(self.test_file))
+        manager.complete_task(1)
+        manager.add_task("New")
+        self.assertEqual(self.read(manager=manager), ([(1, 1, "put", "done"), (2, 2, "put", "pending"),
+                                                       (3, 3, "put", "pending")], 3))
+        # A first read seeds the feed too
+        shutil.rmtree(self.directory)
+        os.makedirs(self.directory)
+        Storage(self.test_file).save_tasks([Task(id=5, title="Only")])
+        self.assertEqual(self.read(manager=TaskManager(Storage(self.test_file))), ([(1, 5, "put", "pending")], 1))
+
+    def test_since_reads_through_the_index(self):
+        for i in range(20):
+            self.manager.add_task(f"Task {i}")
+        with open(self.test_file + ".changes", 'r+b') as f:
+            # Scribble over the start of the log: reading from 16 must not touch it
+            f.write(b"#" * 100)
+        changes, mark = self.read(16, TaskManager(Storage(self.test_file)))
+        self.assertEqual(([seq for seq, *_ in changes], mark), ([17, 18, 19, 20, 21], 21))
+        self.assertEqual(self.read(21), ([], 21))
+        with self.assertRaises(ValueError):
+            self.manager.changes(-1)
+
+    def test_reader_stops_at_its_mark(self):
+        self.manager.add_task("First")
+        changes, mark = self.manager.changes(1)
+        self.manager.add_task("Second")
+        self.assertEqual(([c["id"] for c in changes], mark), ([2], 2))
+
+    def test_crash_leftovers_are_dropped(self):
+        self.manager.add_task("Kept")
+        log_path = self.test_file + ".changes"
+        # A line written without its index entry, then a torn index entry
+        with open(log_path, 'ab') as f:
+            f.write(b'{"seq": 3, "id": 99, "op": "delete"}\n')
+        with open(log_path + ".idx", 'ab') as f:
+            f.write(b"\x01\x02")
+        self.manager.add_task("Next")
+        self.assertEqual(self.read(1), ([(2, 2, "put", "pending"), (3, 3, "put", "pending")], 3))
+        self.assertEqual(os.path.getsize(log_path + ".idx"), 3 * INDEX_ENTRY_SIZE)
+
+    def test_concurrent_writers_get_distinct_sequence_numbers(self):
+        first, second = TaskManager(Storage(self.test_file)), TaskManager(Storage(self.test_file))
+        first.tasks
+        second.tasks
+        first.add_task("From first")
+        # The second writer's task is renumbered by the merge; the feed has the saved ID
+        second.add_task("From second")
+        changes, _ = self.read(1)
+        self.assertEqual(changes, [(2, 2, "put", "pending"), (3, 3, "put", "pending")])
+
+    def test_cli(self):
+        self.manager.add_task("Second")
+        self.manager.complete_task(2)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_command(self.manager, build_parser().parse_args(["changes", "--since", "2"]), self.test_file)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual([(c["seq"], c["op"], c["task"]["status"]) for c in lines[:-1]], [(3, "put", "done")])
+        self.assertEqual(lines[-1], {"high_water_mark": 3})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import dataclasses
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import mock
+from src import codec
+from src.binary_storage import BinaryStorage
+from src.models import Task
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class TestCodec(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.directory, "tasks.json")
+        self.tasks = [
+            Task(id=1, title="Plain", created_at="2024-01-01T09:00:00"),
+            Task(id=2, title="Ünïcode \"quoted\"", status="done", priority="High", project="Work", recurrence="weekly",
+                 created_at="2024-01-02T09:00:00", completed_at="2024-01-03T18:00:00", due_date="2024-01-05", relist_count=3),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_matches_dataclass_conversion(self):
+        for task in self.tasks:
+            self.assertEqual(task.to_dict(), dataclasses.asdict(task))
+            self.assertEqual(Task.from_dict(task.to_dict()), Task(**dataclasses.asdict(task)))
+        decoded = Task.from_dict({"id": 3, "title": "T", "status": "".join(["pen", "ding"]), "project": "".join(["Wo", "rk"])})
+        self.assertIs(decoded.status, "pending")
+        self.assertIs(decoded.project, self.tasks[1].project)
+
+    def test_unknown_and_missing_keys(self):
+        task = Task.from_dict({"id": 4, "title": "Minimal", "added_by_a_newer_version": True})
+        self.assertEqual((task.status, task.priority, task.project, task.relist_count), ("pending", "Medium", None, 0))
+        self.assertTrue(task.created_at)
+        with self.assertRaises(TypeError):
+            Task.from_dict({"title": "No ID"})
+
+    def test_loads_files_in_the_previous_layout(self):
+        # Pretty-printed, with no relist counts
+        items = [{k: v for k, v in task.to_dict().items() if k != "relist_count"} for task in self.tasks]
+        with open(self.test_file, 'w') as f:
+            f.write('{"header": {"version": 3, "stats": null},\n"tasks": ')
+            json.dump(items, f, indent=4)
+            f.write("}\n")
+        loaded = Storage(self.test_file).load_tasks()
+        self.assertEqual([task.relist_count for task in loaded], [0, 0])
+        self.assertEqual([task.title for task in loaded], ["Plain", "Ünïcode \"quoted\""])
+
+    def test_streamed_batches(self):
+        with mock.patch("src.codec.ENCODE_BATCH", 1):
+            batches = list(codec.encode_batches([{"a": 1}, {"b": [1, 2]}, {"c": None}], b",\n"))
+        self.assertEqual(batches, [b'{"a":1}', b',\n{"b":[1,2]}', b',\n{"c":null}'])
+        for fmt in ("json", "jsonl"):
+            with mock.patch("src.codec.ENCODE_BATCH", 1):
+                Storage(self.test_file, fmt=fmt).save_tasks(self.tasks)
+            self.assertEqual(Storage(self.test_file).load_tasks(), self.tasks)
+            Storage(self.test_file, fmt=fmt).save_tasks([])
+            self.assertEqual(Storage(self.test_file).load_tasks(), [])
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_fast_mode(self):
+        with mock.patch("src.codec.orjson", orjson), mock.patch("src.codec.FAST_JSON", True):
+            for fmt in ("json", "jsonl"):
+                Storage(self.test_file, fmt=fmt).save_tasks(self.tasks)
+                with mock.patch("src.codec.FAST_JSON", False):
+                    self.assertEqual(Storage(self.test_file).load_tasks(), self.tasks)
+                self.assertEqual(Storage(self.test_file).load_tasks(), self.tasks)
+
+    def test_other_backends_keep_relist_counts(self):
+        records = os.path.join(self.directory, "tasks.records")
+        with BinaryStorage(records) as storage:
+            storage.save_tasks(self.tasks)
+        with BinaryStorage(records) as storage:
+            self.assertEqual(storage.get_task(2).relist_count, 3)
+        # SQLite databases from before the column get it with a default
+        db_path = os.path.join(self.directory, "tasks.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT, status TEXT, priority TEXT, project TEXT, "
+                     "recurrence TEXT, created_at TEXT, completed_at TEXT, due_date TEXT)")
+        conn.execute("INSERT INTO tasks (id, title, status, priority, created_at) VALUES (1, 'Old', 'pending', 'Low', '2024-01-01')")
+        conn.commit()
+        conn.close()
+        storage = SQLiteStorage(db_path)
+        self.assertEqual(storage.get_task(1).relist_count, 0)
+        storage.save_tasks(self.tasks)
+        self.assertEqual(SQLiteStorage(db_path).load_tasks(), self.tasks)
+
+if __name__ == '__main__':
+    unittest.main()
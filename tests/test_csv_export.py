@@ -1,6 +1,10 @@
 import unittest
+import glob
 import os
 import csv
+import gzip
+import json
+from src.exporter import parse_columns
 from src.manager import TaskManager
 from src.storage import Storage
 from src.models import Task
@@ -13,8 +17,9 @@ class TestCSVExport(unittest.TestCase):
         self.manager = TaskManager(self.storage)
 
     def tearDown(self):
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        # The task file and its sidecars (lock, change feed)
+        for path in glob.glob(self.test_file + "*"):
+            os.remove(path)
         if os.path.exists(self.csv_file):
             os.remove(self.csv_file)
 
@@ -43,5 +48,36 @@ class TestCSVExport(unittest.TestCase):
             self.assertEqual(rows[1]['Priority'], "Low")
             self.assertEqual(rows[1]['Project'], "Project B")
 
+    def test_default_header(self):
+        self.manager.add_task("Task 1")
+        self.manager.export_tasks(self.csv_file)
+        with open(self.csv_file, encoding='utf-8') as f:
+            self.assertEqual(f.readline().rstrip("\r\n"), "ID,Title,Status,Priority,Project,Recurrence,Due Date,Created At,Completed At")
+        self.manager.export_tasks(self.csv_file, columns=parse_columns("id,relist_count"))
+        with open(self.csv_file, encoding='utf-8') as f:
+            self.assertEqual(list(csv.reader(f)), [["ID", "Relist Count"], ["1", "0"]])
+
+    def test_export_filters_and_columns(self):
+        self.manager.add_task("Task 1", priority="High", project="Project A")
+        done = self.manager.add_task("Task 2", project="Project A")
+        self.manager.add_task("Task 3", project="Project B")
+        self.manager.complete_task(done.id)
+
+        count = self.manager.export_tasks(self.csv_file, fmt="tsv", columns=["ID", "Title"], project="Project A", status="pending")
+        self.assertEqual(count, 1)
+        with open(self.csv_file, newline='', encoding='utf-8') as file:
+            self.assertEqual(file.read(), "ID\tTitle\r\n1\tTask 1\r\n")
+
+    def test_export_jsonl_gzip(self):
+        self.manager.add_task("Task 1", project="Project A")
+        self.manager.add_task("Task 2")
+
+        self.manager.export_tasks(self.csv_file, fmt="jsonl", compress=True)
+        with gzip.open(self.csv_file, 'rt', encoding='utf-8') as file:
+            records = [json.loads(line) for line in file]
+        # The default columns predate relist counts
+        expected = [{k: v for k, v in t.to_dict().items() if k != "relist_count"} for t in self.manager.tasks]
+        self.assertEqual(records, expected)
+
 if __name__ == "__main__":
     unittest.main()
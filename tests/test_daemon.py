@@ -0,0 +1,89 @@
+import unittest
+import asyncio
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from unittest import mock
+from src.client import send_command
+from src.daemon import TaskDaemon, is_running
+from src.manager import TaskManager
+from src.storage import Storage
+
+class CountingStorage(Storage):
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        self.saves = 0
+
+    def save_tasks(self, tasks):
+        self.saves += 1
+        super().save_tasks(tasks)
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.directory, "tasks.json")
+        self.storage = CountingStorage(self.test_file)
+        self.daemon = TaskDaemon(TaskManager(self.storage), self.test_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_group_commits_once(self):
+        responses = self.daemon.run_group([
+            {"argv": ["add", "First"]},
+            {"argv": ["add", "Second", "--project", "Work"]},
+            {"argv": ["done", "1"]},
+            {"argv": ["list"]},
+        ])
+        self.assertEqual(self.storage.saves, 1)
+        self.assertEqual(responses[0]["stdout"], "Task added: 1 - First\n")
+        self.assertIn("Second", responses[3]["stdout"])
+        tasks = Storage(self.test_file).load_tasks()
+        self.assertEqual([t.status for t in tasks], ["done", "pending"])
+
+    def test_prompt_round_trip(self):
+        self.daemon.run_group([{"argv": ["add", "Twice"]}])
+        response = self.daemon.run_group([{"argv": ["add", "Twice"]}])[0]
+        self.assertIn("already exists", response["prompt"])
+        self.assertEqual(len(self.daemon.manager.tasks), 1)
+        response = self.daemon.run_group([{"argv": ["add", "Twice"], "answers": ["y"]}])[0]
+        self.assertEqual(response["stdout"], "Task added: 2 - Twice\n")
+
+    def test_usage_error_and_local_only_commands(self):
+        responses = self.daemon.run_group([{"argv": ["done", "x"]}, {"argv": ["export"]}])
+        self.assertIn("invalid int value", responses[0]["stderr"])
+        self.assertIn("does not run 'export'", responses[1]["stderr"])
+        self.assertEqual(self.storage.saves, 0)
+
+    def test_sees_direct_writes(self):
+        self.daemon.run_group([{"argv": ["add", "From daemon"]}])
+        TaskManager(Storage(self.test_file)).add_task("Direct")
+        response = self.daemon.run_group([{"argv": ["list"]}])[0]
+        self.assertIn("Direct", response["stdout"])
+
+    def test_serves_socket(self):
+        socket_path = self.test_file + ".sock"
+        self.assertFalse(send_command(socket_path, ["list"]))
+        thread = threading.Thread(target=asyncio.run, args=(self.daemon.run(socket_path),))
+        thread.start()
+        try:
+            for _ in range(100):
+                if is_running(socket_path):
+                    break
+                time.sleep(0.01)
+            output = io.StringIO()
+            with redirect_stdout(output), mock.patch("builtins.input", return_value="y"):
+                self.assertTrue(send_command(socket_path, ["add", "Remote"]))
+                self.assertTrue(send_command(socket_path, ["add", "Remote"]))
+            self.assertEqual(output.getvalue(), "Task added: 1 - Remote\nTask added: 2 - Remote\n")
+        finally:
+            self.daemon.stop()
+            thread.join()
+        self.assertEqual(len(Storage(self.test_file).load_tasks()), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import glob
+import datetime
+import os
+from unittest import mock
+from src.dates import normalize_due_date
+from src.manager import TaskManager
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+
+TODAY = datetime.date(2024, 3, 10)
+
+class TestDueDates(unittest.TestCase):
+    def setUp(self):
+        self.test_file = "test_due_dates.json"
+        self.manager = TaskManager(Storage(self.test_file))
+        for target in ("src.dates.today", "src.manager.today"):
+            patcher = mock.patch(target, return_value=TODAY)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        # The task files and their sidecars (lock, change feed)
+        for path in glob.glob(self.test_file + "*") + glob.glob("test_due_dates.db*"):
+            os.remove(path)
+
+    def add(self, manager=None):
+        manager = manager or self.manager
+        manager.add_task("Late", due_date="2024-03-01")
+        manager.add_task("Today", due_date="today")
+        manager.add_task("Soon", due_date="+3")
+        manager.add_task("Later", due_date="2024/4/1")
+        manager.add_task("Whenever")
+        manager.add_task("Done late", due_date="2024-02-01")
+        manager.complete_task(6)
+
+    def titles(self, tasks):
+        return [task.title for task in tasks]
+
+    def test_normalize(self):
+        self.assertEqual(normalize_due_date("2024-1-5"), "2024-01-05")
+        self.assertEqual(normalize_due_date("2024.12.31"), "2024-12-31")
+        self.assertEqual(normalize_due_date("tomorrow"), "2024-03-11")
+        self.assertEqual(normalize_due_date("+2w"), "2024-03-24")
+        for bad in ("2024-02-30", "next week", "31/12/2024"):
+            with self.assertRaises(ValueError):
+                normalize_due_date(bad)
+
+    def test_validated_on_add_and_update(self):
+        with self.assertRaises(ValueError):
+            self.manager.add_task("Bad", due_date="someday")
+        self.assertEqual(self.manager.tasks, [])
+        task = self.manager.add_task("Good", due_date="2024-3-9")
+        self.assertEqual(task.due_date, "2024-03-09")
+        with self.assertRaises(ValueError):
+            self.manager.update_task(task.id, due_date="2024-13-01")
+        self.manager.update_task(task.id, due_date="+1")
+        self.assertEqual(self.manager.overdue_tasks(), [])
+        self.assertEqual(self.titles(self.manager.agenda(2)), ["Good"])
+
+    def test_overdue_and_agenda(self):
+        self.add()
+        self.assertEqual(self.titles(self.manager.overdue_tasks()), ["Late"])
+        self.assertEqual(self.titles(self.manager.agenda(1)), ["Today"])
+        self.assertEqual(self.titles(self.manager.agenda(7)), ["Today", "Soon"])
+        self.manager.complete_task(1)
+        self.manager.update_task(4, due_date="2024-03-05")
+        self.assertEqual(self.titles(self.manager.overdue_tasks()), ["Later"])
+
+    def test_list_due_range(self):
+        self.add()
+        self.assertEqual(self.titles(self.manager.list_tasks(due_before="2024-03-10")), ["Late", "Done late"])
+        self.assertEqual(self.titles(self.manager.list_tasks(due_after="2024-03-10")), ["Soon", "Later"])
+        self.assertEqual(self.titles(self.manager.list_tasks(due_after="2024-03-01", due_before="2024-04-01")), ["Today", "Soon"])
+        with self.assertRaises(ValueError):
+            self.manager.list_tasks(due_before="soon")
+
+    def test_sqlite_pushdown(self):
+        manager = TaskManager(SQLiteStorage("test_due_dates.db"))
+        self.add(manager)
+        fresh = TaskManager(SQLiteStorage("test_due_dates.db"))
+        self.assertEqual(self.titles(fresh.overdue_tasks()), ["Late"])
+        self.assertEqual(self.titles(fresh.list_tasks(due_after="2024-03-10")), ["Soon", "Later"])
+        self.assertIsNone(fresh._tasks)
+        fresh.storage.close()
+        manager.storage.close()
+
+if __name__ == '__main__':
+    unittest.main()
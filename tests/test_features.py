@@ -1,4 +1,5 @@
 import unittest
+import glob
 import os
 from src.manager import TaskManager
 from src.storage import Storage
@@ -10,8 +11,9 @@ class TestFeatures(unittest.TestCase):
         self.manager = TaskManager(self.storage)
 
     def tearDown(self):
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        # The task file and its sidecars (lock, change feed)
+        for path in glob.glob(self.test_file + "*"):
+            os.remove(path)
 
     def test_update_task(self):
         task = self.manager.add_task("Original Title", priority="Low")
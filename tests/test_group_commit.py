@@ -0,0 +1,130 @@
+import unittest
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+from src.group_commit import AsyncTaskManager, GroupCommitManager
+from src.manager import TaskManager
+from src.storage import Storage
+
+class TestGroupCommit(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.directory, "tasks.json")
+        self.storage = Storage(self.test_file)
+        self.persists = []
+        persist = self.storage.persist
+
+        def counting_persist(tasks, changed=(), **kwargs):
+            changed = list(changed)
+            self.persists.append(len(changed))
+            return persist(tasks, changed=changed, **kwargs)
+
+        self.storage.persist = counting_persist
+        TaskManager(self.storage).add_task("Existing")
+        self.persists.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def stored(self):
+        return TaskManager(Storage(self.test_file)).tasks
+
+    def test_concurrent_callers_share_writes(self):
+        group = GroupCommitManager(TaskManager(self.storage), max_delay=0.05)
+        start = threading.Barrier(8)
+        futures = []
+
+        def caller(n):
+            start.wait()
+            futures.extend(group.add_task(f"Task {n}-{i}") for i in range(5))
+
+        threads = [threading.Thread(target=caller, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ids = sorted(future.result(5).id for future in futures)
+        group.close()
+        self.assertEqual(ids, list(range(2, 42)))
+        self.assertEqual(len(self.stored()), 41)
+        self.assertEqual(sum(self.persists), 40)
+        self.assertLess(len(self.persists), 10)
+
+    def test_max_batch_and_reads(self):
+        with GroupCommitManager(TaskManager(self.storage), max_delay=1, max_batch=2) as group:
+            first, second = group.add_task("A"), group.complete_task(1)
+            # A full group does not wait out the delay
+            self.assertTrue(second.result(0.5))
+            self.assertEqual(first.result().title, "A")
+            self.assertEqual([t.id for t in group.list_tasks(status="done")], [1])
+            self.assertEqual(group.get_task_by_id(2).title, "A")
+        self.assertEqual(self.persists, [2])
+
+    def test_reads_return_copies(self):
+        with GroupCommitManager(TaskManager(self.storage), max_delay=0) as group:
+            tasks = group.list_tasks()
+            task = group.get_task_by_id(1)
+            tasks.clear()
+            task.title = "Changed by the caller"
+            group.complete_task(1).result(5)
+            self.assertEqual(task.status, "pending")
+            self.assertEqual([(t.title, t.status) for t in group.list_tasks()], [("Existing", "done")])
+
+    def test_results_are_copies(self):
+        with GroupCommitManager(TaskManager(self.storage), max_delay=0) as group:
+            added = group.add_task("A").result(5)
+            group.update_task(added.id, title="B").result(5)
+            self.assertEqual(added.title, "A")
+            self.assertEqual(group.get_task_by_id(added.id).title, "B")
+
+    def test_failures(self):
+        group = GroupCommitManager(TaskManager(self.storage), max_delay=0.05)
+        good = group.add_task("Good")
+        bad = group.add_task("Existing", project="Dup")
+        missing = group.delete_task(99)
+        group.flush()
+        # A failing call only fails its own future
+        self.assertEqual(good.result().id, 2)
+        self.assertIsInstance(bad.exception(), ValueError)
+        self.assertFalse(missing.result())
+        self.assertEqual([t.project for t in self.stored()], [None, None])
+        # A failed write fails the whole group and rolls it back
+        with mock.patch.object(self.storage, "persist", side_effect=OSError("disk full")):
+            futures = [group.add_task("Lost"), group.complete_task(1)]
+            for future in futures:
+                with self.assertRaises(OSError):
+                    future.result(5)
+        self.assertEqual(group.list_tasks(status="done"), [])
+        self.assertEqual(len(group.list_tasks()), 2)
+        group.close()
+        group.close()
+        with self.assertRaises(RuntimeError):
+            group.add_task("Too late")
+        with self.assertRaises(AttributeError), GroupCommitManager(TaskManager(self.storage)) as other:
+            other.submit("no_such_method")
+        with self.assertRaises(ValueError):
+            GroupCommitManager(TaskManager(self.storage), max_batch=0)
+
+    def test_close_writes_queued_calls(self):
+        group = GroupCommitManager(TaskManager(self.storage), max_delay=10)
+        future = group.add_task("Queued")
+        group.close()
+        self.assertTrue(future.done())
+        self.assertEqual([t.title for t in self.stored()], ["Existing", "Queued"])
+
+    def test_async_wrapper(self):
+        async def main():
+            async with AsyncTaskManager(TaskManager(self.storage), max_delay=0.01) as tasks:
+                added = await asyncio.gather(*(tasks.add_task(f"Async {n}") for n in range(10)))
+                self.assertTrue(await tasks.complete_task(added[0].id))
+                return [t.title for t in await tasks.list_tasks(status="done")]
+
+        self.assertEqual(asyncio.run(main()), ["Async 0"])
+        self.assertEqual(len(self.stored()), 11)
+        self.assertEqual(self.persists, [10, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import glob
+import os
+import json
+from src.manager import TaskManager
+from src.storage import Storage
+
+class TestImport(unittest.TestCase):
+    def setUp(self):
+        self.test_file = "test_import.json"
+        self.csv_file = "test_import.csv"
+        self.jsonl_file = "test_import.jsonl"
+        self.manager = TaskManager(Storage(self.test_file))
+
+    def tearDown(self):
+        # The task file and its sidecars (lock, change feed)
+        for path in glob.glob(self.test_file + "*") + [self.csv_file, self.jsonl_file]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write_jsonl(self, records):
+        with open(self.jsonl_file, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+    def test_csv_round_trip(self):
+        self.manager.add_task("Task 1", priority="High", project="Project A", due_date="2024-01-15")
+        done = self.manager.add_task("Task 2", recurrence="weekly")
+        self.manager.complete_task(done.id)
+        self.manager.export_tasks_to_csv(self.csv_file)
+
+        target = TaskManager(Storage("test_import_target.json"))
+        try:
+            counts = target.import_tasks(self.csv_file)
+            self.assertEqual(counts, {"imported": 3, "skipped": 0})
+            original = [t.to_dict() for t in self.manager.tasks]
+            imported = [t.to_dict() for t in target.tasks]
+            self.assertEqual(imported, original)
+        finally:
+            for path in glob.glob("test_import_target.json*"):
+                os.remove(path)
+
+    def test_duplicate_policies(self):
+        self.manager.add_task("Existing")
+        self.write_jsonl([{"title": "Existing"}, {"title": "New"}, {"title": "New"}])
+
+        self.assertEqual(self.manager.import_tasks(self.jsonl_file), {"imported": 1, "skipped": 2})
+        with self.assertRaises(ValueError):
+            self.manager.import_tasks(self.jsonl_file, on_duplicate="fail")
+        self.assertEqual(self.manager.import_tasks(self.jsonl_file, on_duplicate="allow"), {"imported": 3, "skipped": 0})
+        self.assertEqual([t.id for t in self.manager.tasks], [1, 2, 3, 4, 5])
+
+    def test_invalid_row_imports_nothing(self):
+        self.write_jsonl([{"title": "Good"}, {"title": "Bad", "priority": "Urgent"}])
+        with self.assertRaises(ValueError) as ctx:
+            self.manager.import_tasks(self.jsonl_file)
+        self.assertIn("Line 2", str(ctx.exception))
+        self.assertEqual(self.manager.tasks, [])
+        self.assertFalse(os.path.exists(self.test_file))
+
+    def test_non_string_fields_name_the_line(self):
+        self.write_jsonl([{"title": "Good", "project": "Work"}, {"title": "Bad", "project": ["Work"]}])
+        with self.assertRaises(ValueError) as ctx:
+            self.manager.import_tasks(self.jsonl_file)
+        self.assertIn("Line 2: invalid project", str(ctx.exception))
+        self.write_jsonl([{"title": "Bad", "recurrence": 7}])
+        with self.assertRaises(ValueError) as ctx:
+            self.manager.import_tasks(self.jsonl_file)
+        self.assertIn("Line 1: invalid recurrence 7", str(ctx.exception))
+        self.write_jsonl([{"title": "A", "status": "done", "created_at": 12345}])
+        with self.assertRaises(ValueError) as ctx:
+            self.manager.import_tasks(self.jsonl_file)
+        self.assertIn("Line 1: invalid created_at 12345", str(ctx.exception))
+        self.write_jsonl([{"title": "A", "status": "done", "created_at": "2024-01-01T09:00:00", "completed_at": "garbage"}])
+        with self.assertRaises(ValueError) as ctx:
+            self.manager.import_tasks(self.jsonl_file)
+        self.assertIn("Line 1: invalid completed_at 'garbage'", str(ctx.exception))
+        self.assertEqual(self.manager.tasks, [])
+
+    def test_due_dates_normalized(self):
+        self.write_jsonl([{"title": "Padded", "due_date": "2024/3/5"}, {"title": "Bad", "due_date": "soon"}])
+        with self.assertRaises(ValueError) as ctx:
+            self.manager.import_tasks(self.jsonl_file)
+        self.assertIn("Line 2: Invalid due date 'soon'", str(ctx.exception))
+        self.write_jsonl([{"title": "Padded", "due_date": "2024/3/5"}])
+        self.manager.import_tasks(self.jsonl_file)
+        self.assertEqual(self.manager.tasks[0].due_date, "2024-03-05")
+
+    def test_due_index_after_import(self):
+        self.manager.add_task("Existing", due_date="2024-02-01")
+        self.write_jsonl([{"title": "Later", "due_date": "2024-03-01"}, {"title": "Earlier", "due_date": "2024-01-01"},
+                          {"title": "Undated"}, {"title": "Existing"}])
+        with self.assertRaises(ValueError):
+            self.manager.import_tasks(self.jsonl_file, on_duplicate="fail")
+        self.assertEqual([t.title for t in self.manager.due_tasks()], ["Existing"])
+        self.manager.import_tasks(self.jsonl_file)
+        self.assertEqual([t.title for t in self.manager.due_tasks()], ["Earlier", "Existing", "Later"])
+        self.assertEqual([t.title for t in self.manager.due_tasks(after="2024-01-15")], ["Existing", "Later"])
+
+    def test_progress_callback(self):
+        self.write_jsonl([{"title": f"Task {i}"} for i in range(5)])
+        seen = []
+        self.manager.import_tasks(self.jsonl_file, progress=seen.append, progress_every=2)
+        self.assertEqual(seen, [2, 4])
+
+if __name__ == '__main__':
+    unittest.main()
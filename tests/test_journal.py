@@ -0,0 +1,77 @@
+import unittest
+import glob
+import os
+import json
+from unittest import mock
+from src.journal import JournalStorage
+from src.manager import TaskManager
+from src.models import Task
+from src.stats import Stats
+
+class TestJournalStorage(unittest.TestCase):
+    def setUp(self):
+        self.test_file = "test_journal.json"
+        self.storage = JournalStorage(self.test_file)
+
+    def tearDown(self):
+        # The snapshot and its sidecars (journal, lock, change feed)
+        for path in glob.glob(self.test_file + "*"):
+            os.remove(path)
+
+    def test_mutations_append_to_journal(self):
+        manager = TaskManager(self.storage)
+        task = manager.add_task("Journaled")
+        manager.complete_task(task.id)
+
+        # A new store starts with an empty snapshot that holds the aggregates
+        with open(self.test_file) as f:
+            self.assertEqual(json.load(f)["tasks"], [])
+        with open(self.storage.journal_path) as f:
+            self.assertEqual([json.loads(line)["op"] for line in f], ["put", "stats", "put", "stats"])
+        self.assertEqual(JournalStorage(self.test_file).load_stats()["status"], {"done": 1})
+
+        loaded = JournalStorage(self.test_file).load_tasks()
+        self.assertEqual(len(loaded), 1)
+        self.assertEqual(loaded[0].status, "done")
+
+    def test_replay_delete_over_snapshot(self):
+        self.storage.save_tasks([Task(id=1, title="A"), Task(id=2, title="B")])
+        self.storage.persist([], deleted=[1])
+
+        loaded = self.storage.load_tasks()
+        self.assertEqual([t.id for t in loaded], [2])
+
+    def test_torn_record_is_skipped(self):
+        self.storage.persist([], changed=[Task(id=1, title="A")])
+        with open(self.storage.journal_path, 'a') as f:
+            f.write('{"op": "put", "task": {"id": 2')
+        self.storage.persist([], changed=[Task(id=3, title="C")])
+
+        loaded = self.storage.load_tasks()
+        self.assertEqual([t.id for t in loaded], [1, 3])
+
+    def test_compaction_past_threshold(self):
+        storage = JournalStorage(self.test_file, compact_threshold=1)
+        manager = TaskManager(storage)
+        manager.add_task("Compacted")
+
+        self.assertFalse(os.path.exists(storage.journal_path))
+        with open(self.test_file) as f:
+            self.assertEqual(json.load(f)["tasks"][0]["title"], "Compacted")
+
+    def test_crash_before_journal_removal_keeps_stats(self):
+        self.storage.save_tasks([])
+        manager = TaskManager(self.storage)
+        manager.add_task("A")
+        manager.add_task("B")
+        # Compact, then crash before the journal is removed
+        with mock.patch("src.journal.os.remove"):
+            self.storage.compact(manager.tasks)
+        self.assertTrue(os.path.exists(self.storage.journal_path))
+        storage = JournalStorage(self.test_file)
+        self.assertEqual(storage.load_stats(), Stats.from_tasks(storage.load_tasks()).to_dict())
+        TaskManager(storage).add_task("C")
+        self.assertEqual(JournalStorage(self.test_file).load_stats()["total"], 3)
+
+if __name__ == '__main__':
+    unittest.main()
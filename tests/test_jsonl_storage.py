@@ -0,0 +1,86 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from unittest import mock
+from src.cli import build_parser, run_command
+from src.journal import JournalStorage
+from src.manager import TaskManager
+from src.models import Task
+from src.storage import Storage
+
+class TestJsonlStorage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.directory, "tasks.json")
+        self.tasks = [Task(id=i, title=f"Task {i} ✓", project=f"P{i % 3}" if i % 4 else None,
+                           due_date="2024-03-01" if i % 2 else None) for i in range(1, 101)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_layout_and_round_trip(self):
+        Storage(self.test_file, fmt="jsonl").save_tasks(self.tasks)
+        with open(self.test_file) as f:
+            lines = f.read().splitlines()
+        header = json.loads(lines[0])["header"]
+        self.assertEqual((header["version"], header["format"], header["stats"]["total"]), (1, "jsonl", 100))
+        self.assertEqual(len(lines), 101)
+        self.assertNotIn(": ", lines[1])
+        # Detected on load, and kept by saves that do not name a format
+        storage = Storage(self.test_file)
+        self.assertEqual(storage.load_tasks(), self.tasks)
+        storage.save_tasks(self.tasks[:10])
+        self.assertEqual(Storage(self.test_file).load_tasks(), self.tasks[:10])
+        with open(self.test_file) as f:
+            self.assertEqual(len(f.readlines()), 11)
+        Storage(self.test_file, fmt="json").save_tasks(self.tasks)
+        # The JSON format holds one compact task per line too, inside the list
+        with open(self.test_file) as f:
+            lines = f.read().splitlines()
+        self.assertEqual((lines[1], lines[-1]), ('"tasks": [', ']}'))
+        self.assertEqual(json.loads(lines[2].rstrip(",")), self.tasks[0].to_dict())
+        self.assertEqual(Storage(self.test_file).load_tasks(), self.tasks)
+
+    def test_parallel_decode_matches_serial(self):
+        Storage(self.test_file, fmt="jsonl").save_tasks(self.tasks)
+        with mock.patch("src.storage.PARALLEL_DECODE_BYTES", 0), \
+                mock.patch("src.storage._decode_workers", return_value=3):
+            self.assertEqual(Storage(self.test_file).load_tasks(), self.tasks)
+            # Falls back to decoding in this process if the pool is unavailable
+            with mock.patch("concurrent.futures.ProcessPoolExecutor", side_effect=OSError("no semaphores")):
+                self.assertEqual(Storage(self.test_file).load_tasks(), self.tasks)
+        with mock.patch("src.storage.DECODE_CHUNK_BYTES", 100):
+            self.assertEqual(Storage(self.test_file).load_tasks(), self.tasks)
+
+    def test_iter_tasks_streams_filters(self):
+        Storage(self.test_file, fmt="jsonl").save_tasks(self.tasks)
+        with mock.patch("src.storage.DECODE_CHUNK_BYTES", 100):
+            self.assertEqual(list(Storage(self.test_file).iter_tasks()), self.tasks)
+        manager = TaskManager(Storage(self.test_file))
+        with mock.patch.object(Storage, "load_tasks", side_effect=AssertionError("loaded")):
+            titles = [task.title for task in manager.list_tasks(project="P1")]
+        self.assertEqual(titles, [task.title for task in self.tasks if task.project == "P1"])
+        # The journal is replayed onto the snapshot
+        journal = JournalStorage(os.path.join(self.directory, "journal.json"), fmt="jsonl")
+        journal.save_tasks(self.tasks[:2])
+        TaskManager(journal).complete_task(2)
+        self.assertEqual([task.status for task in journal.iter_tasks()], ["pending", "done"])
+
+    def test_migrate_converts_format(self):
+        Storage(self.test_file).save_tasks(self.tasks)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_command(None, build_parser().parse_args(["migrate", "--to", "json", "--format", "jsonl"]), self.test_file)
+        self.assertEqual(output.getvalue(), "Converted 100 tasks to jsonl.\n")
+        with open(self.test_file) as f:
+            self.assertEqual(json.loads(f.readline())["header"]["format"], "jsonl")
+        self.assertEqual(Storage(self.test_file).load_tasks(), self.tasks)
+        with self.assertRaises(ValueError):
+            Storage(self.test_file, fmt="yaml")
+
+if __name__ == '__main__':
+    unittest.main()
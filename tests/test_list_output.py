@@ -0,0 +1,68 @@
+import unittest
+import io
+import json
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from unittest import mock
+from src.cli import build_parser, run_command
+from src.manager import TaskManager, page_tasks
+from src.storage import Storage
+
+class TestListOutput(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.directory, "tasks.json")
+        self.manager = TaskManager(Storage(self.test_file))
+        self.manager.add_task("Low later", priority="Low", due_date="2024-05-01")
+        self.manager.add_task("High soon", priority="High", due_date="2024-03-01")
+        self.manager.add_task("Medium undated", priority="Medium")
+        self.manager.add_task("High later", priority="High", due_date="2024-06-01")
+        self.manager.complete_task(1)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def ids(self, **kwargs):
+        return [task.id for task in self.manager.list_tasks(**kwargs)]
+
+    def run_cli(self, *argv):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_command(self.manager, build_parser().parse_args(argv), self.test_file)
+        return output.getvalue()
+
+    def test_sort_orders(self):
+        self.assertEqual(self.ids(sort="priority"), [2, 4, 3, 1])
+        self.assertEqual(self.ids(sort="due"), [2, 1, 4, 3])
+        self.assertEqual(self.ids(sort="due", reverse=True), [3, 4, 1, 2])
+        self.assertEqual(self.ids(sort="id", reverse=True), [4, 3, 2, 1])
+        self.assertEqual(self.ids(status="pending", sort="due"), [2, 4, 3])
+        with self.assertRaises(ValueError):
+            self.manager.list_tasks(sort="title")
+
+    def test_limit_and_offset(self):
+        self.assertEqual(self.ids(limit=2), [1, 2])
+        self.assertEqual(self.ids(sort="due", limit=2, offset=1), [1, 4])
+        self.assertEqual(self.ids(offset=3), [4])
+        self.assertEqual(self.ids(limit=0), [])
+        with self.assertRaises(ValueError):
+            self.manager.list_tasks(offset=-1)
+
+    def test_top_k_uses_heap_selection(self):
+        with mock.patch("src.manager.sorted", create=True, side_effect=AssertionError("full sort")):
+            self.assertEqual([t.id for t in page_tasks(self.manager.tasks, "priority", limit=1)], [2])
+
+    def test_cli_table_and_jsonl(self):
+        output = self.run_cli("list", "--sort", "due", "--limit", "1")
+        lines = output.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[2].startswith("2 "))
+        output = self.run_cli("list", "--status", "pending", "--format", "jsonl")
+        self.assertEqual([json.loads(line)["id"] for line in output.splitlines()], [2, 3, 4])
+        self.assertEqual(self.run_cli("list", "--offset", "10"), "No tasks found.\n")
+        self.assertEqual(self.run_cli("list", "--limit", "-1"), "Error: Limit and offset must not be negative\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
+import glob
 import os
 import json
+from unittest import mock
 from src.manager import TaskManager
 from src.storage import Storage
 from src.models import Task 
@@ -12,8 +14,9 @@ class TestTaskManager(unittest.TestCase):
         self.manager = TaskManager(self.storage)
 
     def tearDown(self):
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        # The task file and its sidecars (lock, change feed)
+        for path in glob.glob(self.test_file + "*"):
+            os.remove(path)
 
     def test_add_task(self):
         task = self.manager.add_task("Test Task", priority="High")
@@ -48,5 +51,48 @@ class TestTaskManager(unittest.TestCase):
         loaded_task = new_manager.tasks[0]
         self.assertEqual(loaded_task.due_date, "2023-12-31")
 
+    def test_indexes_follow_mutations(self):
+        t1 = self.manager.add_task("Task 1", project="A", priority="High")
+        t2 = self.manager.add_task("Task 2", project="A")
+        self.manager.update_task(t1.id, project="B")
+        self.assertEqual([t.id for t in self.manager.list_tasks(project="A")], [t2.id])
+        self.assertEqual([t.id for t in self.manager.list_tasks(project="B", priority="High")], [t1.id])
+
+        self.manager.update_task(t1.id, project="A")
+        self.assertEqual([t.id for t in self.manager.list_tasks(project="A")], [t1.id, t2.id])
+
+        self.manager.delete_task(t2.id)
+        self.assertIsNone(self.manager.get_task_by_id(t2.id))
+        self.assertEqual(self.manager.add_task("Task 3").id, 3)
+
+    def test_delete_finds_task_by_position(self):
+        for n in range(5):
+            self.manager.add_task(f"Task {n}")
+        # Locating the task must not compare it with the others
+        with mock.patch.object(Task, "__eq__", side_effect=AssertionError("compared tasks")):
+            self.manager.delete_task(3)
+            self.manager.delete_task(1)
+        self.assertEqual([t.id for t in self.manager.tasks], [2, 4, 5])
+
+        with self.assertRaises(RuntimeError):
+            with self.manager.batch():
+                self.manager.delete_task(4)
+                self.manager.add_task("Task 6")
+                self.manager.delete_task(2)
+                raise RuntimeError
+        self.assertEqual([t.id for t in self.manager.tasks], [2, 4, 5])
+        self.assertEqual([t.id for t in self.manager.list_tasks(status="pending")], [2, 4, 5])
+
+    def test_duplicate_check_uses_pending_titles(self):
+        task = self.manager.add_task("Once", recurrence="daily")
+        with self.assertRaises(ValueError):
+            self.manager.add_task("Once")
+        self.manager.complete_task(task.id)
+        # The recurrence follow-up is pending again, so the title is still taken
+        with self.assertRaises(ValueError):
+            self.manager.add_task("Once")
+        self.manager.update_task(task.id + 1, title="Renamed")
+        self.assertEqual(self.manager.add_task("Once").id, task.id + 2)
+
 if __name__ == "__main__":
     unittest.main()
@@ -26,5 +26,11 @@ class TestTaskModel(unittest.TestCase):
         self.assertEqual(task.id, 1)
         self.assertEqual(task.title, "Test Task")
 
+    def test_task_is_slotted(self):
+        task = Task(id=1, title="Test Task", project="Work")
+        self.assertFalse(hasattr(task, "__dict__"))
+        other = Task.from_dict({"id": 2, "title": "Other", "project": "".join(["Wo", "rk"])})
+        self.assertIs(task.project, other.project)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import glob
+import os
+import json
+from src import profiling
+from src.manager import TaskManager
+from src.storage import Storage
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.test_file = "test_profiling.json"
+
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+        # The task file and its sidecars (lock, change feed)
+        for path in glob.glob(self.test_file + "*"):
+            os.remove(path)
+
+    def test_disabled_records_nothing(self):
+        with profiling.span("phase"):
+            profiling.count("things", 3)
+        self.assertEqual(profiling.report(), {"spans": {}, "counters": {}})
+
+    def test_storage_and_manager_phases(self):
+        profiling.enable()
+        manager = TaskManager(Storage(self.test_file))
+        manager.add_task("Profiled")
+        TaskManager(Storage(self.test_file)).list_tasks(project="A")
+
+        data = profiling.report()
+        for phase in ("manager.persist", "storage.write", "storage.replace", "storage.parse", "manager.filter"):
+            self.assertIn(phase, data["spans"])
+        self.assertEqual(data["counters"]["saves"], 1)
+        self.assertEqual(data["counters"]["tasks_loaded"], 1)
+        self.assertEqual(data["counters"]["bytes_written"], os.path.getsize(self.test_file))
+        self.assertEqual(json.loads(profiling.format_report("json")), data)
+
+if __name__ == '__main__':
+    unittest.main()
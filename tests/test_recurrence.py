@@ -0,0 +1,91 @@
+import unittest
+import glob
+import datetime
+import os
+from unittest import mock
+from src.manager import TaskManager
+from src.recurrence import OccurrenceCalculator, next_due_date
+from src.storage import Storage
+
+class CountingStorage(Storage):
+    def __init__(self, file_path):
+        super().__init__(file_path)
+        self.saves = 0
+
+    def save_tasks(self, tasks):
+        self.saves += 1
+        super().save_tasks(tasks)
+
+class TestRecurrence(unittest.TestCase):
+    def setUp(self):
+        self.test_file = "test_recurrence.json"
+        self.storage = CountingStorage(self.test_file)
+        self.manager = TaskManager(self.storage)
+
+    def tearDown(self):
+        # The task file and its sidecars (lock, change feed)
+        for path in glob.glob(self.test_file + "*"):
+            os.remove(path)
+
+    def series(self, title):
+        return [(t.due_date, t.status) for t in self.manager.tasks if t.title == title]
+
+    def test_next_due_date(self):
+        self.assertEqual(next_due_date("2024-02-28", "daily"), "2024-02-29")
+        self.assertEqual(next_due_date("2024-12-30", "Weekly"), "2025-01-06")
+        self.assertEqual(next_due_date("2024-01-31", "monthly"), "2024-02-29")
+        self.assertIsNone(next_due_date("2024-01-31", "every other tuesday"))
+        self.assertIsNone(next_due_date(None, "daily"))
+
+    def test_monthly_keeps_day_of_month(self):
+        calculator = OccurrenceCalculator("2024-05-31")
+        self.assertEqual(calculator.after("2024-01-31", "monthly"), ["2024-02-29", "2024-03-31", "2024-04-30", "2024-05-31"])
+        self.assertEqual(calculator.after("2024-05-31", "monthly"), [])
+        self.assertEqual(calculator.after("2024-02-29", "monthly", day=31), ["2024-03-31", "2024-04-30", "2024-05-31"])
+        self.assertEqual(next_due_date("2026-02-28", "monthly", day=31), "2026-03-31")
+
+    def test_monthly_completed_repeatedly_keeps_day_of_month(self):
+        task = self.manager.add_task("Rent", project="Home", recurrence="monthly", due_date="2026-01-31")
+        for _ in range(3):
+            self.manager.complete_task(task.id)
+            task = next(t for t in self.manager.tasks if t.title == "Rent" and t.status == "pending")
+        self.assertEqual([d for d, _ in self.series("Rent")], ["2026-01-31", "2026-02-28", "2026-03-31", "2026-04-30"])
+
+    def test_rollover_after_clamped_month_keeps_day_of_month(self):
+        task = self.manager.add_task("Rent", recurrence="monthly", due_date="2026-01-31")
+        self.manager.complete_task(task.id)
+        self.manager.rollover("2026-04-30")
+        self.assertEqual([d for d, _ in self.series("Rent")], ["2026-01-31", "2026-02-28", "2026-03-31", "2026-04-30"])
+
+    def test_complete_advances_due_date(self):
+        task = self.manager.add_task("Standup", recurrence="daily", due_date="2024-03-10")
+        self.manager.complete_task(task.id)
+        self.assertEqual(self.series("Standup"), [("2024-03-10", "done"), ("2024-03-11", "pending")])
+        self.assertEqual(self.storage.saves, 2)
+
+    def test_rollover_catches_up_once(self):
+        self.manager.add_task("Standup", recurrence="daily", due_date="2024-03-08")
+        self.manager.add_task("Review", recurrence="weekly", due_date="2024-02-26", project="Work")
+        self.manager.add_task("One-off", due_date="2024-03-01")
+        saves = self.storage.saves
+
+        counts = self.manager.rollover("2024-03-11")
+        self.assertEqual(counts, {"created": 5, "series": 2})
+        self.assertEqual(self.storage.saves, saves + 1)
+        self.assertEqual([d for d, _ in self.series("Standup")], ["2024-03-08", "2024-03-09", "2024-03-10", "2024-03-11"])
+        self.assertEqual([d for d, _ in self.series("Review")], ["2024-02-26", "2024-03-04", "2024-03-11"])
+
+        # Idempotent, and completing an earlier occurrence does not duplicate a later one
+        self.assertEqual(self.manager.rollover("2024-03-11"), {"created": 0, "series": 0})
+        self.manager.complete_task(1)
+        self.assertEqual(len(self.series("Standup")), 4)
+        reloaded = TaskManager(Storage(self.test_file))
+        self.assertEqual(len(reloaded.list_tasks(due_after="2024-03-08", due_before="2024-03-12")), 4)
+
+    def test_rollover_defaults_to_today(self):
+        with mock.patch("src.manager.today", return_value=datetime.date(2024, 3, 10)):
+            self.manager.add_task("Standup", recurrence="daily", due_date="2024-03-09")
+            self.assertEqual(self.manager.rollover()["created"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import marshal
+import os
+import shutil
+import tempfile
+from src.manager import TaskManager
+from src.search import SearchIndex, parse_query, tokenize
+from src.storage import Storage
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.directory, "tasks.json")
+        self.manager = TaskManager(Storage(self.test_file))
+        self.manager.add_task("Deploy API server", project="Ops")
+        self.manager.add_task("Write release notes", project="Docs")
+        self.manager.add_task("Deployment checklist")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def ids(self, query, manager=None, limit=20):
+        return [hit.id for hit in (manager or self.manager).search_tasks(query, limit)]
+
+    def test_parse_query(self):
+        self.assertEqual(tokenize("Fix API-v2, today!"), ["fix", "api", "v2", "today"])
+        self.assertEqual(parse_query("Deploy* api OR release AND notes"), [["deploy*", "api"], ["release", "notes"]])
+
+    def test_and_or_prefix(self):
+        self.assertEqual(self.ids("deploy"), [1])
+        self.assertEqual(self.ids("deploy*"), [1, 3])
+        self.assertEqual(self.ids("deploy* checklist"), [3])
+        self.assertEqual(self.ids("api OR docs"), [1, 2])
+        self.assertEqual(self.ids("missing"), [])
+
+    def test_ranking_and_limit(self):
+        self.manager.add_task("Deploy docs", project="Docs")
+        self.manager.complete_task(4)
+        # Matching both alternatives beats matching one; pending beats done
+        self.assertEqual(self.ids("deploy OR docs"), [4, 1, 2])
+        self.manager.update_task(4, status="pending")
+        # The rarer word weighs more
+        self.assertEqual(self.ids("deploy* OR notes", limit=2), [2, 1])
+
+    def test_incremental_updates(self):
+        self.ids("deploy")
+        index = self.manager.search_index
+        with open(index.log_path) as f:
+            self.assertEqual(f.read(), "")
+        self.manager.update_task(1, title="Ship API server")
+        self.manager.delete_task(3)
+        self.manager.add_task("Deploy website")
+        with open(index.log_path) as f:
+            self.assertEqual(len(f.readlines()), 3)
+        # A new process replays the log instead of rebuilding
+        fresh = TaskManager(Storage(self.test_file))
+        rebuilds = []
+        fresh.search_index.rebuild = lambda: rebuilds.append(True)
+        self.assertEqual(self.ids("deploy*", fresh), [4])
+        self.assertEqual(self.ids("ship", fresh), [1])
+        self.assertEqual(rebuilds, [])
+
+    def test_rebuilds_after_unindexed_write(self):
+        self.ids("deploy")
+        # A writer that does not maintain the index breaks the chain
+        Storage(self.test_file).save_tasks(self.manager.tasks[:1])
+        self.assertEqual(self.ids("deploy*", TaskManager(Storage(self.test_file))), [1])
+
+    def test_old_snapshot_is_rebuilt(self):
+        self.ids("deploy")
+        index = self.manager.search_index
+        # Version 1 kept posting lists; its snapshots are not loaded
+        header = marshal.dumps((1, index._token))
+        with open(index.path, 'wb') as f:
+            f.write(len(header).to_bytes(4, 'little'))
+            f.write(header)
+            f.write(marshal.dumps(({1: ("Deploy API server", "Ops", "pending")}, {"deploy": [1]}, ["deploy"])))
+        fresh = TaskManager(Storage(self.test_file))
+        fresh.delete_task(1)
+        self.assertEqual(self.ids("deploy*", fresh), [3])
+
+    def test_compaction(self):
+        self.ids("deploy")
+        index = SearchIndex(self.manager.storage, compact_threshold=1)
+        self.manager.search_index = index
+        self.manager.add_task("Deploy again")
+        self.assertEqual(self.ids("deploy", TaskManager(Storage(self.test_file))), [1, 4])
+        self.assertEqual(self.ids("again"), [4])
+        self.assertEqual(os.path.getsize(index.log_path), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+from src.manager import TaskManager
+from src.models import Task
+from src.sharded import ShardedStorage
+from src.storage import Storage, migrate_storage, open_storage
+
+class TestShardedStorage(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.shard_dir = os.path.join(self.directory, "tasks.shards")
+        self.storage = ShardedStorage(self.shard_dir)
+        self.manager = TaskManager(self.storage)
+        self.manager.add_task("Write report", project="Work")
+        self.manager.add_task("Buy milk", project="Home")
+        self.manager.add_task("Inbox zero")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def shard_path(self, project):
+        with open(self.storage.file_path) as f:
+            shards = dict((p, name) for p, name in json.load(f)["shards"])
+        return os.path.join(self.shard_dir, shards[project])
+
+    def test_one_shard_per_project(self):
+        with open(self.shard_path("Work")) as f:
+            self.assertEqual([item["title"] for item in json.load(f)], ["Write report"])
+        with open(self.shard_path(None)) as f:
+            self.assertEqual([item["id"] for item in json.load(f)], [3])
+        self.assertEqual([t.id for t in self.storage.load_tasks()], [1, 2, 3])
+        self.assertEqual(self.storage.max_id(), 3)
+
+    def test_writes_only_dirty_shards(self):
+        home = os.stat(self.shard_path("Home"))
+        fresh = TaskManager(ShardedStorage(self.shard_dir))
+        fresh.add_task("Plan sprint", project="Work")
+        fresh.complete_task(1)
+        self.assertEqual(os.stat(self.shard_path("Home")).st_ino, home.st_ino)
+        self.assertIsNone(fresh._tasks)
+        self.assertEqual([t.title for t in self.storage.query_tasks(project="Work", status="pending")], ["Plan sprint"])
+
+    def test_reads_only_needed_shards(self):
+        storage = ShardedStorage(self.shard_dir)
+        manager = TaskManager(storage)
+        with mock.patch.object(storage, "_read_shard", wraps=storage._read_shard) as read:
+            self.assertEqual([t.title for t in manager.list_tasks(project="Home")], ["Buy milk"])
+            self.assertEqual(manager.get_task_by_id(1).title, "Write report")
+            with self.assertRaises(ValueError):
+                manager.add_task("Buy milk")
+        shard_names = {os.path.basename(self.shard_path(p)) for p in ("Home", "Work")}
+        self.assertEqual({call.args[0] for call in read.call_args_list}, shard_names)
+
+    def test_move_between_projects_and_delete(self):
+        self.manager.update_task(2, project="Work")
+        self.manager.delete_task(1)
+        fresh = ShardedStorage(self.shard_dir)
+        self.assertEqual(fresh.get_task(2).project, "Work")
+        self.assertIsNone(fresh.get_task(1))
+        self.assertEqual(fresh.query_tasks(project="Home"), [])
+        self.assertFalse(fresh.has_pending_title("Write report"))
+        self.assertTrue(fresh.has_pending_title("Buy milk"))
+        self.assertFalse(fresh.has_pending_title("Buy milk", exclude=[2]))
+
+    def test_concurrent_adds_get_fresh_ids(self):
+        other = TaskManager(ShardedStorage(self.shard_dir))
+        self.manager.tasks
+        other.add_task("From other", project="Home")
+        task = self.manager.add_task("From here", project="Work")
+        self.assertEqual(task.id, 5)
+        self.assertEqual([t.id for t in self.manager.tasks], [1, 2, 3, 4, 5])
+        self.assertEqual(self.manager.get_task_by_id(4).title, "From other")
+
+    def test_migrate_round_trip(self):
+        json_file = os.path.join(self.directory, "tasks.json")
+        self.assertEqual(migrate_storage(self.storage, Storage(json_file)), 3)
+        Storage(json_file).save_tasks([Task(id=1, title="Only", project="Solo")])
+        target = open_storage(json_file, backend="sharded")
+        self.assertEqual(target.directory, self.shard_dir)
+        migrate_storage(Storage(json_file), target)
+        self.assertEqual([(t.id, t.project) for t in target.load_tasks()], [(1, "Solo")])
+        # Shards of projects that are gone are removed
+        self.assertEqual({name for name in os.listdir(self.shard_dir) if not name.startswith("titles-")},
+                         {"ids.bin", "lock", "manifest.json", os.path.basename(self.shard_path("Solo")),
+                          "manifest.json.changes", "manifest.json.changes.idx", "manifest.json.changes.lock"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+import glob
+import os
+from src.manager import TaskManager
+from src.models import Task
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage, migrate_storage
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        self.test_file = "test_tasks.db"
+        self.storage = SQLiteStorage(self.test_file)
+        self.manager = TaskManager(self.storage)
+
+    def tearDown(self):
+        self.storage.close()
+        # The database and its sidecars (WAL, change feed), and the migration source
+        for path in glob.glob(self.test_file + "*") + glob.glob("test_migrate.json*"):
+            os.remove(path)
+
+    def test_save_and_load_tasks(self):
+        self.storage.save_tasks([Task(id=1, title="A"), Task(id=2, title="B", project="Work")])
+        loaded = self.storage.load_tasks()
+        self.assertEqual([t.title for t in loaded], ["A", "B"])
+        self.assertEqual(loaded[1].project, "Work")
+
+    def test_queries_do_not_load_tasks(self):
+        self.manager.add_task("Task 1", project="A", priority="High")
+        self.manager.add_task("Task 2", project="B")
+        task = self.manager.add_task("Task 3", project="A")
+
+        self.assertEqual([t.title for t in self.manager.list_tasks(project="A")], ["Task 1", "Task 3"])
+        self.assertEqual(len(self.manager.list_tasks(project="A", priority="High")), 1)
+        self.assertEqual(self.manager.get_task_by_id(task.id).title, "Task 3")
+        self.assertIsNone(self.manager._tasks)
+
+    def test_duplicate_check_and_ids(self):
+        first = self.manager.add_task("Same")
+        with self.assertRaises(ValueError):
+            self.manager.add_task("Same")
+        self.manager.complete_task(first.id)
+        second = self.manager.add_task("Same")
+        self.assertEqual(second.id, 2)
+
+    def test_concurrent_adds_are_renumbered(self):
+        first = TaskManager(self.storage)
+        other_storage = SQLiteStorage(self.test_file)
+        second = TaskManager(other_storage)
+        # Both hand out ID 1 before either writes
+        with first.batch(), second.batch():
+            a = first.add_task("From first")
+            b = second.add_task("From second")
+        other_storage.close()
+        self.assertEqual((a.id, b.id), (2, 1))
+        self.assertEqual([t.title for t in self.storage.load_tasks()], ["From second", "From first"])
+        self.assertEqual(self.storage.load_stats()["total"], 2)
+
+    def test_update_complete_delete(self):
+        task = self.manager.add_task("Daily", recurrence="daily")
+        self.manager.update_task(task.id, priority="High")
+        self.assertTrue(self.manager.complete_task(task.id))
+        self.assertTrue(self.manager.delete_task(task.id))
+        self.assertFalse(self.manager.delete_task(task.id))
+
+        remaining = SQLiteStorage(self.test_file).load_tasks()
+        self.assertEqual(len(remaining), 1)
+        self.assertEqual(remaining[0].status, "pending")
+        self.assertEqual(remaining[0].priority, "High")
+
+    def test_batch_sees_uncommitted_changes(self):
+        with self.manager.batch():
+            first = self.manager.add_task("A", project="Work")
+            second = self.manager.add_task("B", project="Work")
+            with self.assertRaises(ValueError):
+                self.manager.add_task("A")
+            self.manager.delete_task(first.id)
+            self.assertEqual(self.manager.list_tasks(project="Work"), [second])
+        self.assertEqual(second.id, 2)
+        self.assertEqual([t.title for t in self.storage.load_tasks()], ["B"])
+
+    def test_migrate_from_json(self):
+        source = Storage("test_migrate.json")
+        source.save_tasks([Task(id=1, title="A"), Task(id=5, title="B")])
+        self.assertEqual(migrate_storage(source, self.storage), 2)
+        self.assertEqual(self.manager.add_task("C").id, 6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from unittest import mock
+from src.cli import build_parser, run_command
+from src.journal import JournalStorage
+from src.manager import TaskManager
+from src.models import Task
+from src.sharded import ShardedStorage
+from src.sqlite_storage import SQLiteStorage
+from src.stats import Stats
+from src.storage import Storage, open_storage
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.directory, "tasks.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def exercise(self, storage):
+        manager = TaskManager(storage)
+        manager.add_task("Report", project="Work", priority="High")
+        manager.add_task("Groceries", project="Home")
+        manager.add_task("Standup", project="Work", recurrence="daily", due_date="2024-03-01")
+        manager.complete_task(1)
+        manager.complete_task(3)
+        manager.update_task(2, project="Errands", priority="Low")
+        manager.update_task(1, status="pending")
+        manager.delete_task(3)
+        with manager.batch():
+            manager.add_task("Inside batch")
+            manager.complete_task(5)
+            manager.delete_task(5)
+        return manager
+
+    def check_backend(self, storage):
+        manager = self.exercise(storage)
+        stored = storage.load_stats()
+        self.assertIsNotNone(stored)
+        expected = Stats.from_tasks(storage.load_tasks()).to_dict()
+        self.assertEqual(stored, expected)
+        self.assertEqual(stored["total"], 3)
+        self.assertEqual(stored["project"], {"Work": 2, "Errands": 1})
+        self.assertEqual(stored["status"], {"pending": 3})
+        self.assertTrue(manager.recompute_stats()["matched"])
+
+    def test_json_header_is_maintained_incrementally(self):
+        storage = Storage(self.test_file)
+        self.check_backend(storage)
+        with open(self.test_file) as f:
+            self.assertIn('"stats": {"total": 3', f.readline())
+
+    def test_other_backends(self):
+        journal = JournalStorage(os.path.join(self.directory, "journal.json"))
+        # Deltas are journaled on top of a snapshot's counters
+        journal.save_tasks([])
+        self.check_backend(journal)
+        self.check_backend(SQLiteStorage(os.path.join(self.directory, "tasks.db")))
+        self.check_backend(ShardedStorage(os.path.join(self.directory, "tasks.shards")))
+
+    def test_archiving_keeps_completion_history(self):
+        for backend in ("json", "journal", "sqlite", "binary"):
+            with self.subTest(backend=backend):
+                path = os.path.join(self.directory, backend, "tasks.json")
+                os.makedirs(os.path.dirname(path))
+                storage = open_storage(path, backend=backend)
+                if hasattr(storage, "close"):
+                    self.addCleanup(storage.close)
+                manager = TaskManager(storage)
+                manager.add_task("Report")
+                manager.add_task("Groceries")
+                manager.complete_task(1)
+                manager.complete_task(2)
+                before = manager.stats().to_dict()
+                manager.archive_tasks()
+                fresh = open_storage(path, backend=backend)
+                if hasattr(fresh, "close"):
+                    self.addCleanup(fresh.close)
+                stats = TaskManager(fresh).stats().to_dict()
+                self.assertEqual((stats["total"], stats["status"]), (0, {}))
+                self.assertEqual(stats["completed_by_day"], before["completed_by_day"])
+                self.assertEqual(stats["lead_time"], before["lead_time"])
+                if backend != "binary":
+                    self.assertTrue(TaskManager(fresh).recompute_stats()["matched"])
+
+    def test_new_journal_store_keeps_stats(self):
+        storage = JournalStorage(self.test_file)
+        TaskManager(storage).add_task("First")
+        self.assertEqual(JournalStorage(self.test_file).load_stats()["total"], 1)
+
+    def test_stats_read_without_loading_tasks(self):
+        self.exercise(Storage(self.test_file))
+        manager = TaskManager(Storage(self.test_file))
+        with mock.patch.object(Storage, "load_tasks", side_effect=AssertionError("scanned")):
+            self.assertEqual(manager.stats().total, 3)
+
+    def test_recompute_rebuilds_wrong_counters(self):
+        storage = Storage(self.test_file)
+        self.exercise(storage)
+        storage.save_stats({"total": 99})
+        manager = TaskManager(Storage(self.test_file))
+        result = manager.recompute_stats()
+        self.assertFalse(result["matched"])
+        self.assertEqual(result["stats"].total, 3)
+        self.assertEqual(Storage(self.test_file).load_stats()["total"], 3)
+        self.assertTrue(TaskManager(Storage(self.test_file)).recompute_stats()["matched"])
+
+    def test_throughput_and_lead_time(self):
+        tasks = [Task(id=i, title=f"T{i}", status="done", created_at="2024-03-01T00:00:00",
+                      completed_at=f"2024-03-{1 + i:02d}T00:00:00") for i in range(1, 11)]
+        tasks.append(Task(id=11, title="Open", created_at="2024-03-01T00:00:00"))
+        stats = Stats.from_tasks(tasks)
+        self.assertEqual(stats.completed_since("2024-03-07"), 5)
+        self.assertEqual(stats.lead_time_mean(), 5.5 * 86400)
+        # Percentiles are bucket upper bounds, within 10% of the exact value
+        self.assertAlmostEqual(stats.lead_time_percentile(50) / 86400, 5, delta=0.5)
+        self.assertAlmostEqual(stats.lead_time_percentile(90) / 86400, 9, delta=0.9)
+        self.assertIsNone(Stats().lead_time_percentile(50))
+
+    def test_cli_report(self):
+        manager = self.exercise(Storage(self.test_file))
+        manager.complete_task(2)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            run_command(manager, build_parser().parse_args(["stats"]), self.test_file)
+            run_command(manager, build_parser().parse_args(["stats", "--recompute"]), self.test_file)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], "Tasks: 3")
+        self.assertIn("By project: Work 2, Errands 1", lines)
+        self.assertTrue(any(line.startswith("Completed: 1 today") for line in lines))
+        self.assertTrue(any(line.startswith("Lead time (1 tasks)") for line in lines))
+        self.assertEqual(lines[len(lines) // 2], "Stored counters were correct.")
+
+if __name__ == '__main__':
+    unittest.main()
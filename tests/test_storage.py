@@ -1,6 +1,8 @@
 import unittest
+import glob
 import os
 import json
+from src.manager import TaskManager
 from src.storage import Storage
 from src.models import Task
 
@@ -10,8 +12,9 @@ class TestStorage(unittest.TestCase):
         self.storage = Storage(self.test_file)
 
     def tearDown(self):
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        # The task file and its sidecars (lock, change feed)
+        for path in glob.glob(self.test_file + "*"):
+            os.remove(path)
 
     def test_save_and_load_tasks(self):
         task = Task(id=1, title="Test Task")
@@ -25,5 +28,38 @@ class TestStorage(unittest.TestCase):
         tasks = self.storage.load_tasks()
         self.assertEqual(tasks, [])
 
+    def test_version_stamp(self):
+        self.storage.save_tasks([Task(id=1, title="A")])
+        self.storage.save_tasks([Task(id=1, title="B")])
+        with open(self.test_file) as f:
+            data = json.load(f)
+        self.assertEqual(data["header"]["version"], 2)
+        self.assertEqual(data["tasks"][0]["title"], "B")
+
+    def test_load_legacy_list(self):
+        with open(self.test_file, 'w') as f:
+            json.dump([Task(id=1, title="Old format").to_dict()], f, indent=4)
+        self.assertEqual(self.storage.load_tasks()[0].title, "Old format")
+        self.assertEqual(self.storage.version, 0)
+
+    def test_concurrent_writers_merge(self):
+        first = TaskManager(Storage(self.test_file))
+        shared = first.add_task("Shared")
+        second = TaskManager(Storage(self.test_file))
+        second.tasks
+
+        mine = first.add_task("From first")
+        theirs = second.add_task("From second")
+        second.complete_task(shared.id)
+        first.update_task(mine.id, priority="High")
+
+        self.assertNotEqual(mine.id, theirs.id)
+        loaded = {t.title: t for t in Storage(self.test_file).load_tasks()}
+        self.assertEqual(set(loaded), {"Shared", "From first", "From second"})
+        self.assertEqual(loaded["Shared"].status, "done")
+        self.assertEqual(loaded["From first"].priority, "High")
+        self.assertEqual(len({t.id for t in loaded.values()}), 3)
+        self.assertEqual(first.get_task_by_id(theirs.id).title, "From second")
+
 if __name__ == '__main__':
     unittest.main()
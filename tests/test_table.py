@@ -0,0 +1,40 @@
+import unittest
+from src.models import Task
+from src.table import TaskTable
+
+class TestTaskTable(unittest.TestCase):
+    def setUp(self):
+        self.tasks = [
+            Task(id=1, title="Write report", project="Work", priority="High", due_date="2024-01-15"),
+            Task(id=2, title="Buy milk", recurrence="weekly"),
+        ]
+        self.table = TaskTable()
+        self.table.extend(self.tasks)
+
+    def test_rows_match_tasks(self):
+        self.assertEqual(len(self.table), 2)
+        self.assertEqual(self.table.to_dicts(), [t.to_dict() for t in self.tasks])
+        self.assertEqual(self.table[1].to_task(), self.tasks[1])
+
+    def test_attribute_updates(self):
+        row = self.table[self.table.index_of(2)]
+        row.status = "done"
+        row.project = "Home"
+        self.assertEqual(row.status, "done")
+        self.assertEqual(self.table[1].project, "Home")
+        self.assertEqual(self.table[0].project, "Work")
+
+    def test_repeated_strings_are_pooled(self):
+        self.table.append(Task(id=3, title="Plan", project="Work"))
+        self.assertEqual(self.table.pool.values.count("Work"), 1)
+
+    def test_from_dicts_fills_defaults(self):
+        table = TaskTable.from_dicts([{"id": 7, "title": "Minimal"}])
+        self.assertEqual(table[0].status, "pending")
+        self.assertEqual(table[0].priority, "Medium")
+        self.assertTrue(table[0].created_at)
+        with self.assertRaises(KeyError):
+            table.index_of(8)
+
+if __name__ == '__main__':
+    unittest.main()